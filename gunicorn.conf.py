@@ -0,0 +1,48 @@
+"""
+Gunicorn settings for `manage.py serve`.
+
+Every value can be overridden through the environment, so the same file
+serves containers of any size.
+
+HUP restarts the workers gracefully, but with preload_app they are forked
+from the master's already imported application, so they keep the old
+code. To deploy new code without dropping connections, send USR2 to start
+a new master from the current code, then WINCH and QUIT to the old one;
+or set GUNICORN_PRELOAD=0 so workers import the app and HUP reloads it.
+"""
+
+import os
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 2 * _cpu_count() + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# Import Django once in the master and fork workers from it.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# Recycle workers to bound slow memory growth; jitter spreads restarts.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared by workers.
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,172 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+
+from tasks.models import Task
+from user.hashing import password_hashing_pool
+
+logger = logging.getLogger(__name__)
+
+HEALTH_DEFAULTS = {
+    "PROBE_TTL": 2.0,
+    "DRAIN_FILE": "/tmp/railway-drain",
+}
+
+
+def health_setting(name):
+    return getattr(settings, "HEALTH", {}).get(name, HEALTH_DEFAULTS[name])
+
+
+class InFlightCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.value += 1
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.value -= 1
+
+
+in_flight = InFlightCounter()
+
+
+class InFlightMiddleware:
+    """Counts requests being handled by this process, for readiness."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with in_flight:
+            return self.get_response(request)
+
+
+def is_draining():
+    return os.path.exists(health_setting("DRAIN_FILE"))
+
+
+def start_draining():
+    with open(health_setting("DRAIN_FILE"), "w"):
+        pass
+
+
+def stop_draining():
+    try:
+        os.remove(health_setting("DRAIN_FILE"))
+    except FileNotFoundError:
+        pass
+
+
+def _probe_database():
+    connection = connections[DEFAULT_DB_ALIAS]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception:
+        # Driver errors can name hosts and users; readiness is unauthenticated.
+        logger.exception("Database health probe failed")
+        connection.close()
+        return {"ok": False, "error": "Database unavailable"}
+    return {"ok": True}
+
+
+def _probe_migrations():
+    connection = connections[DEFAULT_DB_ALIAS]
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return {"ok": not plan, "pending": len(plan)}
+
+
+def _probe_tasks():
+    due = Task.objects.filter(status=Task.Status.QUEUED, run_at__lte=timezone.now())
+    return {"due": due.count()}
+
+
+class DependencyProbe:
+    """
+    Checks that touch the database, cached for PROBE_TTL seconds.
+
+    Orchestrators probe every few seconds on every pod; the cache keeps
+    that to one round trip per process per TTL. Once migrations are seen
+    applied they are not checked again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+        self._migrated = False
+
+    def _run(self):
+        database = _probe_database()
+        result = {"database": database}
+        if database["ok"]:
+            if self._migrated:
+                result["migrations"] = {"ok": True, "pending": 0}
+            else:
+                result["migrations"] = _probe_migrations()
+                self._migrated = result["migrations"]["ok"]
+            result["tasks"] = _probe_tasks()
+        return result
+
+    def get(self):
+        with self._lock:
+            if time.monotonic() - self._checked_at > health_setting("PROBE_TTL"):
+                self._result = self._run()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def clear(self):
+        with self._lock:
+            self._result = None
+            self._checked_at = 0.0
+            self._migrated = False
+
+
+dependency_probe = DependencyProbe()
+
+
+@require_safe
+def liveness(request):
+    return JsonResponse({"status": "ok"})
+
+
+@require_safe
+def readiness(request):
+    """
+    Ready when the database answers, migrations are applied and the
+    process is not draining. Drain mode (`manage.py drain`) fails this
+    check so the load balancer stops routing here while requests that
+    are already in flight finish.
+    """
+    checks = dict(dependency_probe.get())
+    draining = is_draining()
+    checks["load"] = {
+        # Not counting this probe.
+        "in_flight": max(in_flight.value - 1, 0),
+        "password_hashing": password_hashing_pool.stats(),
+    }
+    ready = (
+        not draining
+        and checks["database"]["ok"]
+        and checks.get("migrations", {}).get("ok", False)
+    )
+    return JsonResponse(
+        {
+            "status": "ready" if ready else "draining" if draining else "unavailable",
+            "checks": checks,
+        },
+        status=200 if ready else 503,
+    )
@@ -0,0 +1,174 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CONTENT_HASH_RE = re.compile(r"(^|[-_.])[0-9a-f]{32,64}([-_.]|$)")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+def is_content_hashed(path):
+    return bool(CONTENT_HASH_RE.search(os.path.basename(path)))
+
+
+def _etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or (
+            if_none_match.strip() == "*"
+        )
+    if_modified_since = parse_http_date_safe(
+        request.headers.get("If-Modified-Since", "")
+    )
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a single byte range, or None to ignore it.
+
+    As RFC 7233 allows, multi-range and malformed headers are ignored and
+    the full file is served. Raises RangeNotSatisfiable for a well-formed
+    range that lies outside the file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _content_type(full_path):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    return content_type or "application/octet-stream", encoding
+
+
+def _sendfile_response(path, full_path):
+    header = settings.MEDIA_SENDFILE_HEADER
+    response = HttpResponse(content_type=_content_type(full_path)[0])
+    if header == "X-Accel-Redirect":
+        response[header] = quote(settings.MEDIA_SENDFILE_PREFIX + path)
+    else:
+        response[header] = full_path
+    return response
+
+
+def _file_response(request, full_path, stat, etag):
+    content_type, encoding = _content_type(full_path)
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+
+    byte_range = None
+    if range_header and (if_range is None or if_range == etag):
+        try:
+            byte_range = _parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+    if byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(full_path, start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    else:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+        response["Content-Length"] = str(stat.st_size)
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT.
+
+    When a front proxy is configured (MEDIA_SENDFILE_HEADER), the worker
+    only answers with X-Accel-Redirect/X-Sendfile and the proxy sends the
+    bytes. Otherwise the file is streamed, honouring conditional and Range
+    requests. Content-hashed names never change, so they are cached as
+    immutable.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    etag = _etag(stat)
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL if is_content_hashed(path) else DEFAULT_CACHE_CONTROL
+    )
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+    elif settings.MEDIA_SENDFILE_HEADER:
+        response = _sendfile_response(path, full_path)
+    else:
+        response = _file_response(request, full_path, stat, etag)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    return response
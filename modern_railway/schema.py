@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views.decorators.http import require_safe
+
+SCHEMA_CONTENT_TYPES = {
+    "yaml": "application/vnd.oai.openapi; charset=utf-8",
+    "json": "application/vnd.oai.openapi+json; charset=utf-8",
+}
+SCHEMA_CACHE_CONTROL = "public, no-cache"
+
+
+def _read_schema_file(path):
+    with open(path, "rb") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        import yaml
+
+        return yaml.safe_load(file)
+
+
+def _generate_schema():
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def _render(schema, schema_format):
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    renderer = (
+        OpenApiJsonRenderer() if schema_format == "json" else OpenApiYamlRenderer()
+    )
+    return renderer.render(schema, renderer_context={})
+
+
+class SchemaCache:
+    """
+    OpenAPI schema built once per process and kept as rendered bytes.
+
+    The schema is read from OPENAPI_SCHEMA_FILE when it exists, which
+    `manage.py spectacular --file <path>` writes at build time, and is
+    generated on first request otherwise. Each format is rendered once
+    and served with an ETag of its content.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schema = None
+        self._blobs = {}
+
+    def get(self, schema_format):
+        blob = self._blobs.get(schema_format)
+        if blob is None:
+            with self._lock:
+                if self._schema is None:
+                    path = settings.OPENAPI_SCHEMA_FILE
+                    if path and os.path.exists(path):
+                        self._schema = _read_schema_file(path)
+                    else:
+                        self._schema = _generate_schema()
+                content = _render(self._schema, schema_format)
+                etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+                blob = self._blobs[schema_format] = (content, etag)
+        return blob
+
+    def clear(self):
+        with self._lock:
+            self._schema = None
+            self._blobs = {}
+
+
+schema_cache = SchemaCache()
+
+
+def _schema_format(request):
+    requested = request.GET.get("format")
+    if requested in SCHEMA_CONTENT_TYPES:
+        return requested
+    if "json" in request.headers.get("Accept", ""):
+        return "json"
+    return "yaml"
+
+
+@require_safe
+def serve_schema(request):
+    schema_format = _schema_format(request)
+    content, etag = schema_cache.get(schema_format)
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            content, content_type=SCHEMA_CONTENT_TYPES[schema_format]
+        )
+    response["ETag"] = etag
+    response["Cache-Control"] = SCHEMA_CACHE_CONTROL
+    response["Vary"] = "Accept"
+    return response
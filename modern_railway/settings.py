@@ -25,9 +25,13 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# DJANGO_DEBUG=0 is the production profile: no debug toolbar app or
+# middleware, and extra hosts come from DJANGO_ALLOWED_HOSTS.
+DEBUG = os.getenv("DJANGO_DEBUG", "1") == "1"
 
-ALLOWED_HOSTS = ["0.0.0.0", "localhost", "127.0.0.1"]
+ALLOWED_HOSTS = ["0.0.0.0", "localhost", "127.0.0.1"] + [
+    host for host in os.getenv("DJANGO_ALLOWED_HOSTS", "").split(",") if host
+]
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -42,17 +46,20 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "debug_toolbar",
     "rest_framework",
     "rest_framework.authtoken",
     "drf_spectacular",
     "railway",
     "user",
+    "tasks",
 ]
 
 AUTH_USER_MODEL = "user.User"
 
 MIDDLEWARE = [
+    "modern_railway.health.InFlightMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,6 +70,33 @@ MIDDLEWARE = [
     "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
 
+if not DEBUG:
+    INSTALLED_APPS.remove("debug_toolbar")
+    MIDDLEWARE.remove("debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Lean startup profile for API-only workers (DJANGO_LEAN_STARTUP=1): no
+# admin, sessions, debug toolbar, or OpenAPI schema and docs URLs. Views
+# still import drf_spectacular.utils for their schema decorators.
+# `manage.py import_report` shows what each profile imports.
+LEAN_STARTUP = os.getenv("DJANGO_LEAN_STARTUP") == "1"
+
+LEAN_SKIPPED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "debug_toolbar",
+    "drf_spectacular",
+]
+
+if LEAN_STARTUP:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in LEAN_SKIPPED_APPS]
+    MIDDLEWARE = [
+        "modern_railway.health.InFlightMiddleware",
+        "django.middleware.security.SecurityMiddleware",
+        "django.middleware.common.CommonMiddleware",
+    ]
+
 ROOT_URLCONF = "modern_railway.urls"
 
 TEMPLATES = [
@@ -134,6 +168,15 @@ MEDIA_ROOT = "/files/media"
 
 MEDIA_URL = "/media/"
 
+FILE_UPLOAD_HANDLERS = ["railway.uploads.HashingFileUploadHandler"]
+
+# Hand media delivery off to the front proxy: "X-Accel-Redirect" (nginx,
+# served from the internal MEDIA_SENDFILE_PREFIX location) or "X-Sendfile"
+# (Apache, lighttpd). When unset, media files are streamed by Django.
+MEDIA_SENDFILE_HEADER = os.getenv("MEDIA_SENDFILE_HEADER") or None
+
+MEDIA_SENDFILE_PREFIX = os.getenv("MEDIA_SENDFILE_PREFIX", "/internal-media/")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -143,16 +186,45 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "modern_railway.throttling.SharedAnonRateThrottle",
+        "modern_railway.throttling.SharedUserRateThrottle",
+        "modern_railway.throttling.SharedScopedRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "10/day",
+        "user": "30/day",
+        "trips": "120/minute",
+        "orders": "60/minute",
+        "order_create": "10/hour",
+    },
 }
 
+# Where throttle counters live: per process by default, a shared-memory
+# file for all workers on a host, or a cache alias shared across hosts.
+if os.getenv("THROTTLE_CACHE_ALIAS"):
+    THROTTLE_STORE = {
+        "BACKEND": "modern_railway.throttling.CacheThrottleStore",
+        "OPTIONS": {"alias": os.getenv("THROTTLE_CACHE_ALIAS")},
+    }
+elif os.getenv("THROTTLE_STORE_PATH"):
+    THROTTLE_STORE = {
+        "BACKEND": "modern_railway.throttling.FileThrottleStore",
+        "OPTIONS": {"path": os.getenv("THROTTLE_STORE_PATH"), "slots": 65536},
+    }
+else:
+    THROTTLE_STORE = {
+        "BACKEND": "modern_railway.throttling.MemoryThrottleStore",
+        "OPTIONS": {"slots": 65536},
+    }
+
+# Pre-generated schema (`manage.py spectacular --file <path>`); when it is
+# missing the schema is generated on the first request to /api/schema/.
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Railway Service API",
     "DESCRIPTION": "Order train tickets",
@@ -166,10 +238,97 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+TASKS = {
+    "EAGER": False,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF": 10,
+    "RETRY_BACKOFF_MAX": 3600,
+    # Seconds without a worker heartbeat before a running task is requeued
+    "STALE_AFTER": 1800,
+    "WORKER_PROCESSES": int(os.getenv("TASK_WORKER_PROCESSES", 1)),
+    "WORKER_THREADS": int(os.getenv("TASK_WORKER_THREADS", 4)),
+    "POLL_INTERVAL": 1.0,
+}
+
+PASSWORD_HASHING = {
+    "ENABLED": True,
+    "PROCESSES": int(os.getenv("PASSWORD_HASHING_PROCESSES", 2)),
+    "QUEUE_SIZE": 8,
+    "TIMEOUT": 10,
+    "RETRY_AFTER": 1,
+}
+
+STATION_INDEX = {
+    "ENABLED": True,
+    "TTL": 300,
+    "MAX_STATIONS": 1000000,
+}
+
+STATION_DISTANCES = {
+    "TTL": 300,
+    "MATRIX": os.getenv("STATION_DISTANCE_MATRIX", "0") == "1",
+    "MAX_MATRIX_STATIONS": 2000,
+    "TOLERANCE_KM": 1.0,
+}
+
+# Route changes reach other workers through a version in CACHE; with the
+# default per-process LocMemCache they only see them after TTL seconds.
+ROUTE_LOOKUP = {
+    "CACHE": "default",
+    "TTL": 300,
+}
+
+CREW_SCHEDULING = {
+    "MIN_REST_HOURS": 8,
+}
+
+# Rule changes reach other workers through a version in CACHE; with the
+# default per-process LocMemCache they are picked up after TTL seconds.
+FARES = {
+    "CACHE": "default",
+    "TTL": 60,
+}
+
+DYNAMIC_PRICING = {
+    # (minimum load factor, fare multiplier) per price tier
+    "TIERS": ((0.0, "1.00"), (0.5, "1.10"), (0.75, "1.25"), (0.9, "1.50")),
+    "HORIZON_DAYS": 90,
+    "BATCH_SIZE": 5000,
+}
+
+# Invalidation only reaches other workers through a shared CACHE; with the
+# default per-process LocMemCache they serve cached months for up to TTL.
+AVAILABILITY_CALENDAR = {
+    "CACHE": "default",
+    "TTL": 600,
+    "MAX_DAYS": 92,
+}
+
+HEALTH = {
+    "PROBE_TTL": 2.0,
+    "DRAIN_FILE": os.getenv("DRAIN_FILE", "/tmp/railway-drain"),
+}
+
+USER_CACHE = {
+    "TTL": 30,
+    "MAX_SIZE": 10000,
+    "SHARED_CACHE": os.getenv("USER_CACHE_ALIAS") or None,
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=3),
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": False,
     "UPDATE_LAST_LOGIN": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "user.serializers.TokenVerifySerializer",
+}
+
+TOKEN_REVOCATION = {
+    "CAPACITY": 100000,
+    "ERROR_RATE": 0.001,
+    "REFRESH_INTERVAL": 5,
+    "REBUILD_INTERVAL": 3600,
 }
@@ -0,0 +1,220 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+# key fingerprint, window index, hits in that window, hits in the one before
+SLOT = struct.Struct("<QqII")
+DEFAULT_SLOTS = 65536
+LOCK_STRIPES = 64
+
+
+def _fingerprint(key):
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def sliding_window(state, index, fraction, limit):
+    """
+    Apply one hit to a sliding-window counter.
+
+    `state` is (window index, current count, previous count). The number of
+    hits in the last `window` seconds is estimated as the previous window's
+    count, weighted by how much of it still overlaps, plus the current one.
+    Returns (new state, allowed, seconds to wait before retrying).
+    """
+    stored_index, current, previous = state
+    if stored_index == index - 1:
+        previous, current = current, 0
+    elif stored_index != index:
+        previous, current = 0, 0
+
+    estimated = previous * (1 - fraction) + current
+    if estimated < limit:
+        return (index, current + 1, previous), True, 0.0
+
+    if current >= limit:
+        wait_fraction = 1 - fraction
+    else:
+        wait_fraction = (1 - (limit - current) / previous) - fraction
+    return (index, current, previous), False, max(wait_fraction, 0.0)
+
+
+class SlotThrottleStore:
+    """
+    Fixed-size table of sliding-window counters.
+
+    Keys are hashed into `slots` slots of 24 bytes each, so memory does not
+    grow with the number of clients. A key that lands on a slot owned by
+    another key takes it over and starts from zero.
+    """
+
+    def __init__(self, slots=DEFAULT_SLOTS):
+        self.slots = slots
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _buffer(self):
+        raise NotImplementedError
+
+    def _lock_slot(self, slot):
+        return self._locks[slot % LOCK_STRIPES]
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        index, fraction = int(now // window), (now % window) / window
+        fingerprint = _fingerprint(key)
+        slot = fingerprint % self.slots
+        offset = slot * SLOT.size
+
+        with self._lock_slot(slot):
+            buffer = self._buffer()
+            stored_fingerprint, *state = SLOT.unpack_from(buffer, offset)
+            if stored_fingerprint != fingerprint:
+                state = (index, 0, 0)
+            state, allowed, wait = sliding_window(state, index, fraction, limit)
+            SLOT.pack_into(buffer, offset, fingerprint, *state)
+        return allowed, wait * window
+
+
+class MemoryThrottleStore(SlotThrottleStore):
+    """Counters in process memory: limits hold per worker process only."""
+
+    def __init__(self, slots=DEFAULT_SLOTS):
+        super().__init__(slots)
+        self._data = bytearray(slots * SLOT.size)
+
+    def _buffer(self):
+        return self._data
+
+
+class FileThrottleStore(SlotThrottleStore):
+    """
+    Counters in a memory-mapped file shared by every process on the host.
+
+    Point `path` at /dev/shm to keep it in shared memory. Each update locks
+    its slot's byte range with fcntl while holding the per-process thread
+    lock: fcntl locks belong to the process, so they only keep other
+    processes out and the thread lock has to serialize this one first.
+    """
+
+    def __init__(self, path, slots=DEFAULT_SLOTS):
+        super().__init__(slots)
+        self.path = path
+        self._map = None
+        self._fd = None
+        self._open_lock = threading.Lock()
+
+    def _buffer(self):
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    size = self.slots * SLOT.size
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                    if os.fstat(fd).st_size < size:
+                        os.ftruncate(fd, size)
+                    self._fd = fd
+                    self._map = mmap.mmap(fd, size)
+        return self._map
+
+    @contextmanager
+    def _lock_slot(self, slot):
+        offset = slot * SLOT.size
+        with super()._lock_slot(slot):
+            self._buffer()
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, SLOT.size, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT.size, offset)
+
+
+class CacheThrottleStore:
+    """
+    Counters in a shared Django cache (Redis, Memcached) for multi-host use.
+
+    Each window has its own counter, bumped with the cache's atomic incr.
+    """
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    def hit(self, key, limit, window):
+        cache = caches[self.alias]
+        now = time.time()
+        index, fraction = int(now // window), (now % window) / window
+        current_key = f"{key}:{index}"
+
+        cache.add(current_key, 0, timeout=int(window * 2) + 1)
+        current = cache.incr(current_key)
+        previous = cache.get(f"{key}:{index - 1}", 0)
+
+        _, allowed, wait = sliding_window(
+            (index, current - 1, previous), index, fraction, limit
+        )
+        if not allowed:
+            cache.decr(current_key)
+        return allowed, wait * window
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_throttle_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = getattr(settings, "THROTTLE_STORE", {})
+                backend = config.get(
+                    "BACKEND", "modern_railway.throttling.MemoryThrottleStore"
+                )
+                _store = import_string(backend)(**config.get("OPTIONS", {}))
+    return _store
+
+
+class SharedRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle counting hits in the configured THROTTLE_STORE."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self._wait = get_throttle_store().hit(
+            self.key, self.num_requests, self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class SharedAnonRateThrottle(SharedRateThrottle, AnonRateThrottle):
+    pass
+
+
+class SharedUserRateThrottle(SharedRateThrottle, UserRateThrottle):
+    pass
+
+
+class SharedScopedRateThrottle(ScopedRateThrottle, SharedRateThrottle):
+    """Per-endpoint limits from the view's `throttle_scope`."""
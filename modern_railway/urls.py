@@ -1,27 +1,46 @@
-from django.contrib import admin
-from django.urls import path, include
-from django.conf.urls.static import static
+from django.apps import apps
+from django.urls import path, include, re_path
 from django.conf import settings
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+
+from modern_railway.health import liveness, readiness
+from modern_railway.media import serve_media
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    path("health/live/", liveness, name="health-live"),
+    path("health/ready/", readiness, name="health-ready"),
     path("api/railway/", include("railway.urls", namespace="railway")),
     path("api/user/", include("user.urls", namespace="user")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/doc/swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path(
-        "api/doc/redoc/",
-        SpectacularRedocView.as_view(url_name="schema"),
-        name="redoc",
+    path("api/tasks/", include("tasks.urls", namespace="tasks")),
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$", serve_media, name="media"
     ),
-    path("__debug__/", include("debug_toolbar.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
+
+# The lean profile drops drf_spectacular, and with it the schema and docs:
+# without the app the JWT scheme extension is not registered (user.apps).
+if apps.is_installed("drf_spectacular"):
+    from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
+
+    from modern_railway.schema import serve_schema
+
+    urlpatterns += [
+        path("api/schema/", serve_schema, name="schema"),
+        path(
+            "api/doc/swagger/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        path(
+            "api/doc/redoc/",
+            SpectacularRedocView.as_view(url_name="schema"),
+            name="redoc",
+        ),
+    ]
+
+if apps.is_installed("debug_toolbar"):
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
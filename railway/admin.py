@@ -1,15 +1,20 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseRedirect
 
 from railway.models import (
     Station,
     Route,
     Crew,
     Trip,
+    TripSchedule,
+    FareRule,
     TrainType,
     Train,
     Order,
     Ticket,
 )
+from railway.schedules import materialize_schedule
 
 
 class TicketInLine(admin.TabularInline):
@@ -22,10 +27,28 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = (TicketInLine,)
 
 
+@admin.register(TripSchedule)
+class TripScheduleAdmin(admin.ModelAdmin):
+    def changeform_view(self, request, *args, **kwargs):
+        # The view runs in a transaction, so a schedule whose trips cannot be
+        # generated is rolled back before the error is shown.
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except ValidationError as error:
+            for message in error.messages:
+                self.message_user(request, message, messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        materialize_schedule(form.instance)
+
+
 admin.site.register(Station)
 admin.site.register(Route)
 admin.site.register(Crew)
 admin.site.register(Trip)
 admin.site.register(TrainType)
+admin.site.register(FareRule)
 admin.site.register(Train)
 admin.site.register(Ticket)
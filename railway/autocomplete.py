@@ -0,0 +1,272 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from itertools import chain
+
+from django.db.models import Count
+
+from railway.models import Station, Trip
+
+AUTOCOMPLETE_MAX_RESULTS = 20
+AUTOCOMPLETE_REFRESH_INTERVAL = 600
+
+WORD_BOUNDARY_RE = re.compile(r"[\W_]+")
+
+
+def fold(text):
+    """Case- and accent-insensitive form of a name: "Łódź" -> "łodz"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def completion_keys(name):
+    """The folded name from each word start, so "Kyiv-Pas" matches "pas"."""
+    folded = fold(name).strip()
+    keys = {folded}
+    for match in WORD_BOUNDARY_RE.finditer(folded):
+        if match.end() < len(folded):
+            keys.add(folded[match.end() :])
+    return keys
+
+
+class _Node:
+    __slots__ = ("label", "children", "entries", "top")
+
+    def __init__(self, label=""):
+        self.label = label
+        self.children = {}
+        self.entries = set()
+        self.top = []
+
+
+def _common_prefix_length(first, second):
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+class StationTrie:
+    """
+    Radix trie of folded station names ranked by popularity.
+
+    Edges carry whole substrings, so there are at most about two nodes per
+    key. Every node keeps the best AUTOCOMPLETE_MAX_RESULTS completions
+    below it, so a lookup only walks the prefix. Inserting a station
+    merges it into the lists along its paths; removing one re-ranks only
+    the nodes that listed it. Entries are (-score, name, id) tuples, so
+    they sort best first.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.stations = {}
+
+    def _walk(self, key):
+        """Nodes along `key` that it fully spells out, root first."""
+        node, path, index = self.root, [self.root], 0
+        while index < len(key):
+            child = node.children.get(key[index])
+            if child is None or not key.startswith(child.label, index):
+                break
+            node, index = child, index + len(child.label)
+            path.append(node)
+        return path, index
+
+    def _add_path(self, key):
+        path, index = self._walk(key)
+        node = path[-1]
+        if index == len(key):
+            return path
+
+        child = node.children.get(key[index])
+        if child is not None:
+            # The key leaves this edge part-way, so split it.
+            common = _common_prefix_length(child.label, key[index:])
+            middle = _Node(child.label[:common])
+            middle.top = list(child.top)
+            child.label = child.label[common:]
+            middle.children[child.label[0]] = child
+            node.children[key[index]] = middle
+            node, index = middle, index + common
+            path.append(middle)
+        if index < len(key):
+            leaf = node.children[key[index]] = _Node(key[index:])
+            path.append(leaf)
+        return path
+
+    @staticmethod
+    def _merge_top(node):
+        node.top = heapq.nsmallest(
+            AUTOCOMPLETE_MAX_RESULTS,
+            set(chain(node.entries, *(child.top for child in node.children.values()))),
+        )
+
+    def _refresh_all(self):
+        stack, ordered = [self.root], []
+        while stack:
+            node = stack.pop()
+            ordered.append(node)
+            stack.extend(node.children.values())
+        for node in reversed(ordered):
+            self._merge_top(node)
+
+    def _compact(self, path):
+        """Drop empty leaves and merge pass-through nodes below the root."""
+        for depth in range(len(path) - 1, 0, -1):
+            node, parent = path[depth], path[depth - 1]
+            if node.entries:
+                continue
+            if not node.children:
+                del parent.children[node.label[0]]
+            elif len(node.children) == 1:
+                (child,) = node.children.values()
+                child.label = node.label + child.label
+                parent.children[node.label[0]] = child
+
+    def _add(self, station_id, name, score):
+        entry = (-score, name, station_id)
+        keys = completion_keys(name)
+        paths = []
+        for key in keys:
+            path = self._add_path(key)
+            path[-1].entries.add(entry)
+            paths.append(path)
+        self.stations[station_id] = (entry, keys)
+        return entry, paths
+
+    @classmethod
+    def build(cls, stations):
+        """Bulk-load (id, name, score) rows and rank every node once."""
+        trie = cls()
+        for station_id, name, score in stations:
+            trie._add(station_id, name, score)
+        trie._refresh_all()
+        return trie
+
+    def insert(self, station_id, name, score):
+        self.remove(station_id)
+        entry, paths = self._add(station_id, name, score)
+        for path in paths:
+            for node in path:
+                if entry not in node.top:
+                    node.top = heapq.nsmallest(
+                        AUTOCOMPLETE_MAX_RESULTS, node.top + [entry]
+                    )
+
+    def remove(self, station_id):
+        previous = self.stations.pop(station_id, None)
+        if previous is None:
+            return
+        entry, keys = previous
+        for key in keys:
+            path, _ = self._walk(key)
+            path[-1].entries.discard(entry)
+            self._compact(path)
+            # A node ranks the entry only if the node below it does.
+            for node in reversed(self._walk(key)[0]):
+                if entry not in node.top:
+                    break
+                self._merge_top(node)
+
+    def score(self, station_id):
+        previous = self.stations.get(station_id)
+        return -previous[0][0] if previous else 0
+
+    def complete(self, prefix, limit=10):
+        prefix = fold(prefix).strip()
+        node, index = self.root, 0
+        while index < len(prefix):
+            node = node.children.get(prefix[index])
+            if node is None:
+                return []
+            if prefix.startswith(node.label, index):
+                index += len(node.label)
+            elif node.label.startswith(prefix[index:]):
+                break
+            else:
+                return []
+        return [
+            {"id": station_id, "name": name, "trip_count": -score}
+            for score, name, station_id in node.top[:limit]
+        ]
+
+
+def station_popularity():
+    """Number of trips departing from or arriving at each station."""
+    counts = Counter()
+    for source_id, destination_id, total in (
+        Trip.objects.order_by()
+        .values_list("route__source_id", "route__destination_id")
+        .annotate(total=Count("id"))
+    ):
+        counts[source_id] += total
+        counts[destination_id] += total
+    return counts
+
+
+class StationAutocomplete:
+    """
+    Process-wide StationTrie kept in sync with Station.
+
+    Built on first use and rebuilt every AUTOCOMPLETE_REFRESH_INTERVAL
+    seconds to pick up new trip counts. In between, station saves and
+    deletes (railway.signals) update the trie in place, so lookups never
+    touch the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trie = None
+        self._built_at = 0.0
+
+    def _is_stale(self):
+        return (
+            self._trie is None
+            or time.monotonic() - self._built_at > AUTOCOMPLETE_REFRESH_INTERVAL
+        )
+
+    def _get_trie(self):
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    popularity = station_popularity()
+                    self._trie = StationTrie.build(
+                        (station_id, name, popularity[station_id])
+                        for station_id, name in Station.objects.values_list(
+                            "id", "name"
+                        )
+                    )
+                    self._built_at = time.monotonic()
+        return self._trie
+
+    def complete(self, prefix, limit=10):
+        trie = self._get_trie()
+        with self._lock:
+            return trie.complete(prefix, limit)
+
+    def update(self, station):
+        with self._lock:
+            if self._trie is not None:
+                self._trie.insert(
+                    station.id, station.name, self._trie.score(station.id)
+                )
+
+    def remove(self, station_id):
+        with self._lock:
+            if self._trie is not None:
+                self._trie.remove(station_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._trie = None
+
+
+station_autocomplete = StationAutocomplete()
@@ -0,0 +1,140 @@
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from railway.models import Trip
+
+AVAILABILITY_CALENDAR_DEFAULTS = {
+    "CACHE": "default",
+    "TTL": 600,
+    "MAX_DAYS": 92,
+}
+
+
+def availability_calendar_setting(name):
+    return getattr(settings, "AVAILABILITY_CALENDAR", {}).get(
+        name, AVAILABILITY_CALENDAR_DEFAULTS[name]
+    )
+
+
+def _cache():
+    return caches[availability_calendar_setting("CACHE")]
+
+
+def _key(route_id, month):
+    return f"railway:calendar:{route_id}:{month[0]}-{month[1]:02d}"
+
+
+def _month_start(month):
+    return date(month[0], month[1], 1)
+
+
+def _next_month(month):
+    year, number = month
+    return (year + 1, 1) if number == 12 else (year, number + 1)
+
+
+def _months(start, end):
+    """(year, month) pairs covering the dates start..end."""
+    month, last = (start.year, start.month), (end.year, end.month)
+    while month <= last:
+        yield month
+        month = _next_month(month)
+
+
+def _local_midnight(day):
+    return timezone.make_aware(
+        datetime.combine(day, time.min), timezone.get_current_timezone()
+    )
+
+
+def daily_availability(route_id, start, end):
+    """
+    Trip count, first departure and free seats per local date in
+    [start, end) for one route, in a single aggregate query over the
+    trips' tickets_sold counters.
+    """
+    rows = (
+        Trip.objects.filter(
+            route_id=route_id,
+            departure_time__gte=_local_midnight(start),
+            departure_time__lt=_local_midnight(end),
+        )
+        .annotate(
+            day=TruncDate("departure_time"),
+            free=F("train__cargo_num") * F("train__places_in_cargo")
+            - F("tickets_sold"),
+        )
+        .order_by()
+        .values("day")
+        .annotate(
+            trips=Count("id"),
+            first_departure=Min("departure_time"),
+            free_seats=Sum("free"),
+        )
+        .order_by("day")
+    )
+    return [
+        {
+            "date": row["day"],
+            "trips": row["trips"],
+            "first_departure": row["first_departure"],
+            "free_seats": row["free_seats"],
+        }
+        for row in rows
+    ]
+
+
+def availability_calendar(route_id, start, end):
+    """
+    Days from `start` to `end` (inclusive) on which the route has trips.
+
+    Whole months are cached under (route, month). Months missing from the
+    cache are filled together with one daily_availability() query.
+
+    Sales and trip changes delete the months they touch from the
+    AVAILABILITY_CALENDAR["CACHE"] cache. With a shared cache that reaches
+    every worker; with the default per-process LocMemCache only the worker
+    that made the change drops its months, and the others serve them for
+    up to AVAILABILITY_CALENDAR["TTL"] seconds.
+    """
+    cache = _cache()
+    months = list(_months(start, end))
+    keys = {month: _key(route_id, month) for month in months}
+    cached = cache.get_many(keys.values())
+
+    missing = [month for month in months if keys[month] not in cached]
+    if missing:
+        days = daily_availability(
+            route_id, _month_start(missing[0]), _month_start(_next_month(missing[-1]))
+        )
+        fresh = {
+            keys[month]: [
+                day for day in days if (day["date"].year, day["date"].month) == month
+            ]
+            for month in missing
+        }
+        cache.set_many(fresh, availability_calendar_setting("TTL"))
+        cached.update(fresh)
+
+    return [
+        day
+        for month in months
+        for day in cached[keys[month]]
+        if start <= day["date"] <= end
+    ]
+
+
+def invalidate_departures(departures):
+    """Drop cached months for (route_id, departure_time) pairs."""
+    keys = {
+        _key(route_id, (local.year, local.month))
+        for route_id, departure_time in departures
+        for local in [timezone.localtime(departure_time)]
+    }
+    if keys:
+        _cache().delete_many(keys)
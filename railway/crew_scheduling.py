@@ -0,0 +1,120 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+
+from railway.intervals import IntervalTree
+from railway.models import Trip
+
+CREW_SCHEDULING_DEFAULTS = {
+    "MIN_REST_HOURS": 8,
+}
+
+OVERLAP = "overlap"
+SHORT_REST = "short_rest"
+
+
+def crew_scheduling_setting(name):
+    return getattr(settings, "CREW_SCHEDULING", {}).get(
+        name, CREW_SCHEDULING_DEFAULTS[name]
+    )
+
+
+def minimum_rest():
+    return timedelta(hours=crew_scheduling_setting("MIN_REST_HOURS"))
+
+
+def crew_assignments(crew_ids=None, start=None, end=None):
+    """(crew_id, trip_id, departure, arrival) rows, optionally windowed."""
+    rows = Trip.crew.through.objects.values_list(
+        "crew_id", "trip_id", "trip__departure_time", "trip__arrival_time"
+    )
+    if crew_ids is not None:
+        rows = rows.filter(crew_id__in=crew_ids)
+    if start is not None:
+        rows = rows.filter(trip__arrival_time__gt=start)
+    if end is not None:
+        rows = rows.filter(trip__departure_time__lt=end)
+    return rows
+
+
+def crew_timelines(rows):
+    """One IntervalTree of (departure, arrival, trip_id) per crew member."""
+    trips = defaultdict(list)
+    for crew_id, trip_id, departure_time, arrival_time in rows:
+        trips[crew_id].append((departure_time, arrival_time, trip_id))
+    return {crew_id: IntervalTree(intervals) for crew_id, intervals in trips.items()}
+
+
+def _conflict(crew_id, trip, other, rest):
+    """Describe how `other` clashes with `trip`, both (start, end, trip_id)."""
+    if other[0] < trip[1] and other[1] > trip[0]:
+        kind, gap = OVERLAP, None
+    else:
+        kind = SHORT_REST
+        gap = other[0] - trip[1] if other[0] >= trip[1] else trip[0] - other[1]
+    return {
+        "crew": crew_id,
+        "trip": trip[2],
+        "conflicting_trip": other[2],
+        "kind": kind,
+        "rest": gap,
+        "minimum_rest": rest,
+    }
+
+
+def find_conflicts(crew_ids, departure_time, arrival_time, trip_id=None, rest=None):
+    """
+    Assignments of `crew_ids` that clash with a trip running between the
+    given times: trips overlapping it, or leaving less than `rest` (the
+    MIN_REST_HOURS setting by default) before or after it. The trip being
+    edited, `trip_id`, is left out.
+    """
+    if not crew_ids:
+        return []
+    rest = minimum_rest() if rest is None else rest
+    start, end = departure_time - rest, arrival_time + rest
+    timelines = crew_timelines(crew_assignments(crew_ids, start, end))
+
+    trip = (departure_time, arrival_time, trip_id)
+    return [
+        _conflict(crew_id, trip, other, rest)
+        for crew_id in sorted(timelines)
+        for other in timelines[crew_id].overlapping(start, end)
+        if trip_id is None or other[2] != trip_id
+    ]
+
+
+def audit_crew_conflicts(start=None, end=None, rest=None):
+    """
+    Every pair of clashing assignments between `start` and `end`.
+
+    Loads the window in one query and builds a tree per crew member. Each
+    trip then looks up its neighbours within `rest`, which is
+    O(n log n + conflicts) rather than comparing every pair of trips.
+    """
+    rest = minimum_rest() if rest is None else rest
+    timelines = crew_timelines(crew_assignments(start=start, end=end))
+
+    conflicts = []
+    for crew_id in sorted(timelines):
+        timeline = timelines[crew_id]
+        for trip in timeline.intervals:
+            for other in timeline.overlapping(trip[0] - rest, trip[1] + rest):
+                # Report each pair once, from the earlier of the two trips.
+                if (other[0], other[2]) > (trip[0], trip[2]):
+                    conflicts.append(_conflict(crew_id, trip, other, rest))
+    return conflicts
+
+
+def describe_conflict(conflict):
+    if conflict["kind"] == OVERLAP:
+        return (
+            f"Crew member {conflict['crew']} is already on trip "
+            f"{conflict['conflicting_trip']} at that time."
+        )
+    return (
+        f"Crew member {conflict['crew']} would rest only {conflict['rest']} "
+        f"next to trip {conflict['conflicting_trip']}; the minimum is "
+        f"{conflict['minimum_rest']}."
+    )
@@ -0,0 +1,199 @@
+import math
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+from railway.geo import EARTH_RADIUS_KM
+from railway.models import Route, Station
+
+STATION_DISTANCES_DEFAULTS = {
+    "TTL": 300,
+    "MATRIX": False,
+    "MAX_MATRIX_STATIONS": 2000,
+    "TOLERANCE_KM": 1.0,
+}
+
+DIAMETER_KM = 2 * EARTH_RADIUS_KM
+
+
+def station_distances_setting(name):
+    return getattr(settings, "STATION_DISTANCES", {}).get(
+        name, STATION_DISTANCES_DEFAULTS[name]
+    )
+
+
+class StationCoordinates:
+    """
+    Stations as unit vectors on the sphere, held in parallel arrays by id.
+
+    The trigonometry is done once per station. The great-circle distance
+    of a pair then follows from the straight-line chord between the two
+    vectors, d = 2R * asin(chord / 2), which is the haversine formula
+    (railway.geo.haversine_km) without any sines or cosines per pair.
+    """
+
+    def __init__(self, rows):
+        self.ids = array("q")
+        self.xs, self.ys, self.zs = array("d"), array("d"), array("d")
+        for station_id, latitude, longitude in rows:
+            latitude, longitude = math.radians(latitude), math.radians(longitude)
+            self.ids.append(station_id)
+            self.xs.append(math.cos(latitude) * math.cos(longitude))
+            self.ys.append(math.cos(latitude) * math.sin(longitude))
+            self.zs.append(math.sin(latitude))
+        self.positions = {
+            station_id: index for index, station_id in enumerate(self.ids)
+        }
+
+    @classmethod
+    def from_db(cls):
+        return cls(
+            Station.objects.order_by("id").values_list("id", "latitude", "longitude")
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _row(self, i, start):
+        """Distances from station `i` to every station from `start` on."""
+        xs, ys, zs = self.xs, self.ys, self.zs
+        xi, yi, zi = xs[i], ys[i], zs[i]
+        asin, sqrt = math.asin, math.sqrt
+        return (
+            DIAMETER_KM
+            * asin(min(1.0, sqrt((xi - x) ** 2 + (yi - y) ** 2 + (zi - z) ** 2) / 2))
+            for x, y, z in zip(xs[start:], ys[start:], zs[start:])
+        )
+
+    def distances(self, pairs):
+        """Kilometres between each (source_id, destination_id) pair."""
+        xs, ys, zs, positions = self.xs, self.ys, self.zs, self.positions
+        asin, sqrt = math.asin, math.sqrt
+        distances = []
+        for source, destination in pairs:
+            i, j = positions[source], positions[destination]
+            chord = sqrt(
+                (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2 + (zs[i] - zs[j]) ** 2
+            )
+            distances.append(DIAMETER_KM * asin(min(1.0, chord / 2)))
+        return distances
+
+    def distance(self, source_id, destination_id):
+        return self.distances([(source_id, destination_id)])[0]
+
+    def matrix(self):
+        """Condensed upper triangle of the pairwise distance matrix."""
+        matrix = array("d")
+        for i in range(len(self)):
+            matrix.extend(self._row(i, i + 1))
+        return matrix
+
+    def pairs(self):
+        """Every unordered (source_id, destination_id, distance) triple."""
+        ids = self.ids
+        for i in range(len(self)):
+            for j, distance in enumerate(self._row(i, i + 1), start=i + 1):
+                yield ids[i], ids[j], distance
+
+
+def _condensed_index(i, j, count):
+    if i > j:
+        i, j = j, i
+    return i * count - i * (i + 1) // 2 + j - i - 1
+
+
+class StationDistances:
+    """
+    Process-wide great-circle distances between stations.
+
+    Coordinates are loaded once and reloaded after TTL seconds or when a
+    station changes (railway.signals). With MATRIX on, every pair is
+    computed up front, up to MAX_MATRIX_STATIONS stations, and a lookup
+    becomes an array read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (coordinates, matrix), replaced as a whole so readers never see
+        # a matrix from one load with the coordinates of another.
+        self._loaded = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = None
+
+    def _is_stale(self, loaded):
+        return loaded is None or (
+            time.monotonic() - self._loaded_at > station_distances_setting("TTL")
+        )
+
+    def _load(self):
+        loaded = self._loaded
+        if self._is_stale(loaded):
+            with self._lock:
+                loaded = self._loaded
+                if self._is_stale(loaded):
+                    coordinates = StationCoordinates.from_db()
+                    matrix = None
+                    if station_distances_setting("MATRIX") and len(
+                        coordinates
+                    ) <= station_distances_setting("MAX_MATRIX_STATIONS"):
+                        matrix = coordinates.matrix()
+                    loaded = self._loaded = (coordinates, matrix)
+                    self._loaded_at = time.monotonic()
+        return loaded
+
+    def distance(self, source_id, destination_id):
+        """Kilometres between two stations; KeyError for an unknown id."""
+        coordinates, matrix = self._load()
+        if matrix is None:
+            return coordinates.distance(source_id, destination_id)
+        i, j = coordinates.positions[source_id], coordinates.positions[destination_id]
+        if i == j:
+            return 0.0
+        return matrix[_condensed_index(i, j, len(coordinates))]
+
+
+station_distances = StationDistances()
+
+
+def check_route_distances(tolerance_km=None, routes=None):
+    """
+    Compare stored route distances with the stations' coordinates.
+
+    Returns the number of routes checked and a dict for each one whose
+    stored distance is more than `tolerance_km` off the great-circle one.
+    """
+    if tolerance_km is None:
+        tolerance_km = station_distances_setting("TOLERANCE_KM")
+    rows = list(
+        (Route.objects.all() if routes is None else routes)
+        .order_by("id")
+        .values_list(
+            "id",
+            "source_id",
+            "destination_id",
+            "source__name",
+            "destination__name",
+            "distance",
+        )
+    )
+    coordinates = StationCoordinates.from_db()
+    computed = coordinates.distances((row[1], row[2]) for row in rows)
+
+    mismatches = [
+        {
+            "id": route_id,
+            "name": f"{source_name} - {destination_name}",
+            "stored": stored,
+            "computed": distance,
+        }
+        for (route_id, _, _, source_name, destination_name, stored), distance in zip(
+            rows, computed
+        )
+        if abs(stored - distance) > tolerance_km
+    ]
+    return len(rows), mismatches
@@ -0,0 +1,94 @@
+import csv
+import json
+
+from django.db.models import F
+
+from railway.models import Ticket
+
+MANIFEST_FORMATS = ("csv", "ndjson")
+MANIFEST_CHUNK_SIZE = 2000
+
+MANIFEST_COLUMNS = (
+    "trip_id",
+    "departure_time",
+    "arrival_time",
+    "source",
+    "destination",
+    "train",
+    "cargo",
+    "seat",
+    "ticket_id",
+    "order_id",
+    "ordered_at",
+    "email",
+    "first_name",
+    "last_name",
+)
+
+MANIFEST_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    """File-like object that hands back what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def manifest_queryset(trip_id=None, date=None):
+    queryset = Ticket.objects.all()
+
+    if trip_id is not None:
+        queryset = queryset.filter(trip_id=trip_id)
+    if date is not None:
+        queryset = queryset.filter(trip__departure_time__date=date)
+
+    return (
+        queryset.order_by("trip__departure_time", "trip_id", "cargo", "seat")
+        .annotate(
+            departure_time=F("trip__departure_time"),
+            arrival_time=F("trip__arrival_time"),
+            source=F("trip__route__source__name"),
+            destination=F("trip__route__destination__name"),
+            train=F("trip__train__name"),
+            ticket_id=F("id"),
+            ordered_at=F("order__created_at"),
+            email=F("order__user__email"),
+            first_name=F("order__user__first_name"),
+            last_name=F("order__user__last_name"),
+        )
+        .values_list(*MANIFEST_COLUMNS)
+    )
+
+
+def iter_manifest_rows(queryset, chunk_size=MANIFEST_CHUNK_SIZE):
+    """Stream rows through a server-side cursor, chunk_size rows at a time."""
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _to_text(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(MANIFEST_COLUMNS)
+    for row in rows:
+        yield writer.writerow([_to_text(value) for value in row])
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        record = dict(zip(MANIFEST_COLUMNS, (_to_text(value) for value in row)))
+        yield json.dumps(record) + "\n"
+
+
+def render_manifest(rows, file_format):
+    if file_format == "ndjson":
+        return iter_ndjson(rows)
+    return iter_csv(rows)
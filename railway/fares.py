@@ -0,0 +1,164 @@
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.cache import caches
+
+from railway.models import FareRule
+from railway.pricing import price_tiers
+
+FARES_DEFAULTS = {
+    "CACHE": "default",
+    "TTL": 60,
+}
+
+FARE_VERSION_KEY = "railway:fares:version"
+CENT = Decimal("0.01")
+
+
+def fares_setting(name):
+    return getattr(settings, "FARES", {}).get(name, FARES_DEFAULTS[name])
+
+
+def _cache():
+    return caches[fares_setting("CACHE")]
+
+
+def bump_fare_version():
+    """Make every process rebuild its fare table on its next quote."""
+    _cache().set(FARE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def current_fare_version():
+    cache = _cache()
+    cache.add(FARE_VERSION_KEY, uuid.uuid4().hex, None)
+    return cache.get(FARE_VERSION_KEY)
+
+
+class FareTable:
+    """
+    Fare rules compiled for lookups by (train type, distance, price tier).
+
+    Each train type maps to the sorted band starts and their (base, per_km)
+    terms, so a quote is one bisect. Distances below a train type's first
+    band fall back to the default rules (train type None). The base fare is then scaled by the
+    multiplier of the trip's stored price tier (railway.pricing). Quotes
+    are memoized per (train type, distance, tier), which is all a fare
+    depends on, so pricing a page of trips is a few dict reads.
+    """
+
+    def __init__(self, rules, version=None, multipliers=None):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.multipliers = multipliers or (Decimal(1),)
+        bands = {}
+        for train_type_id, min_distance, base_fare, per_km in sorted(
+            rules, key=itemgetter(1)
+        ):
+            starts, terms = bands.setdefault(train_type_id, ([], []))
+            starts.append(min_distance)
+            terms.append((base_fare, per_km))
+        self.bands = bands
+        self._quotes = {}
+
+    @classmethod
+    def from_db(cls, version=None):
+        return cls(
+            FareRule.objects.values_list(
+                "train_type_id", "min_distance", "base_fare", "per_km"
+            ),
+            version,
+            price_tiers()[1],
+        )
+
+    def _terms(self, train_type_id, distance):
+        """(base, per_km) of the band covering `distance`, or None."""
+        for bands in (self.bands.get(train_type_id), self.bands.get(None)):
+            if bands is not None:
+                starts, terms = bands
+                index = bisect_right(starts, distance) - 1
+                if index >= 0:
+                    return terms[index]
+        return None
+
+    def _compute(self, train_type_id, distance, tier):
+        terms = self._terms(train_type_id, distance)
+        if terms is None:
+            return None
+        base_fare, per_km = terms
+        multiplier = self.multipliers[min(tier, len(self.multipliers) - 1)]
+        return ((base_fare + per_km * distance) * multiplier).quantize(
+            CENT, ROUND_HALF_UP
+        )
+
+    def quote(self, train_type_id, distance, tier=0):
+        """Fare for `distance` km on a train type, or None if no rule covers it."""
+        key = (train_type_id, distance, tier)
+        try:
+            return self._quotes[key]
+        except KeyError:
+            fare = self._quotes[key] = self._compute(train_type_id, distance, tier)
+            return fare
+
+    def trip_fare(self, trip):
+        return self.quote(
+            trip.train.train_type_id, trip.route.distance, trip.price_tier
+        )
+
+
+class Fares:
+    """
+    Process-wide FareTable, rebuilt when the fare version changes or the
+    table is older than FARES["TTL"] seconds.
+
+    The version lives in the FARES["CACHE"] cache and is replaced whenever
+    a rule is saved or deleted (railway.signals). With a shared cache every
+    worker picks up new fares on its next quote; with the default
+    per-process LocMemCache only the worker that saved the rule does, and
+    the others within the TTL. Checking is one cache read per current()
+    call, made once per request or page rather than per trip.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = None
+
+    def invalidate(self):
+        with self._lock:
+            self._table = None
+
+    @staticmethod
+    def _is_stale(table, version):
+        return (
+            table is None
+            or table.version != version
+            or time.monotonic() - table.loaded_at > fares_setting("TTL")
+        )
+
+    def current(self):
+        version = current_fare_version()
+        table = self._table
+        if self._is_stale(table, version):
+            with self._lock:
+                table = self._table
+                if self._is_stale(table, version):
+                    table = self._table = FareTable.from_db(version)
+        return table
+
+    def trip_fare(self, trip):
+        return self.current().trip_fare(trip)
+
+
+fares = Fares()
+
+
+def attach_fares(trips):
+    """Set `fare` on each trip from one snapshot of the fare table."""
+    table = fares.current()
+    for trip in trips:
+        trip.fare = table.trip_fare(trip)
+    return trips
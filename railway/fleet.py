@@ -0,0 +1,48 @@
+from django.contrib.postgres.fields import RangeBoundary
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange, NumericRange
+
+from railway.models import Int8Range, Train, Trip, trip_period
+
+
+def _train_range(train_id):
+    return NumericRange(train_id, train_id, "[]")
+
+
+def trips_running(start, end):
+    """
+    Trips running at any moment of [start, end).
+
+    The filter repeats the expressions of the exclude_train_double_booking
+    constraint, so Postgres answers it from that constraint's GiST index.
+    """
+    return Trip.objects.alias(period=trip_period()).filter(
+        period__overlap=DateTimeTZRange(start, end)
+    )
+
+
+def train_trips_running(train_id, start, end):
+    return (
+        trips_running(start, end)
+        .alias(
+            train_range=Int8Range(
+                "train",
+                "train",
+                RangeBoundary(inclusive_lower=True, inclusive_upper=True),
+            )
+        )
+        .filter(train_range=_train_range(train_id))
+    )
+
+
+def find_train_conflict(train_id, departure_time, arrival_time, trip_id=None):
+    """Id of a trip that already has the train in that window, if any."""
+    trips = train_trips_running(train_id, departure_time, arrival_time)
+    if trip_id is not None:
+        trips = trips.exclude(pk=trip_id)
+    return trips.values_list("id", flat=True).first()
+
+
+def available_trains(start, end, trains=None):
+    """Trains with no trip at any moment of [start, end)."""
+    trains = Train.objects.all() if trains is None else trains
+    return trains.exclude(id__in=trips_running(start, end).values("train_id"))
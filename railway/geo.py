@@ -0,0 +1,154 @@
+import heapq
+import math
+from operator import itemgetter
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = EARTH_RADIUS_KM * math.pi / 180
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision):
+    """(height, width) of a geohash cell in degrees."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def geohash_neighbourhood(latitude, longitude, precision):
+    """The cell containing the point and the (up to) 8 cells around it."""
+    height, width = geohash_cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        cell_lat = latitude + lat_step * height
+        if not -90 <= cell_lat <= 90:
+            continue
+        for lon_step in (-1, 0, 1):
+            cell_lon = (longitude + lon_step * width + 180) % 360 - 180
+            cells.add(geohash_encode(cell_lat, cell_lon, precision))
+    return cells
+
+
+def meridian_distance_km(latitude, lon_delta):
+    """Lower bound on the distance to any point `lon_delta` degrees away."""
+    lon_delta = abs(lon_delta)
+    if lon_delta >= 90:
+        return 0.0
+    return EARTH_RADIUS_KM * math.asin(
+        abs(math.cos(math.radians(latitude))) * math.sin(math.radians(lon_delta))
+    )
+
+
+class KDTree:
+    """
+    Static 2-d tree over (latitude, longitude, payload) points.
+
+    Nodes live in one list: each range is sorted on its split axis and its
+    median is the node, so no node objects are allocated. Nearest-neighbour
+    search prunes a subtree when a lower bound on the great-circle distance
+    to its side of the split exceeds the current k-th best. Splits are on
+    plain degrees, so neighbours across the antimeridian are not found.
+    """
+
+    def __init__(self, points):
+        self.points = list(points)
+        stack = [(0, len(self.points), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= 1:
+                continue
+            self.points[lo:hi] = sorted(self.points[lo:hi], key=itemgetter(axis))
+            middle = (lo + hi) // 2
+            stack.append((lo, middle, 1 - axis))
+            stack.append((middle + 1, hi, 1 - axis))
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, latitude, longitude, k, max_distance_km=None):
+        """Return up to k (distance_km, point) pairs sorted by distance."""
+        points = self.points
+        limit = math.inf if max_distance_km is None else max_distance_km
+        best = []
+
+        def search(lo, hi, axis):
+            if lo >= hi:
+                return
+            middle = (lo + hi) // 2
+            point = points[middle]
+            distance = haversine_km(latitude, longitude, point[0], point[1])
+            if distance <= limit:
+                entry = (-distance, middle)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+            delta = (latitude if axis == 0 else longitude) - point[axis]
+            if delta < 0:
+                near, far = (lo, middle), (middle + 1, hi)
+            else:
+                near, far = (middle + 1, hi), (lo, middle)
+            search(*near, 1 - axis)
+
+            if axis == 0:
+                bound = abs(delta) * KM_PER_DEGREE_LAT
+            else:
+                bound = meridian_distance_km(latitude, delta)
+            worst = -best[0][0] if len(best) == k else limit
+            if bound <= worst:
+                search(*far, 1 - axis)
+
+        search(0, len(points), 0)
+        return [
+            (-distance, points[index]) for distance, index in sorted(best, reverse=True)
+        ]
+
+    def within(self, min_lat, min_lon, max_lat, max_lon):
+        """Return every point inside the box, edges included."""
+        points, found = self.points, []
+        low, high = (min_lat, min_lon), (max_lat, max_lon)
+        stack = [(0, len(points), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if lo >= hi:
+                continue
+            middle = (lo + hi) // 2
+            point = points[middle]
+            if min_lat <= point[0] <= max_lat and min_lon <= point[1] <= max_lon:
+                found.append(point)
+            if low[axis] <= point[axis]:
+                stack.append((lo, middle, 1 - axis))
+            if point[axis] <= high[axis]:
+                stack.append((middle + 1, hi, 1 - axis))
+        return found
@@ -0,0 +1,84 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from railway.models import Train
+from railway.uploads import content_digest
+
+IMAGE_VARIANTS_DIR = "uploads/trains/variants/"
+
+# name -> (max width, Pillow format, file extension)
+IMAGE_VARIANTS = {
+    "thumbnail": (160, "JPEG", "jpg"),
+    "medium": (640, "JPEG", "jpg"),
+    "webp": (640, "WEBP", "webp"),
+}
+
+
+def variant_name(digest, variant, extension):
+    return os.path.join(IMAGE_VARIANTS_DIR, f"{digest[:32]}-{variant}.{extension}")
+
+
+def _encode(image, width, image_format):
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=82, optimize=True)
+    return image.size, buffer.getvalue()
+
+
+def build_image_variants(image_field, force=False):
+    """
+    Render every variant of an uploaded image and return their metadata.
+
+    Files are named after the hash of the original content, so identical
+    originals share variants and rendering is skipped when they exist,
+    unless `force` asks for them to be rendered again.
+    """
+    storage = image_field.storage
+    with image_field.open("rb") as original:
+        digest = content_digest(original)
+        names = {
+            variant: variant_name(digest, variant, extension)
+            for variant, (_, _, extension) in IMAGE_VARIANTS.items()
+        }
+        with Image.open(original) as image:
+            image.load()
+            source = image.copy()
+
+    variants = {}
+    for variant, (width, image_format, _) in IMAGE_VARIANTS.items():
+        name = names[variant]
+        if force and storage.exists(name):
+            storage.delete(name)
+        if storage.exists(name):
+            with storage.open(name, "rb") as existing, Image.open(existing) as image:
+                size = image.size
+        else:
+            size, content = _encode(source, width, image_format)
+            name = storage.save(name, ContentFile(content))
+        variants[variant] = {
+            "name": name,
+            "width": size[0],
+            "height": size[1],
+            "format": image_format.lower(),
+        }
+    return variants
+
+
+def build_train_image_variants(train_id, force=False):
+    train = Train.objects.filter(id=train_id).first()
+    if train is None or not train.image:
+        return {}
+
+    variants = build_image_variants(train.image, force)
+    Train.objects.filter(id=train.id, image=train.image.name).update(
+        image_variants=variants
+    )
+    return variants
@@ -0,0 +1,464 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from railway.geo import geohash_encode
+from railway.models import Station, Route, Crew, Trip, TrainType, Train
+from railway.autocomplete import station_autocomplete
+from railway.availability import invalidate_departures
+from railway.distances import station_distances
+from railway.fleet import trips_running
+from railway.intervals import IntervalTree
+from railway.routes import route_lookup
+from railway.stations import station_index
+
+TIMETABLE_SECTIONS = ("stations", "trains", "crew", "routes", "trips")
+IMPORT_BATCH_SIZE = 1000
+CREW_SEPARATOR = ";"
+
+
+class TimetableImportError(Exception):
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _iter_csv(section, open_member):
+    try:
+        with open_member() as raw:
+            yield from csv.DictReader(
+                io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            )
+    except (csv.Error, UnicodeDecodeError, zipfile.BadZipFile) as error:
+        raise TimetableImportError([f"{section}.csv is not valid UTF-8 CSV: {error}"])
+
+
+@contextmanager
+def read_bundle(source, name=None):
+    """
+    Context manager yielding {section: iterable of row dicts} for a bundle.
+
+    A bundle is a .json file with one list per section, or a directory or
+    .zip archive holding one <section>.csv file per section. CSV sections
+    are read lazily, row by row, so the rows must be consumed before the
+    context exits and the archive is closed.
+    """
+    name = name or getattr(source, "name", None) or str(source)
+
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        paths = {
+            section: os.path.join(source, f"{section}.csv")
+            for section in TIMETABLE_SECTIONS
+        }
+        yield {
+            section: _iter_csv(section, lambda path=path: open(path, "rb"))
+            for section, path in paths.items()
+            if os.path.exists(path)
+        }
+        return
+
+    if name.endswith(".json"):
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                with open(source, encoding="utf-8") as file:
+                    data = json.load(file)
+            else:
+                data = json.load(source)
+        except (json.JSONDecodeError, UnicodeDecodeError) as error:
+            raise TimetableImportError([f"Bundle is not valid UTF-8 JSON: {error}"])
+        if not isinstance(data, dict):
+            raise TimetableImportError(["JSON bundle must be an object of sections."])
+        invalid = [
+            section
+            for section in TIMETABLE_SECTIONS
+            if not isinstance(data.get(section, []), list)
+        ]
+        if invalid:
+            raise TimetableImportError(
+                [f"{section} must be a list of rows." for section in invalid]
+            )
+        yield {section: data.get(section, []) for section in TIMETABLE_SECTIONS}
+        return
+
+    if name.endswith(".zip"):
+        try:
+            archive = zipfile.ZipFile(source)
+        except zipfile.BadZipFile:
+            raise TimetableImportError(["Bundle is not a valid zip archive."])
+        with archive:
+            members = {
+                os.path.basename(member): member for member in archive.namelist()
+            }
+            yield {
+                section: _iter_csv(
+                    section,
+                    lambda member=members[f"{section}.csv"]: archive.open(member),
+                )
+                for section in TIMETABLE_SECTIONS
+                if f"{section}.csv" in members
+            }
+        return
+
+    raise TimetableImportError(
+        ["Unsupported bundle: expected a .json file, a .zip archive or a directory."]
+    )
+
+
+def _parse_datetime(value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class TimetableImporter:
+    """
+    Upsert a timetable bundle with bulk queries.
+
+    References between sections are resolved through in-memory maps keyed
+    by natural keys (station name, train name, crew full name, route
+    endpoints, trip route/train/departure), so re-importing a bundle updates
+    rows instead of duplicating them. The whole import runs in a single
+    transaction and is rolled back if any row is invalid.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.errors = []
+        self.stats = {
+            section: {"created": 0, "updated": 0} for section in TIMETABLE_SECTIONS
+        }
+
+    def run(self, bundle):
+        with transaction.atomic():
+            self._load_registries()
+            for section in TIMETABLE_SECTIONS:
+                rows = enumerate(bundle.get(section, ()), start=1)
+                for batch in _batched(rows, self.batch_size):
+                    getattr(self, f"_import_{section}")(self._objects(section, batch))
+                if self.errors:
+                    raise TimetableImportError(self.errors)
+        return self.stats
+
+    def _load_registries(self):
+        self.stations = {}
+        for station in Station.objects.all():
+            self.stations.setdefault(station.name, station)
+        self.train_types = {}
+        for train_type in TrainType.objects.all():
+            self.train_types.setdefault(train_type.name, train_type)
+        self.trains = {}
+        for train in Train.objects.all():
+            self.trains.setdefault(train.name, train)
+        self.crew = {}
+        for crew in Crew.objects.all():
+            self.crew.setdefault(crew.full_name, crew)
+        self.routes = {}
+        for route in Route.objects.all():
+            self.routes.setdefault((route.source_id, route.destination_id), route)
+
+    def _error(self, section, line, message):
+        self.errors.append(f"{section} row {line}: {message}")
+
+    def _objects(self, section, batch):
+        """Rows of a batch that are objects; the others are reported."""
+        rows = []
+        for line, row in batch:
+            if isinstance(row, dict):
+                rows.append((line, row))
+            else:
+                self._error(section, line, "row must be an object")
+        return rows
+
+    def _upsert(self, registry, key, model, values, new, changed):
+        obj = registry.get(key)
+        if obj is None:
+            obj = model(**values)
+            registry[key] = obj
+            new.append(obj)
+        elif any(getattr(obj, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(obj, field, value)
+            if obj.pk is not None:
+                changed[id(obj)] = obj
+        return obj
+
+    def _save(self, section, model, new, changed, fields):
+        model.objects.bulk_create(new, batch_size=self.batch_size)
+        if changed:
+            model.objects.bulk_update(
+                list(changed.values()), fields, batch_size=self.batch_size
+            )
+        self.stats[section]["created"] += len(new)
+        self.stats[section]["updated"] += len(changed)
+
+    def _import_stations(self, batch):
+        new, changed = [], {}
+        for line, row in batch:
+            try:
+                name = row["name"].strip()
+                latitude, longitude = float(row["latitude"]), float(row["longitude"])
+                values = {
+                    "name": name,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "geohash": geohash_encode(latitude, longitude),
+                }
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self._error("stations", line, "name, latitude and longitude required")
+                continue
+            self._upsert(self.stations, name, Station, values, new, changed)
+        self._save(
+            "stations", Station, new, changed, ("latitude", "longitude", "geohash")
+        )
+        if new or changed:
+            transaction.on_commit(station_index.invalidate)
+            transaction.on_commit(station_autocomplete.invalidate)
+            transaction.on_commit(station_distances.invalidate)
+
+    @staticmethod
+    def _train_type_name(row):
+        value = row.get("train_type")
+        return "" if value is None else str(value).strip()
+
+    def _import_trains(self, batch):
+        missing_types = {
+            self._train_type_name(row)
+            for _, row in batch
+            if self._train_type_name(row) not in self.train_types
+        }
+        missing_types.discard("")
+        new_types = [TrainType(name=name) for name in sorted(missing_types)]
+        TrainType.objects.bulk_create(new_types)
+        self.train_types.update(
+            (train_type.name, train_type) for train_type in new_types
+        )
+
+        new, changed = [], {}
+        for line, row in batch:
+            try:
+                name = row["name"].strip()
+                values = {
+                    "name": name,
+                    "cargo_num": int(row["cargo_num"]),
+                    "places_in_cargo": int(row["places_in_cargo"]),
+                    "train_type_id": self.train_types[self._train_type_name(row)].pk,
+                }
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self._error(
+                    "trains",
+                    line,
+                    "name, train_type, cargo_num and places_in_cargo required",
+                )
+                continue
+            if values["cargo_num"] < 1 or values["places_in_cargo"] < 1:
+                self._error("trains", line, "cargo_num and places_in_cargo must be > 0")
+                continue
+            self._upsert(self.trains, name, Train, values, new, changed)
+        self._save(
+            "trains",
+            Train,
+            new,
+            changed,
+            ("cargo_num", "places_in_cargo", "train_type_id"),
+        )
+
+    def _import_crew(self, batch):
+        new, changed = [], {}
+        for line, row in batch:
+            try:
+                values = {
+                    "first_name": row["first_name"].strip(),
+                    "last_name": row["last_name"].strip(),
+                    "position": (row.get("position") or "").strip(),
+                }
+            except (KeyError, AttributeError):
+                self._error("crew", line, "first_name and last_name required")
+                continue
+            key = f"{values['first_name']} {values['last_name']}"
+            self._upsert(self.crew, key, Crew, values, new, changed)
+        self._save("crew", Crew, new, changed, ("position",))
+
+    def _resolve_route_stations(self, section, line, row):
+        source = self.stations.get(str(row.get("source", "")).strip())
+        destination = self.stations.get(str(row.get("destination", "")).strip())
+        if source is None or destination is None:
+            self._error(section, line, "unknown source or destination station")
+            return None
+        return source.pk, destination.pk
+
+    def _import_routes(self, batch):
+        new, changed = [], {}
+        for line, row in batch:
+            key = self._resolve_route_stations("routes", line, row)
+            if key is None:
+                continue
+            try:
+                distance = int(row["distance"])
+            except (KeyError, TypeError, ValueError):
+                self._error("routes", line, "distance must be an integer")
+                continue
+            values = {
+                "source_id": key[0],
+                "destination_id": key[1],
+                "distance": distance,
+            }
+            self._upsert(self.routes, key, Route, values, new, changed)
+        self._save("routes", Route, new, changed, ("distance",))
+        if new:
+            transaction.on_commit(route_lookup.invalidate)
+
+    def _import_trips(self, batch):
+        departures = [_parse_datetime(row.get("departure_time")) for _, row in batch]
+        arrivals = [_parse_datetime(row.get("arrival_time")) for _, row in batch]
+        invalid_times = {
+            index
+            for index, (departure, arrival) in enumerate(zip(departures, arrivals))
+            if departure is None or arrival is None or arrival <= departure
+        }
+
+        parsed = []
+        for index, (line, row) in enumerate(batch):
+            if index in invalid_times:
+                self._error(
+                    "trips",
+                    line,
+                    "departure_time and arrival_time must be valid datetimes, "
+                    "with arrival later than departure",
+                )
+                continue
+            route_key = self._resolve_route_stations("trips", line, row)
+            if route_key is None:
+                continue
+            route = self.routes.get(route_key)
+            train = self.trains.get(str(row.get("train", "")).strip())
+            if route is None or train is None:
+                self._error("trips", line, "unknown route or train")
+                continue
+            crew_ids = self._resolve_crew(line, row.get("crew"))
+            if crew_ids is None:
+                continue
+            parsed.append(
+                (line, route.pk, train.pk, departures[index], arrivals[index], crew_ids)
+            )
+
+        if not parsed:
+            return
+
+        existing = {
+            (trip.route_id, trip.train_id, trip.departure_time): trip
+            for trip in Trip.objects.filter(
+                route_id__in={item[1] for item in parsed},
+                departure_time__in={item[3] for item in parsed},
+            )
+        }
+        new, changed, crew_by_trip = [], {}, []
+        for line, route_id, train_id, departure, arrival, crew_ids in parsed:
+            values = {
+                "route_id": route_id,
+                "train_id": train_id,
+                "departure_time": departure,
+                "arrival_time": arrival,
+            }
+            trip = self._upsert(
+                existing, (route_id, train_id, departure), Trip, values, new, changed
+            )
+            crew_by_trip.append((trip, crew_ids, line))
+        if not self._check_train_bookings(crew_by_trip):
+            return
+        self._save("trips", Trip, new, changed, ("arrival_time",))
+        if new:
+            transaction.on_commit(
+                partial(
+                    invalidate_departures,
+                    [(trip.route_id, trip.departure_time) for trip in new],
+                )
+            )
+
+        through = Trip.crew.through
+        through.objects.filter(
+            trip_id__in={trip.pk for trip, _, _ in crew_by_trip}
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(
+                    trip_id=trip.pk,
+                    crew_id=crew_id,
+                    departure_time=trip.departure_time,
+                )
+                for trip, crew_ids, _ in crew_by_trip
+                for crew_id in crew_ids
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def _check_train_bookings(self, trips):
+        """
+        Report rows that would put a train on two trips at once, against
+        both the database and the other rows, before the insert trips the
+        exclusion constraint.
+        """
+        # A row repeating an earlier one updates the same trip.
+        trips = list({id(trip): (trip, _, line) for trip, _, line in trips}.values())
+        written = {trip.pk for trip, _, _ in trips if trip.pk is not None}
+        bookings = defaultdict(list)
+        for trip_id, train_id, departure, arrival in (
+            trips_running(
+                min(trip.departure_time for trip, _, _ in trips),
+                max(trip.arrival_time for trip, _, _ in trips),
+            )
+            .filter(train_id__in={trip.train_id for trip, _, _ in trips})
+            .exclude(pk__in=written)
+            .values_list("id", "train_id", "departure_time", "arrival_time")
+        ):
+            bookings[train_id].append((departure, arrival, f"trip {trip_id}"))
+        for trip, _, line in trips:
+            bookings[trip.train_id].append(
+                (trip.departure_time, trip.arrival_time, f"trips row {line}")
+            )
+        timelines = {
+            train_id: IntervalTree(items) for train_id, items in bookings.items()
+        }
+
+        valid = True
+        for trip, _, line in trips:
+            for _, _, other in timelines[trip.train_id].overlapping(
+                trip.departure_time, trip.arrival_time
+            ):
+                if other != f"trips row {line}":
+                    self._error(
+                        "trips", line, f"train is already assigned to {other} then"
+                    )
+                    valid = False
+                    break
+        return valid
+
+    def _resolve_crew(self, line, value):
+        if not value:
+            return set()
+        names = value if isinstance(value, list) else value.split(CREW_SEPARATOR)
+        crew_ids = set()
+        for name in names:
+            crew = self.crew.get(name.strip())
+            if crew is None:
+                self._error("trips", line, f"unknown crew member {name.strip()!r}")
+                return None
+            crew_ids.add(crew.pk)
+        return crew_ids
@@ -0,0 +1,60 @@
+from operator import itemgetter
+
+
+class IntervalTree:
+    """
+    Static interval tree over (start, end, payload) tuples.
+
+    Intervals are sorted by start and kept in one list. The middle of each
+    range is a node, as in railway.geo.KDTree, and `max_end[i]` holds the
+    latest end in the subtree rooted at i. A search skips a subtree when
+    everything in it ends before the query starts, or when its starts are
+    past the query end. Intervals are half-open, so one that ends exactly
+    when another starts does not overlap it.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = sorted(intervals, key=itemgetter(0))
+        self.max_end = [None] * len(self.intervals)
+        if not self.intervals:
+            return
+
+        # Post-order over the implicit tree, so children are done first.
+        stack, ordered = [(0, len(self.intervals))], []
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            middle = (lo + hi) // 2
+            ordered.append((lo, middle, hi))
+            stack.append((lo, middle))
+            stack.append((middle + 1, hi))
+        for lo, middle, hi in reversed(ordered):
+            latest = self.intervals[middle][1]
+            for child_lo, child_hi in ((lo, middle), (middle + 1, hi)):
+                if child_lo < child_hi:
+                    latest = max(latest, self.max_end[(child_lo + child_hi) // 2])
+            self.max_end[middle] = latest
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlapping(self, start, end):
+        """Every interval sharing time with [start, end), sorted by start."""
+        intervals, max_end, found = self.intervals, self.max_end, []
+        stack = [(0, len(intervals))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            middle = (lo + hi) // 2
+            if max_end[middle] <= start:
+                continue
+            stack.append((lo, middle))
+            interval = intervals[middle]
+            if interval[0] < end:
+                if interval[1] > start:
+                    found.append(interval)
+                stack.append((middle + 1, hi))
+        found.sort(key=itemgetter(0))
+        return found
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from railway.crew_scheduling import (
+    audit_crew_conflicts,
+    crew_scheduling_setting,
+    describe_conflict,
+)
+
+
+class Command(BaseCommand):
+    help = "Report overlapping crew assignments and minimum-rest violations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Only audit trips within this many days from now (default: all "
+            "upcoming trips)",
+        )
+        parser.add_argument(
+            "--include-past",
+            action="store_true",
+            help="Audit past trips as well",
+        )
+        parser.add_argument(
+            "--min-rest-hours",
+            type=float,
+            default=crew_scheduling_setting("MIN_REST_HOURS"),
+            help="Minimum rest between two trips of the same crew member",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        start = None if options["include_past"] else now
+        end = None if options["days"] is None else now + timedelta(days=options["days"])
+
+        conflicts = audit_crew_conflicts(
+            start, end, timedelta(hours=options["min_rest_hours"])
+        )
+        for conflict in conflicts:
+            self.stdout.write(f"Trip {conflict['trip']}: {describe_conflict(conflict)}")
+
+        crew = {conflict["crew"] for conflict in conflicts}
+        style = self.style.WARNING if conflicts else self.style.SUCCESS
+        self.stdout.write(
+            style(f"Conflicts: {len(conflicts)} across {len(crew)} crew members")
+        )
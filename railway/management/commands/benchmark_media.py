@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from modern_railway.media import serve_media
+
+BENCH_FILE_NAME = "uploads/trains/" + "0" * 64 + ".jpg"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare worker time spent delivering a media file through "
+        "django.views.static.serve, streaming and proxy handoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=float, default=4, dest="size_mb")
+        parser.add_argument("--requests", type=int, default=50)
+
+    @staticmethod
+    def _measure(view, request_count, **kwargs):
+        factory = RequestFactory()
+        wall = cpu = 0.0
+        for _ in range(request_count):
+            request = factory.get("/media/" + BENCH_FILE_NAME)
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            response = view(request, **kwargs)
+            # The worker is busy until the whole body has been written out.
+            for _chunk in response:
+                pass
+            response.close()
+            wall += time.perf_counter() - wall_start
+            cpu += time.process_time() - cpu_start
+        return wall / request_count * 1000, cpu / request_count * 1000
+
+    def handle(self, *args, **options):
+        request_count = options["requests"]
+        with tempfile.TemporaryDirectory() as media_root:
+            path = os.path.join(media_root, BENCH_FILE_NAME)
+            os.makedirs(os.path.dirname(path))
+            with open(path, "wb") as file:
+                file.write(os.urandom(int(options["size_mb"] * 1024 * 1024)))
+
+            cases = [
+                (
+                    "django.views.static.serve",
+                    None,
+                    serve,
+                    {"path": BENCH_FILE_NAME, "document_root": media_root},
+                ),
+                (
+                    "serve_media (streaming)",
+                    None,
+                    serve_media,
+                    {"path": BENCH_FILE_NAME},
+                ),
+                (
+                    "serve_media (X-Accel-Redirect)",
+                    "X-Accel-Redirect",
+                    serve_media,
+                    {"path": BENCH_FILE_NAME},
+                ),
+            ]
+
+            self.stdout.write(
+                f"{options['size_mb']} MB file, {request_count} requests per case"
+            )
+            self.stdout.write(f"{'case':<34}{'wall ms/req':>14}{'cpu ms/req':>14}")
+            for label, header, view, kwargs in cases:
+                with override_settings(
+                    MEDIA_ROOT=media_root, MEDIA_SENDFILE_HEADER=header
+                ):
+                    wall, cpu = self._measure(view, request_count, **kwargs)
+                self.stdout.write(f"{label:<34}{wall:>14.3f}{cpu:>14.3f}")
@@ -0,0 +1,123 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from railway.management.commands.serve import Command as ServeCommand
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError("Server exited before accepting connections")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not start listening on port {port}")
+
+
+def run_load(port, path, request_count, concurrency):
+    """Send requests over keep-alive connections; return (seconds, latencies)."""
+    latencies = []
+    lock = threading.Lock()
+    per_client = max(1, request_count // concurrency)
+
+    def client():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        timings = []
+        for _ in range(per_client):
+            started = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            timings.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(timings)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of `manage.py runserver` with "
+        "DEBUG on against `manage.py serve` with the production profile"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/schema/")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--workers", type=int, help="gunicorn worker processes")
+
+    def _servers(self, options):
+        manage = os.path.join(settings.BASE_DIR, "manage.py")
+        runserver_port, gunicorn_port = _free_port(), _free_port()
+        yield (
+            "runserver (DEBUG on)",
+            runserver_port,
+            [sys.executable, manage, "runserver", "--noreload", str(runserver_port)],
+            {"DJANGO_DEBUG": "1"},
+        )
+        yield (
+            "serve (gunicorn, DEBUG off)",
+            gunicorn_port,
+            ServeCommand.gunicorn_argv(
+                bind=f"127.0.0.1:{gunicorn_port}", workers=options["workers"]
+            ),
+            {"DJANGO_DEBUG": "0", "GUNICORN_ACCESSLOG": ""},
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"GET {options['path']}: {options['requests']} requests, "
+            f"{options['concurrency']} keep-alive clients"
+        )
+        self.stdout.write(f"{'server':<30}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for label, port, argv, env in self._servers(options):
+            process = subprocess.Popen(
+                argv,
+                cwd=settings.BASE_DIR,
+                env={**os.environ, **env},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_until_up(port, process)
+                # Warm up: first requests build caches and open connections.
+                run_load(port, options["path"], options["concurrency"] * 4, 4)
+                elapsed, latencies = run_load(
+                    port, options["path"], options["requests"], options["concurrency"]
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f"{label:<30}{len(latencies) / elapsed:>10.0f}"
+                f"{statistics.median(latencies) * 1000:>10.2f}{p99 * 1000:>10.2f}"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from modern_railway.health import is_draining, start_draining, stop_draining
+
+
+class Command(BaseCommand):
+    help = (
+        "Put the host in drain mode: /health/ready/ fails so no new traffic "
+        "is routed here while in-flight requests finish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--off", action="store_true", help="Leave drain mode and accept traffic"
+        )
+
+    def handle(self, *args, **options):
+        if options["off"]:
+            stop_draining()
+        else:
+            start_draining()
+        state = "draining" if is_draining() else "accepting traffic"
+        self.stdout.write(self.style.SUCCESS(f"Host is {state}"))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from railway.exports import (
+    MANIFEST_CHUNK_SIZE,
+    MANIFEST_FORMATS,
+    iter_manifest_rows,
+    manifest_queryset,
+    render_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = "Export the passenger manifest of a trip or of a whole day of trips"
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--trip", type=int, help="Trip id")
+        target.add_argument("--date", help="Departure date, YYYY-MM-DD")
+        parser.add_argument("--format", choices=MANIFEST_FORMATS, default="csv")
+        parser.add_argument(
+            "--output", help="File to write to (defaults to stdout)", default=None
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=MANIFEST_CHUNK_SIZE, dest="chunk_size"
+        )
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            try:
+                date = parse_date(options["date"])
+            except ValueError:
+                date = None
+            if not date:
+                raise CommandError("--date must be a valid date in YYYY-MM-DD format")
+            queryset = manifest_queryset(date=date)
+        else:
+            queryset = manifest_queryset(trip_id=options["trip"])
+
+        chunks = render_manifest(
+            iter_manifest_rows(queryset, chunk_size=options["chunk_size"]),
+            options["format"],
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from railway.images import build_train_image_variants
+from railway.models import Train
+
+
+def _build_variants(train_id, force=False):
+    try:
+        return train_id, bool(build_train_image_variants(train_id, force)), None
+    except Exception as error:
+        return train_id, False, str(error)
+
+
+def _build_variants_in_worker(train_id, force=False):
+    try:
+        return _build_variants(train_id, force)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Backfill resized and WebP variants for train images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Render variants again, replacing existing variant files",
+        )
+
+    def handle(self, *args, **options):
+        trains = Train.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["force"]:
+            trains = trains.filter(image_variants={})
+        train_ids = list(trains.values_list("id", flat=True))
+        force = options["force"]
+
+        built = failed = 0
+        if options["processes"] <= 1:
+            results = (_build_variants(train_id, force) for train_id in train_ids)
+            for train_id, ok, error in results:
+                built, failed = self._report(train_id, ok, error, built, failed)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(options["processes"]) as pool:
+                futures = [
+                    pool.submit(_build_variants_in_worker, train_id, force)
+                    for train_id in train_ids
+                ]
+                for future in as_completed(futures):
+                    built, failed = self._report(*future.result(), built, failed)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Variants built for {built} train(s), {failed} failed")
+        )
+
+    def _report(self, train_id, ok, error, built, failed):
+        if error:
+            self.stderr.write(f"Train {train_id}: {error}")
+            return built, failed + 1
+        return built + int(ok), failed
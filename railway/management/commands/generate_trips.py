@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from railway.models import TripSchedule
+from railway.schedules import SCHEDULE_HORIZON_DAYS, materialize_schedules
+
+
+class Command(BaseCommand):
+    help = "Materialize trips from recurring schedules for a rolling horizon"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=SCHEDULE_HORIZON_DAYS,
+            help="Number of days ahead to generate trips for",
+        )
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            action="append",
+            dest="schedules",
+            help="Only regenerate the given schedule id (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        schedules = None
+        if options["schedules"]:
+            schedules = TripSchedule.objects.filter(id__in=options["schedules"])
+
+        totals = materialize_schedules(options["days"], schedules)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Trips: {totals['created']} created, {totals['updated']} updated, "
+                f"{totals['deleted']} deleted, {totals['crew_updated']} re-crewed, "
+                f"{totals['kept']} kept off schedule because tickets were sold"
+            )
+        )
+        for schedule_id, errors in totals["failed"].items():
+            self.stderr.write(f"Schedule {schedule_id} failed: {' '.join(errors)}")
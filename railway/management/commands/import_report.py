@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What a worker does before it can serve its first request.
+BOOT_SCRIPT = (
+    "from modern_railway.wsgi import application\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def parse_importtime(output):
+    """Sum `python -X importtime` self times (µs) per top-level package."""
+    totals = defaultdict(int)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return dict(totals)
+
+
+def still_imported(totals):
+    """Packages of LEAN_SKIPPED_APPS that a lean boot imports anyway."""
+    packages = {app.split(".")[0] for app in settings.LEAN_SKIPPED_APPS}
+    packages.discard("django")
+    return sorted(packages & totals.keys())
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot a fresh worker under `python -X importtime` and report the "
+        "import time per top-level package, for the default and/or lean "
+        "startup profile"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile", choices=("default", "lean", "both"), default="both"
+        )
+        parser.add_argument("--top", type=int, default=15)
+
+    @staticmethod
+    def _boot(lean):
+        env = dict(os.environ)
+        env["DJANGO_LEAN_STARTUP"] = "1" if lean else "0"
+        env.setdefault("DJANGO_SETTINGS_MODULE", "modern_railway.settings")
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return time.perf_counter() - started, parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        profiles = (
+            ["default", "lean"]
+            if options["profile"] == "both"
+            else [options["profile"]]
+        )
+        for profile in profiles:
+            wall, totals = self._boot(lean=profile == "lean")
+            self.stdout.write(
+                f"{profile} profile: {wall * 1000:.0f} ms to boot, "
+                f"{sum(totals.values()) / 1000:.0f} ms importing "
+                f"{len(totals)} packages"
+            )
+            self.stdout.write(f"  {'package':<30}{'ms':>10}")
+            ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+            for name, micros in ranked[: options["top"]]:
+                self.stdout.write(f"  {name:<30}{micros / 1000:>10.1f}")
+            if profile == "lean":
+                for name in still_imported(totals):
+                    self.stdout.write(
+                        f"  {name} is a skipped app but still imported "
+                        f"({totals[name] / 1000:.1f} ms)"
+                    )
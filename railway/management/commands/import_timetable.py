@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from railway.importers import (
+    IMPORT_BATCH_SIZE,
+    TimetableImporter,
+    TimetableImportError,
+    read_bundle,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import stations, trains, crew, routes and trips from a .json file, "
+        "a .zip archive or a directory of CSV files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("bundle", help="Path to the timetable bundle")
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE, dest="batch_size"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with read_bundle(options["bundle"]) as bundle:
+                stats = TimetableImporter(batch_size=options["batch_size"]).run(bundle)
+        except TimetableImportError as error:
+            raise CommandError("\n".join(error.errors))
+        except OSError as error:
+            raise CommandError(str(error))
+
+        for section, counts in stats.items():
+            self.stdout.write(
+                f"{section}: {counts['created']} created, {counts['updated']} updated"
+            )
+        self.stdout.write(self.style.SUCCESS("Timetable imported"))
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from railway.pricing import dynamic_pricing_setting, recompute_price_tiers
+
+
+class Command(BaseCommand):
+    help = "Recompute the price tier of upcoming trips from their load factor"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=dynamic_pricing_setting("HORIZON_DAYS"),
+            help="Number of days ahead to reprice trips for",
+        )
+        parser.add_argument(
+            "--resync",
+            action="store_true",
+            help="Recount tickets sold per trip before repricing",
+        )
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        result = recompute_price_tiers(
+            start, start + timedelta(days=options["days"]), options["resync"]
+        )
+        tiers = ", ".join(
+            f"tier {tier}: {count}" for tier, count in sorted(result["tiers"].items())
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Trips: {result['trips']} priced, {result['changed']} changed tier"
+                + (f" ({tiers})" if tiers else "")
+            )
+        )
@@ -0,0 +1,71 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from railway.distances import (
+    StationCoordinates,
+    check_route_distances,
+    station_distances_setting,
+)
+from railway.models import Route
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute great-circle distances from station coordinates and flag "
+        "routes whose stored distance differs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=station_distances_setting("TOLERANCE_KM"),
+            help="Allowed difference in km before a route is flagged",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Overwrite flagged routes with the computed distance",
+        )
+        parser.add_argument(
+            "--pairs",
+            action="store_true",
+            help="Write every station pair and its distance as CSV instead",
+        )
+        parser.add_argument(
+            "--max-distance",
+            type=float,
+            help="With --pairs, only write pairs at most this many km apart",
+        )
+
+    def handle(self, *args, **options):
+        if options["pairs"]:
+            return self.write_pairs(options["max_distance"])
+
+        checked, mismatches = check_route_distances(options["tolerance"])
+        for route in mismatches:
+            self.stdout.write(
+                f"Route {route['id']} ({route['name']}): stored {route['stored']} km, "
+                f"computed {route['computed']:.1f} km"
+            )
+
+        if options["fix"] and mismatches:
+            Route.objects.bulk_update(
+                [
+                    Route(id=route["id"], distance=round(route["computed"]))
+                    for route in mismatches
+                ],
+                ["distance"],
+            )
+        action = "fixed" if options["fix"] else "flagged"
+        self.stdout.write(
+            self.style.SUCCESS(f"Routes: {checked} checked, {len(mismatches)} {action}")
+        )
+
+    def write_pairs(self, max_distance):
+        writer = csv.writer(self.stdout)
+        writer.writerow(["source", "destination", "distance"])
+        for source, destination, distance in StationCoordinates.from_db().pairs():
+            if max_distance is None or distance <= max_distance:
+                writer.writerow([source, destination, f"{distance:.3f}"])
@@ -0,0 +1,39 @@
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+GUNICORN_CONFIG = os.path.join(settings.BASE_DIR, "gunicorn.conf.py")
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the project with a preforking gunicorn worker pool configured "
+        "by gunicorn.conf.py (replaces this process)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", help="Address to listen on, e.g. 0.0.0.0:8000")
+        parser.add_argument("--workers", type=int, help="Number of worker processes")
+        parser.add_argument("--threads", type=int, help="Threads per worker")
+
+    @staticmethod
+    def gunicorn_argv(bind=None, workers=None, threads=None):
+        argv = [sys.executable, "-m", "gunicorn", "--config", GUNICORN_CONFIG]
+        if bind:
+            argv += ["--bind", bind]
+        if workers:
+            argv += ["--workers", str(workers)]
+        if threads:
+            argv += ["--threads", str(threads)]
+        return argv + ["modern_railway.wsgi:application"]
+
+    def handle(self, *args, **options):
+        argv = self.gunicorn_argv(
+            options["bind"], options["workers"], options["threads"]
+        )
+        self.stdout.write("Starting gunicorn: " + " ".join(argv[1:]))
+        self.stdout.flush()
+        os.chdir(settings.BASE_DIR)
+        os.execv(sys.executable, argv)
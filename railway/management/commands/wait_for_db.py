@@ -1,19 +1,48 @@
 import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connection
 from django.db.utils import OperationalError
 
 
 class Command(BaseCommand):
+    help = (
+        "Wait until the database accepts connections, retrying with "
+        "exponential backoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--initial-delay", type=float, default=0.05, dest="initial_delay"
+        )
+        parser.add_argument("--max-delay", type=float, default=2.0, dest="max_delay")
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Give up after this many seconds (default: wait forever)",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Wait for db connection")
-        db_up = False
-        while not db_up:
+        started = time.monotonic()
+        delay = options["initial_delay"]
+        attempts = 0
+        while True:
+            attempts += 1
             try:
                 connection.ensure_connection()
-                db_up = True
+                break
             except OperationalError:
-                self.stdout.write("db unavailable")
-                time.sleep(5)
-        self.stdout.write(self.style.SUCCESS("db is ready "))
+                elapsed = time.monotonic() - started
+                if options["timeout"] is not None and elapsed >= options["timeout"]:
+                    raise CommandError(f"db unavailable after {elapsed:.1f}s")
+                self.stdout.write(f"db unavailable, retrying in {delay:.2f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, options["max_delay"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"db is ready after {attempts} attempt(s), "
+                f"{time.monotonic() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0008_tripschedule_trip_schedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="train",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
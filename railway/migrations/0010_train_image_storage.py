@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:06
+
+import railway.models
+import railway.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0009_train_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="train",
+            name="image",
+            field=models.ImageField(
+                null=True,
+                storage=railway.uploads.ContentAddressedStorage(),
+                upload_to=railway.models.train_image_file_path,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:27
+
+from django.db import migrations, models
+
+from railway.geo import geohash_encode
+
+
+def fill_geohashes(apps, schema_editor):
+    Station = apps.get_model("railway", "Station")
+    stations = list(Station.objects.only("id", "latitude", "longitude"))
+    for station in stations:
+        station.geohash = geohash_encode(station.latitude, station.longitude)
+    Station.objects.bulk_update(stations, ["geohash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0010_train_image_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="station",
+            name="geohash",
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="station",
+            index=models.Index(
+                fields=["geohash"],
+                name="station_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:39
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_routes(apps, schema_editor):
+    """Point trips and schedules at the oldest route of each pair."""
+    Route = apps.get_model("railway", "Route")
+    Trip = apps.get_model("railway", "Trip")
+    TripSchedule = apps.get_model("railway", "TripSchedule")
+    duplicated = (
+        Route.objects.values("source_id", "destination_id")
+        .annotate(keep=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for pair in duplicated:
+        duplicates = Route.objects.filter(
+            source_id=pair["source_id"], destination_id=pair["destination_id"]
+        ).exclude(id=pair["keep"])
+        Trip.objects.filter(route__in=duplicates).update(route_id=pair["keep"])
+        TripSchedule.objects.filter(route__in=duplicates).update(route_id=pair["keep"])
+        duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0011_station_geohash"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_routes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="route",
+            constraint=models.UniqueConstraint(
+                fields=("source", "destination"), name="unique_route_source_destination"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:44
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import railway.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0012_route_unique_source_destination"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="trip",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    (
+                        railway.models.Int8Range(
+                            "train",
+                            "train",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(
+                                inclusive_lower=True, inclusive_upper=True
+                            ),
+                        ),
+                        "=",
+                    ),
+                    (
+                        railway.models.TsTzRange(
+                            "departure_time",
+                            "arrival_time",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(),
+                        ),
+                        "&&",
+                    ),
+                ],
+                name="exclude_train_double_booking",
+                violation_error_message="This train is already assigned to another trip at this time.",
+            ),
+        ),
+    ]
@@ -0,0 +1,108 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_departure_times(apps, schema_editor):
+    Trip = apps.get_model("railway", "Trip")
+    TripCrew = apps.get_model("railway", "TripCrew")
+    TripCrew.objects.update(
+        departure_time=Subquery(
+            Trip.objects.filter(pk=OuterRef("trip_id")).values("departure_time")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0013_trip_exclude_train_double_booking"),
+    ]
+
+    operations = [
+        # Adopt the auto-created railway_trip_crew table as an explicit model
+        # without touching the table itself.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="TripCrew",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "trip",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="crew_assignments",
+                                to="railway.trip",
+                            ),
+                        ),
+                        (
+                            "crew",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="trip_assignments",
+                                to="railway.crew",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "railway_trip_crew",
+                        "unique_together": {("trip", "crew")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="trip",
+                    name="crew",
+                    field=models.ManyToManyField(
+                        related_name="trips",
+                        through="railway.TripCrew",
+                        to="railway.crew",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="tripcrew",
+            name="departure_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_departure_times, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="tripcrew",
+            index=models.Index(
+                fields=["crew", "departure_time", "trip"],
+                name="trip_crew_roster_idx",
+            ),
+        ),
+        # The roster index starts with crew_id, so it replaces the plain
+        # crew_id index. Dropping just the index avoids re-adding the FK.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX IF EXISTS "railway_trip_crew_crew_id_d6f87dfa"',
+                    'CREATE INDEX "railway_trip_crew_crew_id_d6f87dfa" '
+                    'ON "railway_trip_crew" ("crew_id")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="tripcrew",
+                    name="crew",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trip_assignments",
+                        to="railway.crew",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0014_tripcrew_roster"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=10, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="FareRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("min_distance", models.PositiveIntegerField(default=0)),
+                ("base_fare", models.DecimalField(decimal_places=2, max_digits=8)),
+                (
+                    "per_km",
+                    models.DecimalField(decimal_places=4, default=0, max_digits=8),
+                ),
+                (
+                    "train_type",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fare_rules",
+                        to="railway.traintype",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("train_type", "min_distance"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("train_type", "min_distance"),
+                        name="unique_fare_rule_band",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+    ]
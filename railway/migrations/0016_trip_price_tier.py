@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tickets_sold(apps, schema_editor):
+    Trip = apps.get_model("railway", "Trip")
+    Ticket = apps.get_model("railway", "Ticket")
+    sold = (
+        Ticket.objects.filter(trip=OuterRef("pk"))
+        .order_by()
+        .values("trip")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Trip.objects.update(tickets_sold=Coalesce(Subquery(sold), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("railway", "0015_fare_rules"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="price_tier",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="trip",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
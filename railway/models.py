@@ -1,20 +1,68 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    ArrayField,
+    BigIntegerRangeField,
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator
 from django.db import models
 
 from modern_railway import settings
 import os
 import uuid
-from django.utils.text import slugify
+
+from railway.geo import geohash_encode
+from railway.uploads import (
+    UNKNOWN_FORMAT_EXTENSION,
+    ContentAddressedStorage,
+    content_digest,
+    image_extension,
+)
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class Int8Range(models.Func):
+    function = "INT8RANGE"
+    output_field = BigIntegerRangeField()
+
+
+def trip_period():
+    """A trip's [departure_time, arrival_time) as a range expression."""
+    return TsTzRange("departure_time", "arrival_time", RangeBoundary())
 
 
 class Station(models.Model):
     name = models.CharField(max_length=64)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["geohash"],
+                name="station_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.geohash = geohash_encode(self.latitude, self.longitude)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        return super().save(*args, **kwargs)
+
 
 class Route(models.Model):
     source = models.ForeignKey(
@@ -25,6 +73,14 @@ class Route(models.Model):
     )
     distance = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "destination"],
+                name="unique_route_source_destination",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.source.name} - {self.destination.name}"
 
@@ -42,12 +98,85 @@ class Crew(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class TripSchedule(models.Model):
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="schedules")
+    train = models.ForeignKey(
+        "Train", on_delete=models.CASCADE, related_name="schedules"
+    )
+    departure_time = models.TimeField()
+    duration = models.DurationField()
+    days_of_week = ArrayField(
+        models.PositiveSmallIntegerField(validators=[MaxValueValidator(6)]),
+        help_text="Weekdays the service runs on, 0 = Monday ... 6 = Sunday",
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    crew = models.ManyToManyField("Crew", related_name="schedules", blank=True)
+
+    def __str__(self):
+        return f"{self.route} ({self.departure_time:%H:%M})"
+
+    @staticmethod
+    def validate_schedule(duration, valid_from, valid_until, error_to_raise):
+        if duration.total_seconds() <= 0:
+            raise error_to_raise({"duration": "Duration must be positive."})
+        if valid_until < valid_from:
+            raise error_to_raise(
+                {"valid_until": "Validity end must not be earlier than its start."}
+            )
+
+    def clean(self):
+        super().clean()
+        TripSchedule.validate_schedule(
+            self.duration, self.valid_from, self.valid_until, ValidationError
+        )
+
+
 class Trip(models.Model):
     route = models.ForeignKey(Route, on_delete=models.CASCADE)
     train = models.ForeignKey("Train", on_delete=models.CASCADE)
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
-    crew = models.ManyToManyField("Crew", related_name="trips")
+    crew = models.ManyToManyField("Crew", related_name="trips", through="TripCrew")
+    schedule = models.ForeignKey(
+        TripSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trips",
+    )
+    # Maintained by railway.signals on ticket sales and refunds, and
+    # recomputed in batch by railway.pricing along with price_tier.
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    price_tier = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    # Written with UPDATEs only, so saving a loaded trip must not put back
+    # the values it was read with.
+    COUNTER_FIELDS = ("tickets_sold", "price_tier")
+
+    class Meta:
+        constraints = [
+            # A single-value range per train stands in for btree_gist, so
+            # plain GiST range operators can compare trains for equality.
+            ExclusionConstraint(
+                name="exclude_train_double_booking",
+                index_type="GIST",
+                expressions=[
+                    (
+                        Int8Range(
+                            "train",
+                            "train",
+                            RangeBoundary(inclusive_lower=True, inclusive_upper=True),
+                        ),
+                        RangeOperators.EQUAL,
+                    ),
+                    (trip_period(), RangeOperators.OVERLAPS),
+                ],
+                violation_error_message=(
+                    "This train is already assigned to another trip at this time."
+                ),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.route} ({self.departure_time:%Y-%m-%d %H:%M})"
@@ -65,7 +194,52 @@ class Trip(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        if not adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        if not adding:
+            self.crew_assignments.exclude(departure_time=self.departure_time).update(
+                departure_time=self.departure_time
+            )
+
+
+class TripCrew(models.Model):
+    """
+    A crew member's assignment to a trip.
+
+    departure_time is copied from the trip (Trip.save and railway.signals
+    keep it in sync) so that a crew member's roster is a range scan over
+    one index, trip_crew_roster_idx, with no join needed to order it.
+    """
+
+    trip = models.ForeignKey(
+        Trip, on_delete=models.CASCADE, related_name="crew_assignments"
+    )
+    crew = models.ForeignKey(
+        Crew,
+        on_delete=models.CASCADE,
+        related_name="trip_assignments",
+        db_index=False,
+    )
+    departure_time = models.DateTimeField(null=True, editable=False)
+
+    class Meta:
+        db_table = "railway_trip_crew"
+        unique_together = ("trip", "crew")
+        indexes = [
+            models.Index(
+                fields=["crew", "departure_time", "trip"],
+                name="trip_crew_roster_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.crew} on {self.trip}"
 
 
 class TrainType(models.Model):
@@ -75,9 +249,46 @@ class TrainType(models.Model):
         return self.name
 
 
+class FareRule(models.Model):
+    """
+    Fare for trips of a train type from `min_distance` km up to the next
+    rule's band: base_fare + per_km * route distance. Rules without a train
+    type apply to types that have none of their own.
+    """
+
+    train_type = models.ForeignKey(
+        TrainType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="fare_rules",
+    )
+    min_distance = models.PositiveIntegerField(default=0)
+    base_fare = models.DecimalField(max_digits=8, decimal_places=2)
+    per_km = models.DecimalField(max_digits=8, decimal_places=4, default=0)
+
+    class Meta:
+        ordering = ("train_type", "min_distance")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["train_type", "min_distance"],
+                name="unique_fare_rule_band",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        train_type = self.train_type or "Any train"
+        return f"{train_type} from {self.min_distance} km"
+
+
 def train_image_file_path(instance, filename):
-    _, extension = os.path.splitext(filename)
-    filename = f"{slugify(instance.name)}-{uuid.uuid4()}{extension}"
+    try:
+        digest = content_digest(instance.image.file)
+        extension = image_extension(instance.image.file)
+    except (ValueError, OSError):
+        digest, extension = uuid.uuid4().hex, UNKNOWN_FORMAT_EXTENSION
+    filename = f"{digest}{extension}"
 
     return os.path.join("uploads/trains/", filename)
 
@@ -87,7 +298,10 @@ class Train(models.Model):
     cargo_num = models.IntegerField()
     places_in_cargo = models.IntegerField()
     train_type = models.ForeignKey(TrainType, on_delete=models.CASCADE)
-    image = models.ImageField(null=True, upload_to=train_image_file_path)
+    image = models.ImageField(
+        null=True, upload_to=train_image_file_path, storage=ContentAddressedStorage()
+    )
+    image_variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"{self.name} ({self.train_type})"
@@ -113,6 +327,9 @@ class Ticket(models.Model):
     seat = models.IntegerField()
     trip = models.ForeignKey("Trip", on_delete=models.CASCADE, related_name="tickets")
     order = models.ForeignKey("Order", on_delete=models.CASCADE, related_name="tickets")
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, editable=False
+    )
 
     class Meta:
         ordering = ("cargo", "seat")
@@ -0,0 +1,49 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+
+from railway.models import Ticket
+
+
+def sold_by_cargo(trip_ids):
+    """{trip_id: Counter({cargo: tickets sold})} from one GROUP BY query."""
+    sold = defaultdict(Counter)
+    rows = (
+        Ticket.objects.filter(trip_id__in=trip_ids)
+        .order_by()
+        .values_list("trip_id", "cargo")
+        .annotate(sold=Count("id"))
+    )
+    for trip_id, cargo, count in rows:
+        sold[trip_id][cargo] = count
+    return sold
+
+
+def attach_sold_by_cargo(trips):
+    """Set `sold_by_cargo` on each trip of a page with a single query."""
+    sold = sold_by_cargo([trip.id for trip in trips])
+    for trip in trips:
+        trip.sold_by_cargo = sold[trip.id]
+    return trips
+
+
+def trip_sold_by_cargo(trip):
+    """
+    Tickets sold per cargo, from attach_sold_by_cargo() or prefetched
+    tickets when available, otherwise with a query for this trip.
+    """
+    sold = getattr(trip, "sold_by_cargo", None)
+    if sold is not None:
+        return sold
+    tickets = getattr(trip, "prefetched_tickets", None)
+    if tickets is not None:
+        return Counter(ticket.cargo for ticket in tickets)
+    return sold_by_cargo([trip.id])[trip.id]
+
+
+def cargo_availability(train, sold):
+    """Free seats in each cargo of `train`, numbered from 1."""
+    return [
+        {"cargo": cargo, "free_seats": train.places_in_cargo - sold.get(cargo, 0)}
+        for cargo in range(1, train.cargo_num + 1)
+    ]
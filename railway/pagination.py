@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RosterPagination(CursorPagination):
+    """
+    Keyset pagination over a crew member's assignments.
+
+    Each page continues from the last departure_time seen, so it is a range
+    scan on trip_crew_roster_idx however deep the client pages. A page
+    holds a year of daily trips.
+    """
+
+    ordering = ("departure_time", "trip_id")
+    page_size = 400
+    page_size_query_param = "limit"
+    max_page_size = 1000
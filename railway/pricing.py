@@ -0,0 +1,109 @@
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from railway.models import Ticket, Trip
+
+DYNAMIC_PRICING_DEFAULTS = {
+    # (minimum load factor, fare multiplier); tier N is the Nth entry.
+    "TIERS": ((0.0, "1.00"), (0.5, "1.10"), (0.75, "1.25"), (0.9, "1.50")),
+    "HORIZON_DAYS": 90,
+    "BATCH_SIZE": 5000,
+}
+
+
+def dynamic_pricing_setting(name):
+    return getattr(settings, "DYNAMIC_PRICING", {}).get(
+        name, DYNAMIC_PRICING_DEFAULTS[name]
+    )
+
+
+def price_tiers():
+    """Sorted load-factor thresholds and the multiplier of each tier."""
+    tiers = sorted(dynamic_pricing_setting("TIERS"), key=lambda tier: tier[0])
+    thresholds = tuple(float(threshold) for threshold, _ in tiers)
+    multipliers = tuple(Decimal(str(multiplier)) for _, multiplier in tiers)
+    return thresholds, multipliers
+
+
+def load_tiers(sold, capacity, thresholds):
+    """
+    Tier of each trip from parallel arrays of tickets sold and capacity.
+
+    Trips under the first threshold, and trips of trains without seats,
+    stay in tier 0.
+    """
+    tiers = array("H", bytes(2 * len(sold)))
+    for index, (count, seats) in enumerate(zip(sold, capacity)):
+        if seats > 0:
+            tiers[index] = max(bisect_right(thresholds, count / seats) - 1, 0)
+    return tiers
+
+
+def resync_tickets_sold(trips):
+    """Recount Trip.tickets_sold for `trips` from their tickets in one UPDATE."""
+    sold = (
+        Ticket.objects.filter(trip=OuterRef("pk"))
+        .order_by()
+        .values("trip")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return trips.update(tickets_sold=Coalesce(Subquery(sold), 0))
+
+
+def recompute_price_tiers(start=None, end=None, resync=False):
+    """
+    Store the current price tier of every trip departing in [start, end).
+
+    Occupancy comes from the tickets_sold counters, read with the trains'
+    capacity in one query into parallel arrays, so no tickets are counted.
+    Only trips whose tier changes are written, with one UPDATE per tier
+    and batch. `resync` recounts the counters from tickets first.
+    """
+    start = start or timezone.now()
+    end = end or start + timedelta(days=dynamic_pricing_setting("HORIZON_DAYS"))
+    trips = Trip.objects.filter(departure_time__gte=start, departure_time__lt=end)
+    if resync:
+        resync_tickets_sold(trips)
+
+    ids, sold, capacity, current = array("q"), array("q"), array("q"), array("H")
+    rows = trips.values_list(
+        "id",
+        "tickets_sold",
+        "train__cargo_num",
+        "train__places_in_cargo",
+        "price_tier",
+    ).order_by()
+    batch_size = dynamic_pricing_setting("BATCH_SIZE")
+    for trip_id, count, cargo_num, places, tier in rows.iterator(batch_size):
+        ids.append(trip_id)
+        sold.append(count)
+        capacity.append(cargo_num * places)
+        current.append(tier)
+
+    thresholds, _ = price_tiers()
+    tiers = load_tiers(sold, capacity, thresholds)
+
+    changed = defaultdict(list)
+    for trip_id, old, new in zip(ids, current, tiers):
+        if old != new:
+            changed[new].append(trip_id)
+    for tier, trip_ids in changed.items():
+        for offset in range(0, len(trip_ids), batch_size):
+            Trip.objects.filter(id__in=trip_ids[offset : offset + batch_size]).update(
+                price_tier=tier
+            )
+
+    return {
+        "trips": len(ids),
+        "changed": sum(len(trip_ids) for trip_ids in changed.values()),
+        "tiers": Counter(tiers),
+    }
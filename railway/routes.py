@@ -0,0 +1,137 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from railway.models import Route, Station
+
+ROUTE_LOOKUP_DEFAULTS = {
+    "CACHE": "default",
+    "TTL": 300,
+}
+
+ROUTE_LOOKUP_VERSION_KEY = "railway:routes:version"
+
+
+def route_lookup_setting(name):
+    return getattr(settings, "ROUTE_LOOKUP", {}).get(name, ROUTE_LOOKUP_DEFAULTS[name])
+
+
+def _cache():
+    return caches[route_lookup_setting("CACHE")]
+
+
+class RouteLookup:
+    """
+    Process-wide map from (source_id, destination_id) to route id.
+
+    Station names are kept next to the map, so a search by name or by id
+    resolves to route ids without touching the database. The trip search
+    then filters on route_id alone.
+
+    Route and station changes (railway.signals) replace a version stored in
+    the ROUTE_LOOKUP["CACHE"] cache, and every process reloads when it sees
+    a new version. That reaches all workers only if the cache is shared
+    (Redis, Memcached, database); with the default per-process LocMemCache
+    other workers keep their map for up to ROUTE_LOOKUP["TTL"] seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._maps = None
+        self._version = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._maps = None
+            _cache().set(ROUTE_LOOKUP_VERSION_KEY, uuid.uuid4().hex, None)
+
+    @staticmethod
+    def _current_version():
+        cache = _cache()
+        cache.add(ROUTE_LOOKUP_VERSION_KEY, uuid.uuid4().hex, None)
+        return cache.get(ROUTE_LOOKUP_VERSION_KEY)
+
+    def _is_stale(self, version):
+        return (
+            self._maps is None
+            or self._version != version
+            or time.monotonic() - self._loaded_at > route_lookup_setting("TTL")
+        )
+
+    @staticmethod
+    def _build():
+        by_source, by_destination = {}, {}
+        routes = Route.objects.values_list("id", "source_id", "destination_id")
+        for route_id, source_id, destination_id in routes:
+            by_source.setdefault(source_id, {})[destination_id] = route_id
+            by_destination.setdefault(destination_id, {})[source_id] = route_id
+        names = {
+            station_id: name.casefold()
+            for station_id, name in Station.objects.values_list("id", "name")
+        }
+        return by_source, by_destination, names
+
+    def _load(self):
+        version = self._current_version()
+        maps = self._maps
+        if self._is_stale(version):
+            with self._lock:
+                if self._is_stale(version):
+                    self._maps = self._build()
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+                maps = self._maps
+        return maps
+
+    @staticmethod
+    def _stations(names, name, station_id):
+        """Station ids matching both filters, or None when neither is given."""
+        if name is None and station_id is None:
+            return None
+        if station_id is not None:
+            candidates = {station_id} if station_id in names else set()
+        else:
+            candidates = names.keys()
+        if name is None:
+            return set(candidates)
+        needle = name.strip().casefold()
+        return {candidate for candidate in candidates if needle in names[candidate]}
+
+    def route_id(self, source_id, destination_id):
+        by_source, _, _ = self._load()
+        return by_source.get(source_id, {}).get(destination_id)
+
+    def route_ids(
+        self, source=None, destination=None, source_id=None, destination_id=None
+    ):
+        """
+        Ids of routes whose endpoints match, or None if nothing is filtered.
+
+        `source` and `destination` match station names case-insensitively
+        anywhere in the name; the *_id arguments match exactly.
+        """
+        by_source, by_destination, names = self._load()
+        sources = self._stations(names, source, source_id)
+        destinations = self._stations(names, destination, destination_id)
+        if sources is None and destinations is None:
+            return None
+
+        if sources is None:
+            return sorted(
+                route_id
+                for destination in destinations
+                for route_id in by_destination.get(destination, {}).values()
+            )
+        return sorted(
+            route_id
+            for source in sources
+            for destination, route_id in by_source.get(source, {}).items()
+            if destinations is None or destination in destinations
+        )
+
+
+route_lookup = RouteLookup()
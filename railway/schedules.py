@@ -0,0 +1,205 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from railway.availability import invalidate_departures
+from railway.models import Trip, TripSchedule
+
+SCHEDULE_HORIZON_DAYS = 90
+SCHEDULE_BATCH_SIZE = 2000
+
+
+def schedule_departures(schedule, start, end):
+    """Yield the departure datetimes of a schedule for dates in [start, end]."""
+    first = max(start, schedule.valid_from)
+    last = min(end, schedule.valid_until)
+    weekdays = set(schedule.days_of_week)
+    tz = timezone.get_current_timezone()
+
+    for offset in range((last - first).days + 1):
+        date = first + timedelta(days=offset)
+        if date.weekday() in weekdays:
+            yield timezone.make_aware(
+                datetime.combine(date, schedule.departure_time), tz
+            )
+
+
+def _window(start, end):
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, datetime.min.time()), tz),
+        timezone.make_aware(
+            datetime.combine(end + timedelta(days=1), datetime.min.time()), tz
+        ),
+    )
+
+
+def materialize_schedule(schedule, start=None, end=None):
+    """
+    Bring the trips of a schedule in [start, end] in line with it.
+
+    Only dates whose trip is missing, outdated or no longer scheduled are
+    touched: missing trips are bulk-created with the schedule's default
+    crew, outdated ones are bulk-updated and stale ones are deleted unless
+    tickets were already sold for them. Trips without tickets also get the
+    schedule's current crew. A sold trip that is no longer scheduled is
+    kept and reported under "kept", and no replacement is created on its
+    date, so the schedule never runs two services on one day. Raises
+    ValidationError if that would put the schedule's train on two trips
+    at once.
+    """
+    start = start or timezone.localdate()
+    end = end or start + timedelta(days=SCHEDULE_HORIZON_DAYS)
+    window_start, window_end = _window(start, end)
+    desired = set(schedule_departures(schedule, start, end))
+
+    existing = {
+        trip.departure_time: trip
+        for trip in Trip.objects.filter(
+            schedule=schedule,
+            departure_time__gte=window_start,
+            departure_time__lt=window_end,
+        ).annotate(tickets_count=Count("tickets"))
+    }
+
+    stale_ids, kept = [], []
+    for departure, trip in existing.items():
+        if departure not in desired:
+            (kept if trip.tickets_count else stale_ids).append(trip.id)
+    kept_dates = {
+        timezone.localdate(trip.departure_time)
+        for trip in existing.values()
+        if trip.id in kept
+    }
+
+    changed, moved = [], []
+    for departure, trip in existing.items():
+        if departure not in desired:
+            continue
+        arrival = departure + schedule.duration
+        if (trip.route_id, trip.train_id, trip.arrival_time) != (
+            schedule.route_id,
+            schedule.train_id,
+            arrival,
+        ):
+            moved += [(trip.route_id, departure), (schedule.route_id, departure)]
+            trip.route_id = schedule.route_id
+            trip.train_id = schedule.train_id
+            trip.arrival_time = arrival
+            changed.append(trip)
+
+    new_trips = [
+        Trip(
+            route_id=schedule.route_id,
+            train_id=schedule.train_id,
+            departure_time=departure,
+            arrival_time=departure + schedule.duration,
+            schedule=schedule,
+        )
+        for departure in sorted(desired - existing.keys())
+        if timezone.localdate(departure) not in kept_dates
+    ]
+    unsold = [
+        trip
+        for departure, trip in existing.items()
+        if departure in desired and not trip.tickets_count
+    ]
+
+    try:
+        with transaction.atomic():
+            crew_updated = _save_trips(schedule, stale_ids, changed, new_trips, unsold)
+    except IntegrityError as error:
+        if "exclude_train_double_booking" not in str(error):
+            raise
+        raise ValidationError(
+            {"train": "This train is already assigned to other trips at these times."}
+        )
+    # Bulk writes send no signals, so drop the calendar days they touched.
+    transaction.on_commit(
+        partial(
+            invalidate_departures,
+            moved + [(trip.route_id, trip.departure_time) for trip in new_trips],
+        )
+    )
+
+    return {
+        "created": len(new_trips),
+        "updated": len(changed),
+        "deleted": len(stale_ids),
+        "crew_updated": crew_updated,
+        "kept": len(kept),
+    }
+
+
+def _save_trips(schedule, stale_ids, changed, new_trips, unsold):
+    """Write the trip changes; returns how many unsold trips changed crew."""
+    Trip.objects.filter(id__in=stale_ids).delete()
+    Trip.objects.bulk_update(
+        changed,
+        ("route_id", "train_id", "arrival_time"),
+        batch_size=SCHEDULE_BATCH_SIZE,
+    )
+    Trip.objects.bulk_create(new_trips, batch_size=SCHEDULE_BATCH_SIZE)
+
+    crew_ids = set(schedule.crew.values_list("id", flat=True))
+    assigned = defaultdict(dict)
+    for assignment_id, trip_id, crew_id in Trip.crew.through.objects.filter(
+        trip_id__in=[trip.id for trip in unsold]
+    ).values_list("id", "trip_id", "crew_id"):
+        assigned[trip_id][crew_id] = assignment_id
+
+    removed, added, crew_updated = [], [], 0
+    for trip in unsold:
+        current = assigned[trip.id]
+        extra = current.keys() - crew_ids
+        missing = crew_ids - current.keys()
+        removed.extend(current[crew_id] for crew_id in extra)
+        added.extend((trip, crew_id) for crew_id in missing)
+        crew_updated += bool(extra or missing)
+    added.extend((trip, crew_id) for trip in new_trips for crew_id in crew_ids)
+
+    through = Trip.crew.through
+    through.objects.filter(id__in=removed).delete()
+    through.objects.bulk_create(
+        [
+            through(
+                trip_id=trip.id, crew_id=crew_id, departure_time=trip.departure_time
+            )
+            for trip, crew_id in added
+        ],
+        batch_size=SCHEDULE_BATCH_SIZE,
+    )
+    return crew_updated
+
+
+def materialize_schedules(horizon_days=SCHEDULE_HORIZON_DAYS, schedules=None):
+    """
+    Materialize every schedule running in the horizon and sum the results.
+
+    A schedule that cannot be materialized does not stop the others; its
+    errors are reported under "failed" by schedule id.
+    """
+    start = timezone.localdate()
+    end = start + timedelta(days=horizon_days)
+    if schedules is None:
+        schedules = TripSchedule.objects.filter(
+            valid_from__lte=end, valid_until__gte=start
+        )
+
+    totals = {"created": 0, "updated": 0, "deleted": 0, "crew_updated": 0, "kept": 0}
+    failed = {}
+    for schedule in schedules:
+        try:
+            result = materialize_schedule(schedule, start, end)
+        except ValidationError as error:
+            failed[schedule.id] = error.messages
+            continue
+        for key, value in result.items():
+            totals[key] += value
+    totals["failed"] = failed
+    return totals
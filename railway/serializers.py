@@ -1,6 +1,36 @@
-from django.db import transaction
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.validators import FileExtensionValidator
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
+from PIL import Image, UnidentifiedImageError
 from rest_framework import serializers
-from railway.models import Station, Route, Crew, Trip, TrainType, Train, Order, Ticket
+
+from railway.autocomplete import AUTOCOMPLETE_MAX_RESULTS
+from railway.availability import availability_calendar_setting
+from railway.crew_scheduling import describe_conflict, find_conflicts
+from railway.fares import attach_fares, fares
+from railway.fleet import find_train_conflict
+from railway.models import (
+    Station,
+    Route,
+    Crew,
+    Trip,
+    TripCrew,
+    TripSchedule,
+    FareRule,
+    TrainType,
+    Train,
+    Order,
+    Ticket,
+)
+from railway.occupancy import (
+    attach_sold_by_cargo,
+    cargo_availability,
+    trip_sold_by_cargo,
+)
 
 
 class StationSerializer(serializers.ModelSerializer):
@@ -21,6 +51,92 @@ class StationRetrieveSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "latitude", "longitude")
 
 
+class NearbyStationsQuerySerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    radius = serializers.FloatField(min_value=0, required=False)
+
+
+class StationBoundingBoxQuerySerializer(serializers.Serializer):
+    min_latitude = serializers.FloatField(min_value=-90, max_value=90)
+    min_longitude = serializers.FloatField(min_value=-180, max_value=180)
+    max_latitude = serializers.FloatField(min_value=-90, max_value=90)
+    max_longitude = serializers.FloatField(min_value=-180, max_value=180)
+
+    def validate(self, attrs):
+        if attrs["min_latitude"] > attrs["max_latitude"]:
+            raise serializers.ValidationError(
+                "min_latitude must not be greater than max_latitude"
+            )
+        if attrs["min_longitude"] > attrs["max_longitude"]:
+            raise serializers.ValidationError(
+                "min_longitude must not be greater than max_longitude"
+            )
+        return attrs
+
+
+class StationAutocompleteQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=64, trim_whitespace=True)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=AUTOCOMPLETE_MAX_RESULTS, default=10
+    )
+
+
+class StationCompletionSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    trip_count = serializers.IntegerField(read_only=True)
+
+
+class NearbyStationSerializer(StationSerializer):
+    distance = serializers.FloatField(read_only=True, help_text="Distance in km")
+
+    class Meta(StationSerializer.Meta):
+        fields = StationSerializer.Meta.fields + ("distance",)
+
+
+class RouteFilterQuerySerializer(serializers.Serializer):
+    source = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Source station name contains (ex. ?source=Kyiv)",
+    )
+    destination = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Destination station name contains (ex. ?destination=Lviv)",
+    )
+    source_id = serializers.IntegerField(required=False, min_value=1)
+    destination_id = serializers.IntegerField(required=False, min_value=1)
+
+
+class AvailabilityCalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False, help_text="First day (default today)")
+    end = serializers.DateField(
+        required=False, help_text="Last day, inclusive (default 30 days after start)"
+    )
+
+    def validate(self, attrs):
+        start = attrs.setdefault("start", timezone.localdate())
+        end = attrs.setdefault("end", start + timedelta(days=30))
+        if end < start:
+            raise serializers.ValidationError({"end": "end must not be before start"})
+        max_days = availability_calendar_setting("MAX_DAYS")
+        if (end - start).days >= max_days:
+            raise serializers.ValidationError(
+                {"end": f"The calendar covers at most {max_days} days."}
+            )
+        return attrs
+
+
+class AvailabilityDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    trips = serializers.IntegerField()
+    first_departure = serializers.DateTimeField()
+    free_seats = serializers.IntegerField()
+
+
 class RouteSerializer(serializers.ModelSerializer):
     source = StationSerializer(read_only=True)
     destination = StationSerializer(read_only=True)
@@ -54,12 +170,79 @@ class CrewSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name", "full_name", "position")
 
 
+class CrewRosterQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField(
+        required=False, help_text="Only trips departing at or after this time"
+    )
+    end = serializers.DateTimeField(
+        required=False, help_text="Only trips departing before this time"
+    )
+
+    def validate(self, attrs):
+        if "start" in attrs and "end" in attrs and attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError({"end": "end must be later than start"})
+        return attrs
+
+
+class CrewRosterSerializer(serializers.ModelSerializer):
+    trip = serializers.IntegerField(source="trip_id", read_only=True)
+    arrival_time = serializers.DateTimeField(source="trip.arrival_time", read_only=True)
+    route = serializers.StringRelatedField(source="trip.route", read_only=True)
+    train = serializers.CharField(source="trip.train.name", read_only=True)
+
+    class Meta:
+        model = TripCrew
+        fields = ("trip", "departure_time", "arrival_time", "route", "train")
+
+
+class FareRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FareRule
+        fields = ("id", "train_type", "min_distance", "base_fare", "per_km")
+
+
 class TrainTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = TrainType
         fields = ("id", "name")
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Expose image variants as absolute URLs with srcset width metadata."""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        storage = Train._meta.get_field("image").storage
+        variants = {}
+        for variant, meta in (value or {}).items():
+            url = storage.url(meta["name"])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            variants[variant] = {
+                "url": url,
+                "width": meta["width"],
+                "height": meta["height"],
+                "format": meta["format"],
+            }
+
+        srcset = ", ".join(
+            f"{variant['url']} {variant['width']}w"
+            for variant in sorted(variants.values(), key=lambda item: item["width"])
+            if variant["format"] != "webp"
+        )
+        return {"variants": variants, "srcset": srcset}
+
+
+class TrainAvailabilityQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError({"end": "end must be later than start"})
+        return attrs
+
+
 class TrainSerializer(serializers.ModelSerializer):
     class Meta:
         model = Train
@@ -75,6 +258,7 @@ class TrainSerializer(serializers.ModelSerializer):
 
 class TrainListSerializer(serializers.ModelSerializer):
     train_type = serializers.CharField(source="train_type.name", read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Train
@@ -86,11 +270,13 @@ class TrainListSerializer(serializers.ModelSerializer):
             "train_type",
             "capacity",
             "image",
+            "image_variants",
         )
 
 
 class TrainRetrieveSerializer(serializers.ModelSerializer):
     train_type = TrainTypeSerializer(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Train
@@ -102,27 +288,210 @@ class TrainRetrieveSerializer(serializers.ModelSerializer):
             "train_type",
             "capacity",
             "image",
+            "image_variants",
         )
 
 
+class ImageHeaderField(serializers.FileField):
+    """
+    Image upload field that validates only the image header.
+
+    Pillow parses the format and dimensions lazily, so the bitmap is never
+    decoded: a multi-megabyte upload costs a few kilobytes of reads. The
+    stored file is named after the detected format, not the uploaded name
+    (railway.models.train_image_file_path).
+    """
+
+    allowed_formats = ("JPEG", "PNG", "WEBP", "GIF")
+    max_pixels = 40_000_000
+    default_error_messages = {
+        "invalid_image": "Upload a valid image. The file you uploaded was either "
+        "not an image or a corrupted image.",
+        "unsupported_format": "Unsupported image format {image_format}.",
+        "too_large": "Image must not exceed {max_pixels} pixels.",
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault(
+            "validators",
+            [FileExtensionValidator(["jpg", "jpeg", "png", "webp", "gif"])],
+        )
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        file = super().to_internal_value(data)
+        try:
+            with Image.open(file) as image:
+                image_format = image.format
+                width, height = image.size
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            self.fail("invalid_image")
+        finally:
+            file.seek(0)
+
+        if image_format not in self.allowed_formats:
+            self.fail("unsupported_format", image_format=image_format)
+        if width * height > self.max_pixels:
+            self.fail("too_large", max_pixels=self.max_pixels)
+        return file
+
+
 class TrainImageSerializer(serializers.ModelSerializer):
+    image = ImageHeaderField()
+
     class Meta:
         model = Train
         fields = ("id", "image")
 
 
 class TripSerializer(serializers.ModelSerializer):
+    crew = serializers.PrimaryKeyRelatedField(
+        many=True, queryset=Crew.objects.all(), required=False
+    )
+
     class Meta:
         model = Trip
-        fields = ("id", "route", "train", "departure_time", "arrival_time")
+        fields = ("id", "route", "train", "departure_time", "arrival_time", "crew")
+
+    def validate(self, attrs):
+        def current(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+
+        departure_time = current("departure_time")
+        arrival_time = current("arrival_time")
+        Trip.validate_times(departure_time, arrival_time, serializers.ValidationError)
+
+        trip_id = self.instance.id if self.instance is not None else None
+        errors = {}
+        busy_trip = find_train_conflict(
+            current("train").id, departure_time, arrival_time, trip_id
+        )
+        if busy_trip is not None:
+            errors["train"] = [
+                f"This train is already assigned to trip {busy_trip} at this time."
+            ]
+
+        if "crew" in attrs:
+            crew_ids = [crew.id for crew in attrs["crew"]]
+        elif self.instance is not None:
+            crew_ids = list(self.instance.crew.values_list("id", flat=True))
+        else:
+            crew_ids = []
+        conflicts = find_conflicts(crew_ids, departure_time, arrival_time, trip_id)
+        if conflicts:
+            errors["crew"] = [describe_conflict(conflict) for conflict in conflicts]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    @contextmanager
+    def _train_booking(self):
+        # A concurrent request can still take the train between validate()
+        # and the insert; the exclusion constraint catches that.
+        try:
+            with transaction.atomic():
+                yield
+        except IntegrityError as error:
+            if "exclude_train_double_booking" not in str(error):
+                raise
+            raise serializers.ValidationError(
+                {"train": ["This train is already assigned to a trip at this time."]}
+            )
+
+    def create(self, validated_data):
+        with self._train_booking():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with self._train_booking():
+            return super().update(instance, validated_data)
+
+
+class TripScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TripSchedule
+        fields = (
+            "id",
+            "route",
+            "train",
+            "departure_time",
+            "duration",
+            "days_of_week",
+            "valid_from",
+            "valid_until",
+            "crew",
+        )
 
     def validate(self, attrs):
-        Trip.validate_times(
-            attrs["departure_time"], attrs["arrival_time"], serializers.ValidationError
+        def current(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+
+        TripSchedule.validate_schedule(
+            current("duration"),
+            current("valid_from"),
+            current("valid_until"),
+            serializers.ValidationError,
         )
         return attrs
 
 
+class CargoAvailabilitySerializer(serializers.Serializer):
+    cargo = serializers.IntegerField()
+    free_seats = serializers.IntegerField()
+
+
+@extend_schema_field(CargoAvailabilitySerializer(many=True))
+class CargoAvailabilityField(serializers.ReadOnlyField):
+    """Free seats per cargo of a trip, without listing the taken seats."""
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, trip):
+        return cargo_availability(trip.train, trip_sold_by_cargo(trip))
+
+
+class FareField(serializers.DecimalField):
+    """A trip's fare from the fare table, or null if no rule covers it."""
+
+    def __init__(self, **kwargs):
+        kwargs.update(
+            source="*",
+            read_only=True,
+            allow_null=True,
+            max_digits=10,
+            decimal_places=2,
+        )
+        super().__init__(**kwargs)
+
+    def to_representation(self, trip):
+        try:
+            fare = trip.fare
+        except AttributeError:
+            fare = fares.trip_fare(trip)
+        return None if fare is None else super().to_representation(fare)
+
+
+def prepare_trips(trips):
+    """Count tickets per cargo and price a page of trips in one go."""
+    attach_sold_by_cargo(trips)
+    attach_fares(trips)
+    return trips
+
+
+def _items(data):
+    return list(data.all() if hasattr(data, "all") else data)
+
+
+class TripPageSerializer(serializers.ListSerializer):
+    """Counts the tickets of every trip on a page in one query."""
+
+    def to_representation(self, data):
+        return super().to_representation(prepare_trips(_items(data)))
+
+
 class TripListSerializer(serializers.ModelSerializer):
     source = serializers.CharField(source="route.source.name", read_only=True)
     destination = serializers.CharField(source="route.destination.name", read_only=True)
@@ -130,9 +499,12 @@ class TripListSerializer(serializers.ModelSerializer):
     train_type = serializers.CharField(source="train.train_type.name", read_only=True)
     total_seats = serializers.IntegerField(read_only=True)
     tickets_available = serializers.IntegerField(read_only=True)
+    cargo_availability = CargoAvailabilityField()
+    fare = FareField()
 
     class Meta:
         model = Trip
+        list_serializer_class = TripPageSerializer
         fields = (
             "id",
             "source",
@@ -143,6 +515,9 @@ class TripListSerializer(serializers.ModelSerializer):
             "train_type",
             "total_seats",
             "tickets_available",
+            "cargo_availability",
+            "price_tier",
+            "fare",
         )
 
 
@@ -151,6 +526,8 @@ class TripRetrieveSerializer(serializers.ModelSerializer):
     train_type = serializers.CharField(source="train.train_type.name", read_only=True)
     total_seats = serializers.IntegerField(source="train.capacity", read_only=True)
     taken_seats = serializers.SerializerMethodField()
+    cargo_availability = CargoAvailabilityField()
+    fare = FareField()
     crew = serializers.SerializerMethodField()
     source = serializers.CharField(source="route.source.name", read_only=True)
     destination = serializers.CharField(source="route.destination.name", read_only=True)
@@ -166,7 +543,10 @@ class TripRetrieveSerializer(serializers.ModelSerializer):
             "train",
             "train_type",
             "total_seats",
+            "price_tier",
+            "fare",
             "crew",
+            "cargo_availability",
             "taken_seats",
         )
 
@@ -208,7 +588,8 @@ class TicketSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ticket
-        fields = ("id", "cargo", "seat", "trip")
+        fields = ("id", "cargo", "seat", "trip", "price")
+        read_only_fields = ("price",)
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -219,11 +600,16 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "created_at", "tickets")
 
     def create(self, validated_data):
+        table = fares.current()
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
             for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+                Ticket.objects.create(
+                    order=order,
+                    price=table.trip_fare(ticket_data["trip"]),
+                    **ticket_data,
+                )
             return order
 
 
@@ -231,5 +617,25 @@ class TicketListSerializer(TicketSerializer):
     trip = TripListSerializer(read_only=True)
 
 
+class OrderPageSerializer(serializers.ListSerializer):
+    """Prepares the trips of all tickets on a page of orders together."""
+
+    def to_representation(self, data):
+        orders = _items(data)
+        prepare_trips(
+            [ticket.trip for order in orders for ticket in order.tickets.all()]
+        )
+        return super().to_representation(orders)
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(read_only=True, many=True)
+
+    class Meta(OrderSerializer.Meta):
+        list_serializer_class = OrderPageSerializer
+
+
+class TimetableImportSerializer(serializers.Serializer):
+    bundle = serializers.FileField(
+        help_text="Timetable bundle: a .json file or a .zip archive of CSV sections"
+    )
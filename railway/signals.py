@@ -0,0 +1,139 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from railway.autocomplete import station_autocomplete
+from railway.availability import invalidate_departures
+from railway.distances import station_distances
+from railway.fares import bump_fare_version
+from railway.models import FareRule, Route, Station, Ticket, Trip, TripCrew
+from railway.pricing import resync_tickets_sold
+from railway.routes import route_lookup
+from railway.stations import station_index
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def invalidate_station_caches(sender, instance, **kwargs):
+    station_index.invalidate()
+    station_distances.invalidate()
+    route_lookup.invalidate()
+
+
+@receiver(post_save, sender=Station)
+def update_station_autocomplete(sender, instance, **kwargs):
+    station_autocomplete.update(instance)
+
+
+@receiver(post_delete, sender=Station)
+def remove_station_autocomplete(sender, instance, **kwargs):
+    station_autocomplete.remove(instance.pk)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_route_lookup(sender, instance, **kwargs):
+    route_lookup.invalidate()
+
+
+@receiver(m2m_changed, sender=TripCrew)
+def copy_trip_departure_time(sender, instance, action, reverse, pk_set, **kwargs):
+    """Fill TripCrew.departure_time for rows added through trip.crew."""
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        assignments = TripCrew.objects.filter(crew=instance, trip_id__in=pk_set)
+    else:
+        assignments = TripCrew.objects.filter(trip=instance, crew_id__in=pk_set)
+    assignments.filter(departure_time__isnull=True).update(
+        departure_time=Subquery(
+            Trip.objects.filter(pk=OuterRef("trip_id")).values("departure_time")[:1]
+        )
+    )
+
+
+@receiver(pre_save, sender=Trip)
+def remember_trip_calendar_day(sender, instance, raw=False, **kwargs):
+    """Keep the day a trip is moved away from, to drop it from the calendar."""
+    if raw or instance._state.adding:
+        return
+    instance._calendar_previous = (
+        Trip.objects.filter(pk=instance.pk)
+        .values_list("route_id", "departure_time")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+def invalidate_trip_calendar(sender, instance, **kwargs):
+    departures = [(instance.route_id, instance.departure_time)]
+    previous = getattr(instance, "_calendar_previous", None)
+    if previous is not None:
+        departures.append(previous)
+    transaction.on_commit(partial(invalidate_departures, departures))
+
+
+def _trip_departures(trip_ids):
+    return list(
+        Trip.objects.filter(id__in=trip_ids).values_list("route_id", "departure_time")
+    )
+
+
+def _refresh_trips(trip_ids):
+    """Recount and drop the calendar days of trips that lost tickets."""
+    trips = Trip.objects.filter(id__in=trip_ids)
+    resync_tickets_sold(trips)
+    invalidate_departures(_trip_departures(trip_ids))
+
+
+@receiver(post_save, sender=Ticket)
+def count_ticket_sold(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Trip.objects.filter(pk=instance.trip_id).update(
+            tickets_sold=F("tickets_sold") + 1
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def invalidate_ticket_calendar(sender, instance, **kwargs):
+    if Ticket.trip.is_cached(instance):
+        departures = [(instance.trip.route_id, instance.trip.departure_time)]
+    else:
+        departures = _trip_departures([instance.trip_id])
+    transaction.on_commit(partial(invalidate_departures, departures))
+
+
+@receiver(post_delete, sender=Ticket)
+def count_ticket_refunded(sender, instance, origin=None, **kwargs):
+    """
+    Give a refunded ticket's seat back on its trip.
+
+    A ticket deleted on its own updates the counter directly. Tickets
+    deleted together, by a queryset delete or a cascade from their order
+    or trip, only have their trip ids collected on the delete's origin;
+    the counters and calendar days of those trips are then refreshed once
+    for the whole delete.
+    """
+    if isinstance(origin, Ticket) or origin is None:
+        Trip.objects.filter(pk=instance.trip_id, tickets_sold__gt=0).update(
+            tickets_sold=F("tickets_sold") - 1
+        )
+        departures = _trip_departures([instance.trip_id])
+        transaction.on_commit(partial(invalidate_departures, departures))
+        return
+
+    trip_ids = getattr(origin, "_deleted_ticket_trip_ids", None)
+    if trip_ids is None:
+        trip_ids = origin._deleted_ticket_trip_ids = set()
+        transaction.on_commit(partial(_refresh_trips, trip_ids))
+    trip_ids.add(instance.trip_id)
+
+
+@receiver(post_save, sender=FareRule)
+@receiver(post_delete, sender=FareRule)
+def invalidate_fares(sender, instance, **kwargs):
+    transaction.on_commit(bump_fare_version)
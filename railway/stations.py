@@ -0,0 +1,154 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Q
+
+from railway.geo import (
+    KM_PER_DEGREE_LAT,
+    KDTree,
+    geohash_cell_size,
+    geohash_neighbourhood,
+    haversine_km,
+    meridian_distance_km,
+)
+from railway.models import Station
+
+STATION_INDEX_DEFAULTS = {
+    "ENABLED": True,
+    "TTL": 300,
+    "MAX_STATIONS": 1000000,
+}
+
+# Finest to coarsest geohash precision tried by the database fallback.
+FALLBACK_PRECISIONS = range(6, 0, -1)
+
+
+def station_index_setting(name):
+    return getattr(settings, "STATION_INDEX", {}).get(
+        name, STATION_INDEX_DEFAULTS[name]
+    )
+
+
+def _as_dict(point, distance=None):
+    latitude, longitude, station_id, name = point
+    station = {
+        "id": station_id,
+        "name": name,
+        "latitude": latitude,
+        "longitude": longitude,
+    }
+    if distance is not None:
+        station["distance"] = round(distance, 3)
+    return station
+
+
+def _points(queryset):
+    return queryset.values_list("latitude", "longitude", "id", "name")
+
+
+def nearest_stations_db(latitude, longitude, limit, max_distance_km=None):
+    """
+    k-nearest stations using the geohash index.
+
+    Looks at the query's geohash cell and its neighbours, widening the
+    precision until the k-th candidate is closer than the edge of that
+    block, which guarantees nothing outside it could be nearer.
+    """
+    for precision in FALLBACK_PRECISIONS:
+        height, width = geohash_cell_size(precision)
+        cells = geohash_neighbourhood(latitude, longitude, precision)
+        condition = Q()
+        for cell in cells:
+            condition |= Q(geohash__startswith=cell)
+        candidates = sorted(
+            (haversine_km(latitude, longitude, point[0], point[1]), point)
+            for point in _points(Station.objects.filter(condition))
+        )
+        if max_distance_km is not None:
+            candidates = [item for item in candidates if item[0] <= max_distance_km]
+
+        # The block reaches at least one cell past the query point.
+        covered_km = min(
+            height * KM_PER_DEGREE_LAT, meridian_distance_km(latitude, width)
+        )
+        enough = len(candidates) >= limit and candidates[limit - 1][0] <= covered_km
+        if enough or (max_distance_km is not None and max_distance_km <= covered_km):
+            return candidates[:limit]
+
+    candidates = sorted(
+        (haversine_km(latitude, longitude, point[0], point[1]), point)
+        for point in _points(Station.objects.all())
+    )
+    if max_distance_km is not None:
+        candidates = [item for item in candidates if item[0] <= max_distance_km]
+    return candidates[:limit]
+
+
+def stations_within_db(min_lat, min_lon, max_lat, max_lon):
+    return list(
+        _points(
+            Station.objects.filter(
+                latitude__range=(min_lat, max_lat),
+                longitude__range=(min_lon, max_lon),
+            )
+        )
+    )
+
+
+class StationIndex:
+    """
+    In-memory KD-tree over every station, shared by requests in a process.
+
+    Built lazily and rebuilt after TTL seconds or as soon as a station is
+    saved or deleted in this process (see railway.signals). When disabled,
+    or when there are more than MAX_STATIONS stations, queries go to the
+    database through the geohash index instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tree = None
+        self._built_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._tree = None
+
+    def _is_stale(self):
+        return self._tree is None or (
+            time.monotonic() - self._built_at > station_index_setting("TTL")
+        )
+
+    def _get_tree(self):
+        if not station_index_setting("ENABLED"):
+            return None
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    stations = _points(Station.objects.all())
+                    if stations.count() > station_index_setting("MAX_STATIONS"):
+                        self._tree = False
+                    else:
+                        self._tree = KDTree(stations)
+                    self._built_at = time.monotonic()
+        return self._tree or None
+
+    def nearest(self, latitude, longitude, limit, max_distance_km=None):
+        tree = self._get_tree()
+        if tree is None:
+            found = nearest_stations_db(latitude, longitude, limit, max_distance_km)
+        else:
+            found = tree.nearest(latitude, longitude, limit, max_distance_km)
+        return [_as_dict(point, distance) for distance, point in found]
+
+    def within(self, min_lat, min_lon, max_lat, max_lon):
+        tree = self._get_tree()
+        if tree is None:
+            found = stations_within_db(min_lat, min_lon, max_lat, max_lon)
+        else:
+            found = tree.within(min_lat, min_lon, max_lat, max_lon)
+        return [_as_dict(point) for point in sorted(found, key=lambda p: p[2])]
+
+
+station_index = StationIndex()
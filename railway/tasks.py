@@ -0,0 +1,13 @@
+from railway.images import build_train_image_variants
+from railway.pricing import recompute_price_tiers
+from tasks.queue import task
+
+
+@task
+def generate_train_image_variants(train_id):
+    build_train_image_variants(train_id)
+
+
+@task
+def refresh_price_tiers():
+    recompute_price_tiers()
@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.availability import availability_calendar
+from railway.models import Order, Ticket, Trip
+from railway.tests.tests_railway_api import (
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+
+def calendar_url(route_id):
+    return reverse("railway:route-calendar", args=[route_id])
+
+
+def at(day, hour):
+    return datetime.combine(day, datetime.min.time(), dt_timezone.utc) + timedelta(
+        hours=hour
+    )
+
+
+class AvailabilityCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "calendar@test.com", "pass1234"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.train = sample_train()  # 9 cargos of 50 seats
+        self.day = date(2030, 3, 10)
+        self.trips = [
+            Trip.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=at(day, hour),
+                arrival_time=at(day, hour + 2),
+            )
+            for day, hour in (
+                (self.day, 14),
+                (self.day, 8),
+                (self.day + timedelta(days=1), 8),
+                (date(2030, 4, 1), 8),
+            )
+        ]
+        self.order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                trip=self.trips[0], order=self.order, cargo=1, seat=seat
+            )
+
+    def test_days_aggregated(self):
+        res = self.client.get(
+            calendar_url(self.route.id), {"start": "2030-03-01", "end": "2030-04-30"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (row["date"], row["trips"], row["free_seats"], row["first_departure"])
+                for row in res.data
+            ],
+            [
+                ("2030-03-10", 2, 898, "2030-03-10T08:00:00Z"),
+                ("2030-03-11", 1, 450, "2030-03-11T08:00:00Z"),
+                ("2030-04-01", 1, 450, "2030-04-01T08:00:00Z"),
+            ],
+        )
+
+    def test_other_routes_and_range_excluded(self):
+        other = sample_route(
+            source=sample_station(name="Odesa"), destination=self.route.source
+        )
+        Trip.objects.create(
+            route=other,
+            train=sample_train(name="Skoda"),
+            departure_time=at(self.day, 8),
+            arrival_time=at(self.day, 10),
+        )
+
+        days = availability_calendar(
+            self.route.id, self.day + timedelta(days=1), date(2030, 3, 31)
+        )
+
+        self.assertEqual([day["date"] for day in days], [date(2030, 3, 11)])
+
+    def test_months_cached(self):
+        with self.assertNumQueries(1):
+            availability_calendar(self.route.id, date(2030, 3, 1), date(2030, 4, 30))
+        with self.assertNumQueries(0):
+            days = availability_calendar(
+                self.route.id, date(2030, 3, 11), date(2030, 4, 2)
+            )
+
+        self.assertEqual(
+            [day["date"] for day in days], [date(2030, 3, 11), date(2030, 4, 1)]
+        )
+
+    def test_ticket_sale_invalidates_month(self):
+        availability_calendar(self.route.id, date(2030, 3, 1), date(2030, 4, 30))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(trip=self.trips[1], order=self.order, cargo=2, seat=1)
+
+        with self.assertNumQueries(1):
+            days = availability_calendar(
+                self.route.id, date(2030, 3, 1), date(2030, 4, 30)
+            )
+        self.assertEqual(days[0]["free_seats"], 897)
+
+    def test_moved_trip_invalidates_both_months(self):
+        availability_calendar(self.route.id, date(2030, 3, 1), date(2030, 4, 30))
+        trip = self.trips[3]
+        trip.departure_time = at(self.day + timedelta(days=2), 8)
+        trip.arrival_time = trip.departure_time + timedelta(hours=2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+
+        days = availability_calendar(self.route.id, date(2030, 3, 1), date(2030, 4, 30))
+        self.assertEqual(
+            [day["date"] for day in days],
+            [self.day, date(2030, 3, 11), date(2030, 3, 12)],
+        )
+
+    def test_range_validated(self):
+        res = self.client.get(
+            calendar_url(self.route.id), {"start": "2030-03-10", "end": "2030-03-01"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(
+            calendar_url(self.route.id), {"start": "2030-01-01", "end": "2030-12-31"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.models import Order, Ticket, Trip
+from railway.tests.tests_railway_api import sample_route, sample_train
+
+TRIP_URL = reverse("railway:trip-list")
+ORDER_URL = reverse("railway:order-list")
+
+
+def trip_detail_url(trip_id):
+    return reverse("railway:trip-detail", args=[trip_id])
+
+
+class CargoAvailabilityTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("cargo@test.com", "pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.train = sample_train(cargo_num=3, places_in_cargo=10)
+        start = timezone.now() + timedelta(days=1)
+        self.trips = [
+            Trip.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=start + timedelta(hours=6 * index),
+                arrival_time=start + timedelta(hours=6 * index + 2),
+            )
+            for index in range(3)
+        ]
+        order = Order.objects.create(user=self.user)
+        for trip, cargo, seat in (
+            (self.trips[0], 1, 1),
+            (self.trips[0], 1, 2),
+            (self.trips[0], 3, 5),
+            (self.trips[1], 2, 1),
+        ):
+            Ticket.objects.create(trip=trip, order=order, cargo=cargo, seat=seat)
+
+    def test_list_counts_free_seats_per_cargo(self):
+        res = self.client.get(TRIP_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [trip["cargo_availability"] for trip in res.data["results"]],
+            [
+                [
+                    {"cargo": 1, "free_seats": 8},
+                    {"cargo": 2, "free_seats": 10},
+                    {"cargo": 3, "free_seats": 9},
+                ],
+                [
+                    {"cargo": 1, "free_seats": 10},
+                    {"cargo": 2, "free_seats": 9},
+                    {"cargo": 3, "free_seats": 10},
+                ],
+                [
+                    {"cargo": 1, "free_seats": 10},
+                    {"cargo": 2, "free_seats": 10},
+                    {"cargo": 3, "free_seats": 10},
+                ],
+            ],
+        )
+
+    def test_list_queries_do_not_grow_with_trips(self):
+        self.client.get(TRIP_URL)  # loads the route lookup
+        with self.assertNumQueries(3):  # count, page, cargo counts
+            self.client.get(TRIP_URL)
+
+    def test_order_list_counts_cargo_seats_per_page(self):
+        self.client.get(ORDER_URL)  # loads the fare table
+        with self.assertNumQueries(5):  # count, orders, tickets, trips, cargo counts
+            res = self.client.get(ORDER_URL)
+
+        tickets = res.data["results"][0]["tickets"]
+        self.assertEqual(len(tickets), 4)
+        self.assertEqual(
+            tickets[0]["trip"]["cargo_availability"][0],
+            {"cargo": 1, "free_seats": 8},
+        )
+
+    def test_detail_uses_prefetched_tickets(self):
+        res = self.client.get(trip_detail_url(self.trips[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["cargo_availability"],
+            [
+                {"cargo": 1, "free_seats": 8},
+                {"cargo": 2, "free_seats": 10},
+                {"cargo": 3, "free_seats": 9},
+            ],
+        )
+        self.assertEqual(len(res.data["taken_seats"]), 3)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.models import Crew, Trip, TripCrew
+from railway.tests.tests_railway_api import sample_route, sample_train
+
+
+def roster_url(crew_id):
+    return reverse("railway:crew-roster", args=[crew_id])
+
+
+class CrewRosterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "roster@test.com", "pass1234"
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route()
+        self.train = sample_train()
+        self.driver = Crew.objects.create(
+            first_name="Ann", last_name="Lee", position="Driver"
+        )
+        self.start = timezone.now().replace(microsecond=0)
+        self.trips = [
+            Trip.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=self.start + timedelta(days=day),
+                arrival_time=self.start + timedelta(days=day, hours=4),
+            )
+            for day in range(-2, 5)
+        ]
+        for trip in self.trips:
+            trip.crew.add(self.driver)
+
+    def test_departure_time_copied_on_add(self):
+        other = Crew.objects.create(first_name="Bob", last_name="Ray", position="")
+        other.trips.add(self.trips[0])
+
+        self.assertFalse(TripCrew.objects.filter(departure_time__isnull=True).exists())
+        self.assertEqual(
+            TripCrew.objects.get(crew=other).departure_time,
+            self.trips[0].departure_time,
+        )
+
+    def test_departure_time_follows_trip(self):
+        trip = self.trips[-1]
+        trip.departure_time += timedelta(hours=1)
+        trip.save()
+
+        self.assertEqual(
+            TripCrew.objects.get(trip=trip).departure_time, trip.departure_time
+        )
+
+    def test_roster_window(self):
+        res = self.client.get(
+            roster_url(self.driver.id),
+            {"start": self.start.isoformat(), "end": (self.start + timedelta(days=2))},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["trip"] for row in res.data["results"]],
+            [self.trips[2].id, self.trips[3].id],
+        )
+        self.assertEqual(res.data["results"][0]["route"], str(self.route))
+        self.assertEqual(res.data["results"][0]["train"], self.train.name)
+
+    def test_roster_keyset_pages(self):
+        seen = []
+        url = roster_url(self.driver.id) + "?limit=3"
+        while url:
+            res = self.client.get(url)
+            seen += [row["trip"] for row in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(seen, [trip.id for trip in self.trips])
+
+    def test_roster_single_query(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(roster_url(self.driver.id))
+        self.assertEqual(len(res.data["results"]), len(self.trips))
+
+    def test_roster_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "pass1234")
+        )
+        res = self.client.get(roster_url(self.driver.id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
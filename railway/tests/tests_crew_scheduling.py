@@ -0,0 +1,170 @@
+import random
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.crew_scheduling import (
+    OVERLAP,
+    SHORT_REST,
+    audit_crew_conflicts,
+    find_conflicts,
+)
+from railway.intervals import IntervalTree
+from railway.models import Crew, Trip
+from railway.tests.tests_railway_api import sample_route, sample_train
+
+TRIP_URL = reverse("railway:trip-list")
+
+
+def trip_detail_url(trip_id):
+    return reverse("railway:trip-detail", args=[trip_id])
+
+
+class IntervalTreeTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        intervals = []
+        for index in range(1000):
+            start = rng.uniform(0, 1000)
+            intervals.append((start, start + rng.uniform(0.1, 30), index))
+        tree = IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rng.uniform(-10, 1010)
+            end = start + rng.uniform(0, 50)
+            self.assertEqual(
+                tree.overlapping(start, end),
+                sorted(
+                    (item for item in intervals if item[0] < end and item[1] > start),
+                    key=lambda item: item[0],
+                ),
+            )
+
+    def test_half_open(self):
+        tree = IntervalTree([(0, 10, "a"), (10, 20, "b")])
+
+        self.assertEqual(tree.overlapping(10, 15), [(10, 20, "b")])
+        self.assertEqual(IntervalTree([]).overlapping(0, 1), [])
+
+
+class CrewConflictTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "crew-admin@test.com", "pass1234"
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route()
+        self.train = sample_train()
+        self.driver = Crew.objects.create(
+            first_name="Ann", last_name="Lee", position="Driver"
+        )
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.trip = self.create_trip(self.start, hours=4, crew=[self.driver])
+
+    def create_trip(self, departure, hours, crew=(), train=None):
+        trip = Trip.objects.create(
+            route=self.route,
+            train=train or self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=hours),
+        )
+        trip.crew.set(crew)
+        return trip
+
+    def test_find_conflicts(self):
+        overlap = find_conflicts(
+            [self.driver.id],
+            self.start + timedelta(hours=2),
+            self.start + timedelta(hours=6),
+        )
+        short_rest = find_conflicts(
+            [self.driver.id],
+            self.start + timedelta(hours=6),
+            self.start + timedelta(hours=8),
+        )
+        rested = find_conflicts(
+            [self.driver.id],
+            self.start + timedelta(hours=12),
+            self.start + timedelta(hours=14),
+        )
+
+        self.assertEqual([c["kind"] for c in overlap], [OVERLAP])
+        self.assertEqual([c["kind"] for c in short_rest], [SHORT_REST])
+        self.assertEqual(short_rest[0]["rest"], timedelta(hours=2))
+        self.assertEqual(rested, [])
+
+    def test_create_trip_with_busy_crew(self):
+        payload = {
+            "route": self.route.id,
+            "train": self.train.id,
+            "departure_time": self.start + timedelta(hours=1),
+            "arrival_time": self.start + timedelta(hours=3),
+            "crew": [self.driver.id],
+        }
+
+        res = self.client.post(TRIP_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(f"trip {self.trip.id}", res.data["crew"][0])
+
+    def test_create_trip_with_rested_crew(self):
+        payload = {
+            "route": self.route.id,
+            "train": self.train.id,
+            "departure_time": self.start + timedelta(hours=13),
+            "arrival_time": self.start + timedelta(hours=15),
+            "crew": [self.driver.id],
+        }
+
+        res = self.client.post(TRIP_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["crew"], [self.driver.id])
+
+    def test_moving_trip_checks_its_crew(self):
+        later = self.create_trip(
+            self.start + timedelta(hours=20), hours=2, crew=[self.driver]
+        )
+
+        res = self.client.patch(
+            trip_detail_url(later.id),
+            {
+                "departure_time": self.start + timedelta(hours=5),
+                "arrival_time": self.start + timedelta(hours=7),
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.patch(
+            trip_detail_url(self.trip.id),
+            {"arrival_time": self.start + timedelta(hours=5)},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_audit(self):
+        clash = self.create_trip(
+            self.start + timedelta(hours=3),
+            hours=2,
+            crew=[self.driver],
+            train=sample_train(name="Skoda"),
+        )
+        self.create_trip(self.start + timedelta(days=2), hours=2, crew=[self.driver])
+
+        conflicts = audit_crew_conflicts()
+
+        self.assertEqual(
+            [(c["trip"], c["conflicting_trip"], c["kind"]) for c in conflicts],
+            [(self.trip.id, clash.id, OVERLAP)],
+        )
+
+        out = StringIO()
+        call_command("audit_crew_schedules", "--days", 7, stdout=out)
+        self.assertIn("Conflicts: 1 across 1 crew members", out.getvalue())
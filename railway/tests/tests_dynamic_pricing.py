@@ -0,0 +1,131 @@
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from railway.fares import fares
+from railway.models import FareRule, Order, Ticket, Trip
+from railway.pricing import load_tiers, recompute_price_tiers
+from railway.tests.tests_railway_api import sample_route, sample_train
+
+
+class DynamicPricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("tier@test.com", "pass1234")
+        self.order = Order.objects.create(user=self.user)
+        self.route = sample_route(distance=100)
+        self.train = sample_train(cargo_num=2, places_in_cargo=10)
+        start = timezone.now() + timedelta(days=1)
+        self.trips = [
+            Trip.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=start + timedelta(hours=6 * index),
+                arrival_time=start + timedelta(hours=6 * index + 2),
+            )
+            for index in range(3)
+        ]
+
+    def sell(self, trip, count):
+        for seat in range(1, count + 1):
+            Ticket.objects.create(
+                trip=trip,
+                order=self.order,
+                cargo=1 + (seat - 1) // 10,
+                seat=1 + (seat - 1) % 10,
+            )
+
+    def test_counter_follows_sales_and_refunds(self):
+        self.sell(self.trips[0], 3)
+        Ticket.objects.filter(trip=self.trips[0]).first().delete()
+
+        self.trips[0].refresh_from_db()
+        self.assertEqual(self.trips[0].tickets_sold, 2)
+
+    def test_deleting_an_order_resyncs_counters_once(self):
+        self.sell(self.trips[0], 12)
+        self.sell(self.trips[1], 3)
+
+        # Collect, delete tickets and order, then one resync and one read of
+        # the trips' calendar days, however many tickets the order held.
+        with self.assertNumQueries(5):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.order.delete()
+
+        self.assertEqual(
+            list(
+                Trip.objects.order_by("departure_time").values_list(
+                    "tickets_sold", flat=True
+                )
+            ),
+            [0, 0, 0],
+        )
+
+    def test_saving_a_loaded_trip_keeps_counters(self):
+        trip = Trip.objects.get(pk=self.trips[0].pk)
+        self.sell(self.trips[0], 2)
+
+        trip.arrival_time += timedelta(minutes=30)
+        trip.save()
+
+        trip.refresh_from_db()
+        self.assertEqual(trip.tickets_sold, 2)
+
+    def test_load_tiers(self):
+        tiers = load_tiers(
+            array("q", [0, 5, 9, 10, 3]),
+            array("q", [10, 10, 10, 10, 0]),
+            (0.0, 0.5, 0.9),
+        )
+
+        self.assertEqual(list(tiers), [0, 1, 2, 2, 0])
+
+    def test_recompute_stores_tiers(self):
+        self.sell(self.trips[1], 12)  # 60% full
+        self.sell(self.trips[2], 19)  # 95% full
+
+        with self.assertNumQueries(3):  # read, one update per changed tier
+            result = recompute_price_tiers()
+
+        self.assertEqual(result["trips"], 3)
+        self.assertEqual(result["changed"], 2)
+        self.assertEqual(
+            list(
+                Trip.objects.order_by("departure_time").values_list(
+                    "price_tier", flat=True
+                )
+            ),
+            [0, 1, 3],
+        )
+        self.assertEqual(recompute_price_tiers()["changed"], 0)
+
+    def test_fare_uses_stored_tier(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FareRule.objects.create(base_fare=Decimal("20.00"), per_km=Decimal("1"))
+        self.sell(self.trips[2], 19)
+        recompute_price_tiers()
+
+        trips = Trip.objects.select_related("route", "train").order_by("departure_time")
+        self.assertEqual(
+            [fares.trip_fare(trip) for trip in trips],
+            [Decimal("120.00"), Decimal("120.00"), Decimal("180.00")],
+        )
+
+    def test_command_resyncs_counters(self):
+        self.sell(self.trips[0], 10)
+        Trip.objects.update(tickets_sold=0)
+        out = StringIO()
+
+        call_command("recompute_price_tiers", "--resync", stdout=out)
+
+        self.trips[0].refresh_from_db()
+        self.assertEqual(self.trips[0].tickets_sold, 10)
+        self.assertEqual(self.trips[0].price_tier, 1)
+        self.assertIn("1 changed tier", out.getvalue())
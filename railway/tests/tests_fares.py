@@ -0,0 +1,148 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.fares import FareTable, fares, fares_setting
+from railway.models import FareRule, Ticket, Trip
+from railway.tests.tests_railway_api import (
+    sample_route,
+    sample_station,
+    sample_train,
+    sample_train_type,
+)
+
+TRIP_URL = reverse("railway:trip-list")
+ORDER_URL = reverse("railway:order-list")
+
+
+class FareTableTests(TestCase):
+    def test_bands(self):
+        table = FareTable(
+            [
+                (1, 0, Decimal("50.00"), Decimal("1.0000")),
+                (1, 300, Decimal("100.00"), Decimal("0.5000")),
+                (None, 100, Decimal("20.00"), Decimal("0.3333")),
+            ]
+        )
+
+        self.assertEqual(table.quote(1, 0), Decimal("50.00"))
+        self.assertEqual(table.quote(1, 299), Decimal("349.00"))
+        self.assertEqual(table.quote(1, 300), Decimal("250.00"))
+        self.assertEqual(table.quote(2, 150), Decimal("70.00"))  # 69.995
+        self.assertIsNone(table.quote(2, 50))
+
+    def test_default_rules_cover_distances_below_type_bands(self):
+        table = FareTable(
+            [
+                (1, 300, Decimal("100.00"), Decimal("0.5000")),
+                (None, 0, Decimal("20.00"), Decimal("1.0000")),
+            ]
+        )
+
+        self.assertEqual(table.quote(1, 100), Decimal("120.00"))
+        self.assertEqual(table.quote(1, 300), Decimal("250.00"))
+
+
+class FareApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("fare@test.com", "pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.train_type = sample_train_type()
+        self.train = sample_train(train_type=self.train_type)
+        self.route = sample_route(distance=400)
+        with self.captureOnCommitCallbacks(execute=True):
+            FareRule.objects.create(
+                train_type=self.train_type,
+                min_distance=0,
+                base_fare=Decimal("40.00"),
+                per_km=Decimal("0.2500"),
+            )
+        start = timezone.now() + timedelta(days=1)
+        self.trips = [
+            Trip.objects.create(
+                route=self.route,
+                train=self.train,
+                departure_time=start + timedelta(hours=6 * index),
+                arrival_time=start + timedelta(hours=6 * index + 2),
+            )
+            for index in range(3)
+        ]
+
+    def test_trip_list_priced_without_queries_per_trip(self):
+        self.client.get(TRIP_URL)  # loads the route lookup and fare table
+        with self.assertNumQueries(3):
+            res = self.client.get(TRIP_URL)
+
+        self.assertEqual([trip["fare"] for trip in res.data["results"]], ["140.00"] * 3)
+
+    def test_trip_detail_fare(self):
+        res = self.client.get(reverse("railway:trip-detail", args=[self.trips[0].id]))
+
+        self.assertEqual(res.data["fare"], "140.00")
+
+    def test_unpriced_trip(self):
+        other = sample_route(
+            source=sample_station(name="Odesa"), destination=self.route.source
+        )
+        trip = Trip.objects.create(
+            route=other,
+            train=sample_train(name="Skoda"),  # another train type
+            departure_time=timezone.now() + timedelta(days=2),
+            arrival_time=timezone.now() + timedelta(days=2, hours=2),
+        )
+
+        res = self.client.get(reverse("railway:trip-detail", args=[trip.id]))
+
+        self.assertIsNone(res.data["fare"])
+
+    def test_rule_change_reprices(self):
+        fares.current()
+        rule = FareRule.objects.get()
+        rule.per_km = Decimal("0.5000")
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.save()
+
+        self.assertEqual(fares.trip_fare(self.trips[0]), Decimal("240.00"))
+
+    def test_rule_change_in_another_worker_picked_up_after_ttl(self):
+        table = fares.current()
+        # update() sends no signals, as for a rule saved by another worker.
+        FareRule.objects.update(per_km=Decimal("0.5000"))
+        self.assertEqual(fares.trip_fare(self.trips[0]), Decimal("140.00"))
+
+        table.loaded_at -= fares_setting("TTL") + 1
+
+        self.assertEqual(fares.trip_fare(self.trips[0]), Decimal("240.00"))
+
+    def test_order_stores_price(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("fare-admin@test.com", "pass1234")
+        )
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"trip": self.trips[0].id, "cargo": 1, "seat": 1},
+                    {"trip": self.trips[1].id, "cargo": 1, "seat": 1},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [ticket["price"] for ticket in res.data["tickets"]], ["140.00", "140.00"]
+        )
+        self.assertEqual(
+            list(Ticket.objects.values_list("price", flat=True)),
+            [Decimal("140.00")] * 2,
+        )
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.utils import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from modern_railway import health
+from modern_railway.health import dependency_probe
+
+LIVE_URL = reverse("health-live")
+READY_URL = reverse("health-ready")
+
+
+class HealthEndpointTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.drain_file = os.path.join(directory, "drain")
+        settings_override = override_settings(
+            HEALTH={"PROBE_TTL": 60, "DRAIN_FILE": self.drain_file}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        dependency_probe.clear()
+        self.addCleanup(dependency_probe.clear)
+
+    def test_liveness(self):
+        res = self.client.get(LIVE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_ready(self):
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        checks = res.json()["checks"]
+        self.assertTrue(checks["database"]["ok"])
+        self.assertEqual(checks["migrations"]["pending"], 0)
+        self.assertEqual(checks["load"]["in_flight"], 0)
+        self.assertFalse(checks["load"]["password_hashing"]["saturated"])
+
+    def test_database_probe_is_cached(self):
+        with mock.patch.object(
+            health, "_probe_database", wraps=health._probe_database
+        ) as probe:
+            self.client.get(READY_URL)
+            self.client.get(READY_URL)
+
+        self.assertEqual(probe.call_count, 1)
+
+    def test_unavailable_database(self):
+        with mock.patch.object(
+            health, "_probe_database", return_value={"ok": False, "error": "down"}
+        ):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json()["status"], "unavailable")
+
+    def test_database_error_details_not_exposed(self):
+        connection = mock.MagicMock()
+        connection.cursor.side_effect = Exception("password for user pg failed")
+        with mock.patch.object(health, "connections", {"default": connection}):
+            with self.assertLogs("modern_railway.health", "ERROR"):
+                result = health._probe_database()
+
+        self.assertEqual(result, {"ok": False, "error": "Database unavailable"})
+
+    def test_drain_fails_readiness_only(self):
+        call_command("drain", stdout=StringIO())
+
+        res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json()["status"], "draining")
+        self.assertEqual(self.client.get(LIVE_URL).status_code, status.HTTP_200_OK)
+
+        call_command("drain", "--off", stdout=StringIO())
+        self.assertEqual(self.client.get(READY_URL).status_code, status.HTTP_200_OK)
+
+
+class WaitForDbTests(TestCase):
+    @mock.patch("railway.management.commands.wait_for_db.time.sleep")
+    @mock.patch("django.db.connection.ensure_connection")
+    def test_retries_with_exponential_backoff(self, ensure_connection, sleep):
+        ensure_connection.side_effect = [OperationalError] * 4 + [None]
+
+        call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(ensure_connection.call_count, 5)
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list], [0.05, 0.1, 0.2, 0.4]
+        )
@@ -0,0 +1,106 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.tests.tests_railway_api import sample_train
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_bytes(color=(10, 120, 200), image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 20), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StreamingImageUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@railway.com", "password")
+        )
+
+    def upload(self, train, content, name="train.png"):
+        url = reverse("railway:train-upload-image", args=[train.id])
+        return self.client.post(
+            url, {"image": SimpleUploadedFile(name, content)}, format="multipart"
+        )
+
+    def test_image_named_after_content_hash(self):
+        train = sample_train()
+        content = image_bytes()
+
+        res = self.upload(train, content, name="Some Name.PNG")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        train.refresh_from_db()
+        self.assertEqual(
+            train.image.name,
+            f"uploads/trains/{hashlib.sha256(content).hexdigest()}.png",
+        )
+
+    def test_identical_uploads_stored_once(self):
+        first, second = sample_train(name="A"), sample_train(name="B")
+        content = image_bytes()
+
+        self.upload(first, content)
+        self.upload(second, content, name="copy.png")
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image.name, second.image.name)
+        digest = hashlib.sha256(content).hexdigest()
+        stored = [
+            name
+            for name in os.listdir(os.path.dirname(first.image.path))
+            if name.startswith(digest)
+        ]
+        self.assertEqual(stored, [f"{digest}.png"])
+
+    def test_different_content_stored_separately(self):
+        first, second = sample_train(name="A"), sample_train(name="B")
+
+        self.upload(first, image_bytes((1, 2, 3)))
+        self.upload(second, image_bytes((3, 2, 1)))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertNotEqual(first.image.name, second.image.name)
+
+    def test_truncated_header_rejected(self):
+        res = self.upload(sample_train(), image_bytes()[:10])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_extension_comes_from_detected_format(self):
+        train = sample_train()
+        content = image_bytes(image_format="JPEG")
+
+        res = self.upload(train, content, name="photo.png")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        train.refresh_from_db()
+        self.assertTrue(train.image.name.endswith(".jpg"))
+
+    def test_non_image_extension_rejected(self):
+        res = self.upload(sample_train(), image_bytes(), name="x.html")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unsupported_format_rejected(self):
+        res = self.upload(sample_train(), image_bytes(image_format="BMP"), "a.bmp")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
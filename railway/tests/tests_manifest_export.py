@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.models import Order, Ticket
+from railway.tests.tests_railway_api import sample_trip
+
+DAY_MANIFEST_URL = reverse("railway:trip-day-manifest")
+
+
+def manifest_url(trip_id):
+    return reverse("railway:trip-manifest", args=[trip_id])
+
+
+def read_streaming(response):
+    return b"".join(response.streaming_content).decode()
+
+
+class ManifestExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.passenger = get_user_model().objects.create_user(
+            "passenger@gmail.com", "testpass", first_name="Ivan", last_name="Franko"
+        )
+        self.client.force_authenticate(self.admin)
+
+        self.trip = sample_trip()
+        order = Order.objects.create(user=self.passenger)
+        Ticket.objects.create(trip=self.trip, order=order, cargo=1, seat=2)
+        Ticket.objects.create(trip=self.trip, order=order, cargo=1, seat=1)
+
+    def test_trip_manifest_csv(self):
+        res = self.client.get(manifest_url(self.trip.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(read_streaming(res))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual([row["seat"] for row in rows], ["1", "2"])
+        self.assertEqual(rows[0]["email"], "passenger@gmail.com")
+        self.assertEqual(rows[0]["source"], "Kyiv")
+
+    def test_day_manifest_ndjson(self):
+        other_day = sample_trip(
+            departure_time=self.trip.departure_time + timedelta(days=1),
+            arrival_time=self.trip.arrival_time + timedelta(days=1),
+        )
+        Ticket.objects.create(
+            trip=other_day,
+            order=Order.objects.create(user=self.passenger),
+            cargo=2,
+            seat=1,
+        )
+
+        res = self.client.get(
+            DAY_MANIFEST_URL,
+            {
+                "date": timezone.localdate(self.trip.departure_time).isoformat(),
+                "file_format": "ndjson",
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        records = [json.loads(line) for line in read_streaming(res).splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertTrue(all(record["trip_id"] == self.trip.id for record in records))
+
+    def test_day_manifest_requires_date(self):
+        res = self.client.get(DAY_MANIFEST_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(DAY_MANIFEST_URL, {"date": "2025-02-30"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trip_manifest_missing_trip(self):
+        res = self.client.get(manifest_url(self.trip.id + 1000))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_manifest_admin_only(self):
+        self.client.force_authenticate(self.passenger)
+        res = self.client.get(manifest_url(self.trip.id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_manifest_command(self):
+        out = io.StringIO()
+        call_command("export_manifest", trip=self.trip.id, stdout=out)
+
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
+
+    def test_export_manifest_command_invalid_date(self):
+        with self.assertRaises(CommandError):
+            call_command("export_manifest", date="2025-02-30")
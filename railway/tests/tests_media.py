@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+MEDIA_ROOT = tempfile.mkdtemp()
+HASHED_NAME = "uploads/trains/" + "ab" * 32 + ".png"
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE_HEADER=None)
+class ServeMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in (HASHED_NAME, "plain.txt"):
+            path = os.path.join(MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def url(self, name):
+        return reverse("media", args=[name])
+
+    def test_full_file_with_immutable_cache(self):
+        res = self.client.get(self.url(HASHED_NAME))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/png")
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+
+    def test_unhashed_name_not_immutable(self):
+        res = self.client.get(self.url("plain.txt"))
+        self.assertNotIn("immutable", res["Cache-Control"])
+
+    def test_range_request(self):
+        res = self.client.get(self.url(HASHED_NAME), HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+
+    def test_suffix_range_request(self):
+        res = self.client.get(self.url(HASHED_NAME), HTTP_RANGE="bytes=-5")
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(self.url(HASHED_NAME), HTTP_RANGE="bytes=5000-")
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_multi_and_malformed_ranges_ignored(self):
+        for header in ("bytes=0-1,5-9", "bytes=9-5", "items=0-5", "bytes=x-"):
+            res = self.client.get(self.url(HASHED_NAME), HTTP_RANGE=header)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK, header)
+            self.assertEqual(b"".join(res.streaming_content), CONTENT)
+
+    def test_conditional_request_not_modified(self):
+        etag = self.client.get(self.url(HASHED_NAME))["ETag"]
+        res = self.client.get(self.url(HASHED_NAME), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_and_traversal_return_404(self):
+        self.assertEqual(self.client.get(self.url("missing.png")).status_code, 404)
+        self.assertEqual(
+            self.client.get("/media/../../etc/passwd").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    @override_settings(
+        MEDIA_SENDFILE_HEADER="X-Accel-Redirect",
+        MEDIA_SENDFILE_PREFIX="/internal-media/",
+    )
+    def test_accel_redirect_handoff(self):
+        res = self.client.get(self.url(HASHED_NAME))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["X-Accel-Redirect"], f"/internal-media/{HASHED_NAME}")
+        self.assertEqual(res.content, b"")
+
+    @override_settings(MEDIA_SENDFILE_HEADER="X-Sendfile")
+    def test_sendfile_handoff(self):
+        res = self.client.get(self.url(HASHED_NAME))
+        self.assertEqual(res["X-Sendfile"], os.path.join(MEDIA_ROOT, HASHED_NAME))
@@ -0,0 +1,100 @@
+import random
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from railway.distances import (
+    StationCoordinates,
+    check_route_distances,
+    station_distances,
+)
+from railway.geo import haversine_km
+from railway.models import Route
+from railway.tests.tests_railway_api import sample_station
+
+
+class StationCoordinatesTests(SimpleTestCase):
+    def test_matches_haversine(self):
+        rng = random.Random(11)
+        rows = [
+            (index, rng.uniform(-80, 80), rng.uniform(-180, 180)) for index in range(40)
+        ]
+        coordinates = StationCoordinates(rows)
+
+        pairs = [(rng.randrange(40), rng.randrange(40)) for _ in range(200)]
+        for (source, destination), distance in zip(pairs, coordinates.distances(pairs)):
+            expected = haversine_km(*rows[source][1:], *rows[destination][1:])
+            self.assertAlmostEqual(distance, expected, places=6)
+
+    def test_matrix_matches_pairs(self):
+        coordinates = StationCoordinates(
+            [(1, 50.45, 30.52), (4, 49.84, 24.03), (9, 46.48, 30.72)]
+        )
+
+        triples = list(coordinates.pairs())
+
+        self.assertEqual([triple[:2] for triple in triples], [(1, 4), (1, 9), (4, 9)])
+        self.assertEqual(list(coordinates.matrix()), [t[2] for t in triples])
+
+
+class RouteDistanceTests(TestCase):
+    def setUp(self):
+        station_distances.invalidate()
+        self.addCleanup(station_distances.invalidate)
+        self.kyiv = sample_station(name="Kyiv", latitude=50.45, longitude=30.52)
+        self.lviv = sample_station(name="Lviv", latitude=49.84, longitude=24.03)
+        self.odesa = sample_station(name="Odesa", latitude=46.48, longitude=30.72)
+        self.wrong = Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=540
+        )
+        self.right = Route.objects.create(
+            source=self.kyiv, destination=self.odesa, distance=442
+        )
+
+    def test_check_route_distances(self):
+        checked, mismatches = check_route_distances(tolerance_km=1)
+
+        self.assertEqual(checked, 2)
+        self.assertEqual([route["id"] for route in mismatches], [self.wrong.id])
+        self.assertAlmostEqual(mismatches[0]["computed"], 467.5, delta=1)
+
+    def test_command_fix(self):
+        out = StringIO()
+
+        call_command("recompute_route_distances", "--fix", stdout=out)
+
+        self.assertIn("2 checked, 1 fixed", out.getvalue())
+        self.wrong.refresh_from_db()
+        self.assertEqual(self.wrong.distance, 467)
+        self.right.refresh_from_db()
+        self.assertEqual(self.right.distance, 442)
+
+    def test_command_pairs(self):
+        out = StringIO()
+
+        call_command(
+            "recompute_route_distances", "--pairs", "--max-distance", 450, stdout=out
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "source,destination,distance")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f"{self.kyiv.id},{self.odesa.id},"))
+
+    @override_settings(STATION_DISTANCES={"MATRIX": True})
+    def test_matrix_lookup(self):
+        distance = station_distances.distance(self.lviv.id, self.kyiv.id)
+
+        self.assertAlmostEqual(distance, haversine_km(49.84, 24.03, 50.45, 30.52))
+        self.assertEqual(station_distances.distance(self.kyiv.id, self.kyiv.id), 0)
+        with self.assertNumQueries(0):
+            station_distances.distance(self.kyiv.id, self.odesa.id)
+
+    def test_station_change_invalidates(self):
+        station_distances.distance(self.kyiv.id, self.lviv.id)
+
+        self.lviv.latitude, self.lviv.longitude = 50.45, 30.53
+        self.lviv.save()
+
+        self.assertLess(station_distances.distance(self.kyiv.id, self.lviv.id), 1)
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.models import Route
+from railway.routes import ROUTE_LOOKUP_VERSION_KEY, route_lookup
+from railway.tests.tests_railway_api import sample_station, sample_trip
+
+ROUTE_URL = reverse("railway:route-list")
+TRIP_URL = reverse("railway:trip-list")
+
+
+class RouteLookupTests(TestCase):
+    def setUp(self):
+        route_lookup.invalidate()
+        self.addCleanup(route_lookup.invalidate)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("routes@test.com", "pass1234")
+        self.client.force_authenticate(self.user)
+        self.kyiv = sample_station(name="Kyiv")
+        self.lviv = sample_station(name="Lviv")
+        self.odesa = sample_station(name="Odesa")
+        self.kyiv_lviv = Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=540
+        )
+        self.lviv_kyiv = Route.objects.create(
+            source=self.lviv, destination=self.kyiv, distance=540
+        )
+        self.kyiv_odesa = Route.objects.create(
+            source=self.kyiv, destination=self.odesa, distance=475
+        )
+
+    def test_pair_is_unique(self):
+        with self.assertRaises(IntegrityError):
+            Route.objects.create(source=self.kyiv, destination=self.lviv, distance=1)
+
+    def test_route_ids(self):
+        self.assertIsNone(route_lookup.route_ids())
+        self.assertEqual(
+            route_lookup.route_ids(source="KY"),
+            sorted([self.kyiv_lviv.id, self.kyiv_odesa.id]),
+        )
+        self.assertEqual(
+            route_lookup.route_ids(destination_id=self.kyiv.id), [self.lviv_kyiv.id]
+        )
+        self.assertEqual(
+            route_lookup.route_ids(source_id=self.kyiv.id, destination="des"),
+            [self.kyiv_odesa.id],
+        )
+        self.assertEqual(route_lookup.route_ids(source="Paris"), [])
+
+    def test_cached_lookup_costs_no_queries(self):
+        route_lookup.route_ids(source="Kyiv")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                route_lookup.route_id(self.kyiv.id, self.lviv.id), self.kyiv_lviv.id
+            )
+            route_lookup.route_ids(source="Kyiv", destination="Lviv")
+
+    def test_lookup_refreshed_on_route_change(self):
+        route_lookup.route_ids(source="Odesa")
+
+        route = Route.objects.create(
+            source=self.odesa, destination=self.lviv, distance=790
+        )
+
+        self.assertEqual(route_lookup.route_ids(source="Odesa"), [route.id])
+
+    def test_lookup_reloaded_on_version_change(self):
+        route_lookup.route_ids(source="Odesa")
+        # bulk_create sends no signals: the change comes from another worker.
+        (route,) = Route.objects.bulk_create(
+            [Route(source=self.odesa, destination=self.lviv, distance=790)]
+        )
+        cache.set(ROUTE_LOOKUP_VERSION_KEY, "other worker")
+
+        self.assertEqual(route_lookup.route_ids(source="Odesa"), [route.id])
+
+    def test_filter_routes(self):
+        res = self.client.get(ROUTE_URL, {"source": "kyiv", "destination": "lviv"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [route["id"] for route in res.data["results"]], [self.kyiv_lviv.id]
+        )
+
+        res = self.client.get(ROUTE_URL, {"destination_id": self.odesa.id})
+        self.assertEqual(
+            [route["id"] for route in res.data["results"]], [self.kyiv_odesa.id]
+        )
+
+    def test_filter_invalid_id(self):
+        res = self.client.get(ROUTE_URL, {"source_id": "kyiv"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_trips_by_station_id(self):
+        trip = sample_trip(route=self.kyiv_odesa)
+        sample_trip(route=self.kyiv_lviv)
+
+        res = self.client.get(
+            TRIP_URL, {"source_id": self.kyiv.id, "destination_id": self.odesa.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in res.data["results"]], [trip.id])
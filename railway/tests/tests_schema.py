@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from modern_railway import schema
+from modern_railway.schema import schema_cache
+from railway.management.commands.import_report import (
+    parse_importtime,
+    still_imported,
+)
+
+SCHEMA_URL = reverse("schema")
+
+
+@override_settings(OPENAPI_SCHEMA_FILE=None)
+class CachedSchemaTests(SimpleTestCase):
+    def setUp(self):
+        schema_cache.clear()
+        self.addCleanup(schema_cache.clear)
+
+    def test_schema_generated_once_and_served_with_etag(self):
+        with mock.patch.object(
+            schema, "_generate_schema", wraps=schema._generate_schema
+        ) as generate:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn(b"/api/railway/trips/", first.content)
+        self.assertTrue(first["Content-Type"].startswith("application/vnd.oai.openapi"))
+        self.assertIn("/api/railway/trips/", json.loads(second.content)["paths"])
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertIn(
+            "jwtAuth", json.loads(second.content)["components"]["securitySchemes"]
+        )
+
+    def test_not_modified_when_etag_matches(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["ETag"], etag)
+
+    def test_prebuilt_schema_file_is_served(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "schema.json")
+            with open(path, "w") as file:
+                json.dump({"openapi": "3.0.3", "paths": {"/prebuilt/": {}}}, file)
+
+            with override_settings(OPENAPI_SCHEMA_FILE=path), mock.patch.object(
+                schema, "_generate_schema"
+            ) as generate:
+                res = self.client.get(SCHEMA_URL, HTTP_ACCEPT="application/json")
+
+        generate.assert_not_called()
+        self.assertEqual(json.loads(res.content)["paths"], {"/prebuilt/": {}})
+
+
+class ImportReportTests(SimpleTestCase):
+    def test_parse_importtime_sums_per_package(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |   django.utils\n"
+            "import time:        50 |        150 | django\n"
+            "import time:        30 |         30 | yaml\n"
+        )
+
+        self.assertEqual(parse_importtime(output), {"django": 150, "yaml": 30})
+
+    def test_still_imported_lists_skipped_apps_only(self):
+        totals = {"django": 10, "drf_spectacular": 20, "yaml": 30}
+
+        self.assertEqual(still_imported(totals), ["drf_spectacular"])
+
+    def test_lean_profile_serves_no_schema(self):
+        script = (
+            "import django; django.setup()\n"
+            "from django.urls import NoReverseMatch, reverse\n"
+            "try:\n    reverse('schema')\nexcept NoReverseMatch:\n"
+            "    print('no schema')\n"
+        )
+        env = dict(os.environ, DJANGO_LEAN_STARTUP="1")
+        env.setdefault("DJANGO_SETTINGS_MODULE", "modern_railway.settings")
+
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual(result.stdout.strip(), "no schema")
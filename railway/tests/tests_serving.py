@@ -0,0 +1,36 @@
+import sys
+
+from django.test import SimpleTestCase
+
+from railway.management.commands.serve import GUNICORN_CONFIG, Command
+
+
+class ServeCommandTests(SimpleTestCase):
+    def test_gunicorn_argv(self):
+        argv = Command.gunicorn_argv(bind="127.0.0.1:9000", workers=3)
+
+        self.assertEqual(
+            argv,
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "--config",
+                GUNICORN_CONFIG,
+                "--bind",
+                "127.0.0.1:9000",
+                "--workers",
+                "3",
+                "modern_railway.wsgi:application",
+            ],
+        )
+
+    def test_config_defaults(self):
+        config = {}
+        with open(GUNICORN_CONFIG) as file:
+            exec(file.read(), config)
+
+        self.assertTrue(config["preload_app"])
+        self.assertGreaterEqual(config["workers"], 3)
+        self.assertGreater(config["max_requests"], 0)
+        self.assertGreater(config["keepalive"], 0)
@@ -0,0 +1,123 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.autocomplete import (
+    StationTrie,
+    completion_keys,
+    fold,
+    station_autocomplete,
+)
+from railway.models import Route, Trip
+from railway.tests.tests_railway_api import sample_station, sample_train
+
+AUTOCOMPLETE_URL = reverse("railway:station-autocomplete")
+
+
+def brute_force_complete(names, prefix, limit=10):
+    prefix = fold(prefix).strip()
+    hits = sorted(
+        (-score, name, station_id)
+        for station_id, (name, score) in names.items()
+        if any(key.startswith(prefix) for key in completion_keys(name))
+    )
+    return [station_id for _, _, station_id in hits[:limit]]
+
+
+class StationTrieTests(SimpleTestCase):
+    def test_fold(self):
+        self.assertEqual(fold("Łódź Kaliska"), "łodz kaliska")
+        self.assertEqual(fold("ÉCLUSE"), "ecluse")
+
+    def test_completion_keys(self):
+        self.assertEqual(
+            completion_keys("Kyiv-Pasazhyrskyi"), {"kyiv-pasazhyrskyi", "pasazhyrskyi"}
+        )
+
+    def test_ranked_by_score(self):
+        trie = StationTrie.build([(1, "Kyiv", 5), (2, "Kyivska", 9), (3, "Lviv", 1)])
+
+        self.assertEqual([row["id"] for row in trie.complete("ky")], [2, 1])
+        self.assertEqual(trie.complete("ky", 1)[0]["trip_count"], 9)
+        self.assertEqual(trie.complete("x"), [])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(5)
+        names, trie = {}, StationTrie()
+        for step in range(1500):
+            if rng.random() < 0.6 or not names:
+                station_id = rng.randrange(200)
+                name = "".join(rng.choice("abcdeé -") for _ in range(rng.randint(1, 8)))
+                name, score = name.strip() or "x", rng.randrange(20)
+                names[station_id] = (name, score)
+                trie.insert(station_id, name, score)
+            else:
+                station_id = rng.choice(list(names))
+                del names[station_id]
+                trie.remove(station_id)
+            if step % 25 == 0:
+                for prefix in ("", "a", "E", "ab", "c d", "bee"):
+                    self.assertEqual(
+                        [row["id"] for row in trie.complete(prefix)],
+                        brute_force_complete(names, prefix),
+                    )
+
+
+class StationAutocompleteApiTests(TestCase):
+    def setUp(self):
+        station_autocomplete.invalidate()
+        self.addCleanup(station_autocomplete.invalidate)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("ac@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.kyiv = sample_station(name="Kyiv")
+        self.kyivska = sample_station(name="Kyivska Street")
+        self.lviv = sample_station(name="Lviv")
+        Trip.objects.create(
+            route=Route.objects.create(
+                source=self.kyivska, destination=self.lviv, distance=500
+            ),
+            train=sample_train(),
+            departure_time=timezone.now() + timedelta(hours=2),
+            arrival_time=timezone.now() + timedelta(hours=6),
+        )
+
+    def test_autocomplete(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "KY"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {"id": self.kyivska.id, "name": "Kyivska Street", "trip_count": 1},
+                {"id": self.kyiv.id, "name": "Kyiv", "trip_count": 0},
+            ],
+        )
+
+    def test_autocomplete_word_start(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "stre"})
+        self.assertEqual([row["name"] for row in res.data], ["Kyivska Street"])
+
+    def test_autocomplete_requires_query(self):
+        res = self.client.get(AUTOCOMPLETE_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_station_changes_update_trie(self):
+        self.client.get(AUTOCOMPLETE_URL, {"q": "ky"})
+
+        self.kyiv.name = "Odesa"
+        self.kyiv.save()
+        self.lviv.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [row["name"] for row in station_autocomplete.complete("o")], ["Odesa"]
+            )
+            self.assertEqual(station_autocomplete.complete("lv"), [])
+            self.assertEqual(len(station_autocomplete.complete("ky")), 1)
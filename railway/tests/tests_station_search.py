@@ -0,0 +1,152 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.geo import KDTree, geohash_encode, haversine_km
+from railway.models import Station
+from railway.stations import nearest_stations_db, station_index
+from railway.tests.tests_railway_api import sample_station
+
+NEARBY_URL = reverse("railway:station-nearby")
+WITHIN_URL = reverse("railway:station-within")
+
+
+def brute_force_nearest(points, latitude, longitude, k):
+    return sorted(
+        points, key=lambda point: haversine_km(latitude, longitude, *point[:2])
+    )[:k]
+
+
+class GeoTests(SimpleTestCase):
+    def test_geohash_encode(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash_encode(50.45, 30.52, 5), "u8vxn")
+
+    def test_haversine_km(self):
+        self.assertAlmostEqual(haversine_km(50.45, 30.52, 49.84, 24.03), 467, delta=2)
+
+    def test_kd_tree_matches_brute_force(self):
+        rng = random.Random(7)
+        points = [
+            (rng.uniform(44, 53), rng.uniform(22, 40), index) for index in range(2000)
+        ]
+        tree = KDTree(points)
+
+        for _ in range(50):
+            latitude, longitude = rng.uniform(44, 53), rng.uniform(22, 40)
+            found = [point for _, point in tree.nearest(latitude, longitude, 5)]
+            self.assertEqual(found, brute_force_nearest(points, latitude, longitude, 5))
+
+        box = tree.within(48, 30, 49, 31)
+        self.assertCountEqual(
+            box, [p for p in points if 48 <= p[0] <= 49 and 30 <= p[1] <= 31]
+        )
+
+    def test_kd_tree_radius(self):
+        tree = KDTree([(50.0, 30.0, "a"), (50.1, 30.0, "b"), (51.0, 30.0, "c")])
+
+        found = tree.nearest(50.0, 30.0, 10, max_distance_km=20)
+
+        self.assertEqual([point[2] for _, point in found], ["a", "b"])
+
+
+class NearbyStationsApiTests(TestCase):
+    def setUp(self):
+        station_index.invalidate()
+        self.addCleanup(station_index.invalidate)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("geo@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.kyiv = sample_station(name="Kyiv", latitude=50.45, longitude=30.52)
+        self.lviv = sample_station(name="Lviv", latitude=49.84, longitude=24.03)
+        self.odesa = sample_station(name="Odesa", latitude=46.48, longitude=30.72)
+
+    def test_station_geohash_saved(self):
+        self.assertEqual(self.kyiv.geohash, geohash_encode(50.45, 30.52))
+
+    def test_nearby(self):
+        res = self.client.get(
+            NEARBY_URL, {"latitude": 50.0, "longitude": 30.0, "limit": 2}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["name"] for row in res.data], ["Kyiv", "Odesa"])
+        self.assertAlmostEqual(res.data[0]["distance"], 62.2, delta=0.5)
+
+    def test_nearby_radius(self):
+        res = self.client.get(
+            NEARBY_URL, {"latitude": 50.0, "longitude": 30.0, "radius": 100}
+        )
+        self.assertEqual([row["name"] for row in res.data], ["Kyiv"])
+
+    def test_nearby_invalid_params(self):
+        res = self.client.get(NEARBY_URL, {"latitude": 120, "longitude": 30})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_within(self):
+        res = self.client.get(
+            WITHIN_URL,
+            {
+                "min_latitude": 49,
+                "min_longitude": 23,
+                "max_latitude": 51,
+                "max_longitude": 31,
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["name"] for row in res.data], ["Kyiv", "Lviv"])
+
+    def test_index_refreshed_on_station_change(self):
+        self.client.get(NEARBY_URL, {"latitude": 50.0, "longitude": 30.0})
+
+        self.odesa.latitude, self.odesa.longitude = 50.01, 30.01
+        self.odesa.save()
+
+        res = self.client.get(
+            NEARBY_URL, {"latitude": 50.0, "longitude": 30.0, "limit": 1}
+        )
+        self.assertEqual(res.data[0]["name"], "Odesa")
+
+    def test_cached_index_costs_no_queries(self):
+        self.client.get(NEARBY_URL, {"latitude": 50.0, "longitude": 30.0})
+
+        with self.assertNumQueries(0):
+            station_index.nearest(50.0, 30.0, 3)
+
+    @override_settings(STATION_INDEX={"ENABLED": False})
+    def test_database_fallback(self):
+        res = self.client.get(
+            NEARBY_URL, {"latitude": 50.0, "longitude": 30.0, "limit": 2}
+        )
+        self.assertEqual([row["name"] for row in res.data], ["Kyiv", "Odesa"])
+
+    def test_database_fallback_matches_brute_force(self):
+        rng = random.Random(3)
+        Station.objects.bulk_create(
+            Station(
+                name=f"S{index}",
+                latitude=latitude,
+                longitude=longitude,
+                geohash=geohash_encode(latitude, longitude),
+            )
+            for index, (latitude, longitude) in enumerate(
+                (rng.uniform(48, 51), rng.uniform(28, 32)) for _ in range(300)
+            )
+        )
+        points = list(Station.objects.values_list("latitude", "longitude", "id"))
+
+        for _ in range(10):
+            latitude, longitude = rng.uniform(48, 51), rng.uniform(28, 32)
+            found = [
+                point[2] for _, point in nearest_stations_db(latitude, longitude, 5)
+            ]
+            expected = [
+                point[2]
+                for point in brute_force_nearest(points, latitude, longitude, 5)
+            ]
+            self.assertEqual(found, expected)
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from modern_railway import throttling
+from modern_railway.throttling import (
+    FileThrottleStore,
+    MemoryThrottleStore,
+    SharedScopedRateThrottle,
+    SharedUserRateThrottle,
+    sliding_window,
+)
+
+TRIP_URL = reverse("railway:trip-list")
+ORDER_URL = reverse("railway:order-list")
+
+
+def _hit_file_store(path, count, results, threads=1):
+    store = FileThrottleStore(path, slots=128)
+
+    def hit():
+        for _ in range(count):
+            results.put(store.hit("shared-key", 10, 3600)[0])
+
+    workers = [threading.Thread(target=hit) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def test_counts_within_window(self):
+        state, allowed, wait = sliding_window((5, 2, 0), 5, 0.5, 3)
+        self.assertTrue(allowed)
+        self.assertEqual(state, (5, 3, 0))
+
+        state, allowed, wait = sliding_window(state, 5, 0.5, 3)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.5)
+
+    def test_previous_window_weighs_in(self):
+        state, allowed, _ = sliding_window((4, 10, 0), 5, 0.5, 10)
+        self.assertTrue(allowed)
+        self.assertEqual(state, (5, 1, 10))
+
+        _, allowed, wait = sliding_window((4, 10, 0), 5, 0.05, 9)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.05)
+
+    def test_old_windows_are_forgotten(self):
+        state, allowed, _ = sliding_window((1, 10, 10), 5, 0.0, 10)
+        self.assertTrue(allowed)
+        self.assertEqual(state, (5, 1, 0))
+
+
+class ThrottleStoreTests(SimpleTestCase):
+    def test_memory_store_limits_per_key(self):
+        store = MemoryThrottleStore(slots=128)
+        results = [store.hit("a", 3, 3600)[0] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+        self.assertTrue(store.hit("b", 3, 3600)[0])
+        self.assertGreater(store.hit("a", 3, 3600)[1], 0)
+
+    def run_file_store_processes(self, directory, count, threads=1):
+        path = os.path.join(directory, "throttle")
+        results = multiprocessing.get_context("fork").Queue()
+        processes = [
+            multiprocessing.get_context("fork").Process(
+                target=_hit_file_store, args=(path, count, results, threads)
+            )
+            for _ in range(2)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return [results.get() for _ in range(2 * threads * count)]
+
+    def test_file_store_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            allowed = self.run_file_store_processes(directory, 8)
+
+            self.assertEqual(allowed.count(True), 10)
+            self.assertEqual(
+                os.path.getsize(os.path.join(directory, "throttle")),
+                128 * throttling.SLOT.size,
+            )
+
+    def test_file_store_limit_holds_with_threaded_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            allowed = self.run_file_store_processes(directory, 25, threads=4)
+
+        self.assertEqual(allowed.count(True), 10)
+
+
+class ScopedThrottleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "throttled@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        patches = [
+            mock.patch.object(throttling, "_store", MemoryThrottleStore(slots=128)),
+            mock.patch.object(SharedUserRateThrottle, "THROTTLE_RATES", {"user": None}),
+            mock.patch.object(
+                SharedScopedRateThrottle,
+                "THROTTLE_RATES",
+                {"trips": "3/minute", "orders": "5/minute", "order_create": "1/hour"},
+            ),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_trip_browsing_scope(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(TRIP_URL).status_code, status.HTTP_200_OK)
+
+        res = self.client.get(TRIP_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+    def test_order_creation_limited_separately(self):
+        self.client.post(ORDER_URL, {"tickets": []}, format="json")
+        res = self.client.post(ORDER_URL, {"tickets": []}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        self.assertEqual(self.client.get(ORDER_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(TRIP_URL).status_code, status.HTTP_200_OK)
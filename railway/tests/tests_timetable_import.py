@@ -0,0 +1,206 @@
+import io
+import json
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.importers import TimetableImporter, TimetableImportError
+from railway.models import Station, Route, Crew, Trip, Train, TrainType
+
+TIMETABLE_IMPORT_URL = reverse("railway:timetable-import")
+
+
+def sample_bundle():
+    return {
+        "stations": [
+            {"name": "Kyiv", "latitude": 50.45, "longitude": 30.52},
+            {"name": "Lviv", "latitude": 49.84, "longitude": 24.03},
+        ],
+        "trains": [
+            {
+                "name": "Hyundai",
+                "train_type": "Intercity+",
+                "cargo_num": 9,
+                "places_in_cargo": 50,
+            }
+        ],
+        "crew": [
+            {"first_name": "Bob", "last_name": "Lasso", "position": "Driver"},
+            {"first_name": "Ann", "last_name": "Lee", "position": "Conductor"},
+        ],
+        "routes": [{"source": "Kyiv", "destination": "Lviv", "distance": 540}],
+        "trips": [
+            {
+                "source": "Kyiv",
+                "destination": "Lviv",
+                "train": "Hyundai",
+                "departure_time": "2030-01-01T08:00:00Z",
+                "arrival_time": "2030-01-01T14:00:00Z",
+                "crew": ["Bob Lasso", "Ann Lee"],
+            },
+            {
+                "source": "Kyiv",
+                "destination": "Lviv",
+                "train": "Hyundai",
+                "departure_time": "2030-01-02T08:00:00Z",
+                "arrival_time": "2030-01-02T14:00:00Z",
+                "crew": "Bob Lasso",
+            },
+        ],
+    }
+
+
+class TimetableImporterTests(TestCase):
+    def test_import_creates_rows_and_crew_links(self):
+        stats = TimetableImporter().run(sample_bundle())
+
+        self.assertEqual(stats["trips"], {"created": 2, "updated": 0})
+        self.assertEqual(Station.objects.count(), 2)
+        self.assertEqual(Route.objects.count(), 1)
+        self.assertEqual(Crew.objects.count(), 2)
+        self.assertEqual(Trip.objects.count(), 2)
+        first_trip = Trip.objects.order_by("departure_time").first()
+        self.assertEqual(first_trip.crew.count(), 2)
+
+    def test_reimport_is_idempotent(self):
+        TimetableImporter().run(sample_bundle())
+
+        bundle = sample_bundle()
+        bundle["routes"][0]["distance"] = 550
+        bundle["trips"][0]["crew"] = ["Ann Lee"]
+        stats = TimetableImporter().run(bundle)
+
+        self.assertEqual(stats["trips"], {"created": 0, "updated": 0})
+        self.assertEqual(stats["routes"], {"created": 0, "updated": 1})
+        self.assertEqual(Trip.objects.count(), 2)
+        self.assertEqual(Route.objects.get().distance, 550)
+        first_trip = Trip.objects.order_by("departure_time").first()
+        self.assertEqual(
+            list(first_trip.crew.values_list("last_name", flat=True)), ["Lee"]
+        )
+
+    def test_invalid_times_roll_back_import(self):
+        bundle = sample_bundle()
+        bundle["trips"][1]["arrival_time"] = bundle["trips"][1]["departure_time"]
+
+        with self.assertRaises(TimetableImportError) as error:
+            TimetableImporter().run(bundle)
+
+        self.assertIn("trips row 2", error.exception.errors[0])
+        self.assertFalse(Station.objects.exists())
+        self.assertFalse(Trip.objects.exists())
+
+    def test_train_double_booking_rolls_back_import(self):
+        TimetableImporter().run(sample_bundle())
+        bundle = sample_bundle()
+        bundle["trips"][1]["departure_time"] = "2030-01-01T12:00:00Z"
+        bundle["trips"][1]["arrival_time"] = "2030-01-01T16:00:00Z"
+        bundle["trips"] = [
+            bundle["trips"][1],
+            dict(bundle["trips"][1], departure_time="2030-01-01T15:00:00Z"),
+        ]
+
+        with self.assertRaises(TimetableImportError) as error:
+            TimetableImporter().run(bundle)
+
+        self.assertEqual(
+            error.exception.errors,
+            [
+                "trips row 1: train is already assigned to trip "
+                f"{Trip.objects.order_by('departure_time').first().id} then",
+                "trips row 2: train is already assigned to trips row 1 then",
+            ],
+        )
+        self.assertEqual(Trip.objects.count(), 2)
+
+    def test_non_object_rows_reported(self):
+        bundle = sample_bundle()
+        bundle["trains"].append("Tarpan")
+
+        with self.assertRaises(TimetableImportError) as error:
+            TimetableImporter().run(bundle)
+
+        self.assertEqual(
+            error.exception.errors, ["trains row 2: row must be an object"]
+        )
+
+    def test_missing_train_type_reported(self):
+        bundle = sample_bundle()
+        bundle["trains"][0]["train_type"] = None
+
+        with self.assertRaises(TimetableImportError) as error:
+            TimetableImporter().run(bundle)
+
+        self.assertEqual(
+            error.exception.errors,
+            ["trains row 1: name, train_type, cargo_num and places_in_cargo required"],
+        )
+        self.assertFalse(TrainType.objects.filter(name="None").exists())
+
+
+class TimetableImportApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@admin.com", "testpass", is_staff=True
+            )
+        )
+
+    def test_import_zip_bundle(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr(
+                "stations.csv", "name,latitude,longitude\nKyiv,50.45,30.52\n"
+            )
+            archive.writestr(
+                "trains.csv",
+                "name,train_type,cargo_num,places_in_cargo\nTarpan,Regional,3,30\n",
+            )
+        bundle = SimpleUploadedFile("timetable.zip", buffer.getvalue())
+
+        res = self.client.post(TIMETABLE_IMPORT_URL, {"bundle": bundle})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["stations"]["created"], 1)
+        self.assertTrue(Train.objects.filter(name="Tarpan").exists())
+
+    def test_import_reports_errors(self):
+        bundle = sample_bundle()
+        bundle["trips"][0]["train"] = "Unknown"
+        upload = SimpleUploadedFile(
+            "timetable.json", json.dumps(bundle).encode(), "application/json"
+        )
+
+        res = self.client.post(TIMETABLE_IMPORT_URL, {"bundle": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("errors", res.data)
+
+    def test_malformed_bundles_rejected(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("stations.csv", b"name,latitude\n\xff\xfe,1\n")
+        uploads = [
+            SimpleUploadedFile("timetable.json", b"{not json"),
+            SimpleUploadedFile("timetable.json", b'{"trains": "Tarpan"}'),
+            SimpleUploadedFile("timetable.zip", buffer.getvalue()),
+        ]
+
+        for upload in uploads:
+            res = self.client.post(TIMETABLE_IMPORT_URL, {"bundle": upload})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("errors", res.data)
+
+    def test_import_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@gmail.com", "testpass")
+        )
+        res = self.client.post(TIMETABLE_IMPORT_URL, {})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.fleet import available_trains, find_train_conflict
+from railway.models import Trip
+from railway.tests.tests_railway_api import sample_route, sample_train
+
+TRIP_URL = reverse("railway:trip-list")
+AVAILABLE_TRAINS_URL = reverse("railway:train-available")
+
+
+class TrainBookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "fleet@test.com", "pass1234"
+        )
+        self.client.force_authenticate(self.admin)
+        self.route = sample_route()
+        self.train = sample_train(name="Hyundai")
+        self.spare = sample_train(name="Skoda")
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.trip = self.trip_for(self.train, self.start, hours=4)
+        self.trip.save()
+
+    def trip_for(self, train, departure, hours):
+        return Trip(
+            route=self.route,
+            train=train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=hours),
+        )
+
+    def test_constraint_rejects_overlap(self):
+        clash = self.trip_for(self.train, self.start + timedelta(hours=3), hours=2)
+
+        with self.assertRaises(ValidationError):
+            clash.save()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Trip.objects.bulk_create([clash])
+
+    def test_back_to_back_trips_allowed(self):
+        self.trip_for(self.train, self.start + timedelta(hours=4), hours=2).save()
+        self.trip_for(self.spare, self.start, hours=4).save()
+
+        self.assertEqual(Trip.objects.count(), 3)
+
+    def test_find_train_conflict(self):
+        self.assertEqual(
+            find_train_conflict(
+                self.train.id, self.start, self.start + timedelta(hours=1)
+            ),
+            self.trip.id,
+        )
+        self.assertIsNone(
+            find_train_conflict(
+                self.train.id,
+                self.start,
+                self.start + timedelta(hours=1),
+                trip_id=self.trip.id,
+            )
+        )
+
+    def test_create_trip_with_busy_train(self):
+        payload = {
+            "route": self.route.id,
+            "train": self.train.id,
+            "departure_time": self.start + timedelta(hours=1),
+            "arrival_time": self.start + timedelta(hours=2),
+        }
+
+        res = self.client.post(TRIP_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(f"trip {self.trip.id}", res.data["train"][0])
+
+    def test_available_trains(self):
+        window = (self.start + timedelta(hours=1), self.start + timedelta(hours=2))
+        self.assertEqual(list(available_trains(*window)), [self.spare])
+
+        res = self.client.get(
+            AVAILABLE_TRAINS_URL,
+            {"start": window[0].isoformat(), "end": window[1].isoformat()},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [train["id"] for train in res.data["results"]], [self.spare.id]
+        )
+
+    def test_available_trains_invalid_window(self):
+        res = self.client.get(
+            AVAILABLE_TRAINS_URL,
+            {"start": self.start.isoformat(), "end": self.start.isoformat()},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,110 @@
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.images import build_train_image_variants
+from railway.tests.tests_railway_api import sample_train
+from tasks.models import Task
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def sample_image(name="train.png", size=(1200, 600), mode="RGBA"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 10, 10, 255)).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TrainImageVariantsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@railway.com", "password")
+        )
+
+    def test_build_variants_resizes_and_converts(self):
+        train = sample_train(image=sample_image())
+
+        variants = build_train_image_variants(train.id)
+
+        self.assertEqual(set(variants), {"thumbnail", "medium", "webp"})
+        self.assertEqual(
+            (variants["thumbnail"]["width"], variants["thumbnail"]["height"]), (160, 80)
+        )
+        self.assertEqual(variants["webp"]["format"], "webp")
+        train.refresh_from_db()
+        self.assertEqual(train.image_variants, variants)
+
+    def test_identical_images_share_variants(self):
+        first = sample_train(name="A", image=sample_image("a.png"))
+        second = sample_train(name="B", image=sample_image("b.png"))
+
+        self.assertEqual(
+            build_train_image_variants(first.id),
+            build_train_image_variants(second.id),
+        )
+
+    def test_upload_enqueues_variant_task(self):
+        train = sample_train()
+        url = reverse("railway:train-upload-image", args=[train.id])
+
+        res = self.client.post(url, {"image": sample_image()}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(
+            Task.objects.filter(
+                name="railway.tasks.generate_train_image_variants", args=[train.id]
+            ).exists()
+        )
+
+    @override_settings(TASKS={"EAGER": True})
+    def test_variants_exposed_with_srcset(self):
+        train = sample_train()
+        url = reverse("railway:train-upload-image", args=[train.id])
+        self.client.post(url, {"image": sample_image()}, format="multipart")
+
+        res = self.client.get(reverse("railway:train-detail", args=[train.id]))
+
+        image_variants = res.data["image_variants"]
+        self.assertIn("thumbnail", image_variants["variants"])
+        self.assertTrue(image_variants["variants"]["medium"]["url"].startswith("http"))
+        self.assertIn("160w", image_variants["srcset"])
+        self.assertIn("640w", image_variants["srcset"])
+
+    def test_backfill_command(self):
+        train = sample_train(image=sample_image())
+
+        call_command("generate_image_variants", processes=1, stdout=io.StringIO())
+
+        train.refresh_from_db()
+        self.assertIn("medium", train.image_variants)
+
+    def test_backfill_command_force_rewrites_variants(self):
+        train = sample_train(image=sample_image())
+        medium = build_train_image_variants(train.id)["medium"]["name"]
+        stale = io.BytesIO()
+        Image.new("RGB", (10, 10)).save(stale, format="JPEG")
+        with open(train.image.storage.path(medium), "wb") as file:
+            file.write(stale.getvalue())
+
+        call_command(
+            "generate_image_variants", processes=1, force=True, stdout=io.StringIO()
+        )
+
+        with Image.open(train.image.storage.path(medium)) as image:
+            self.assertEqual(image.size, (640, 320))
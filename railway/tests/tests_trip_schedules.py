@@ -0,0 +1,261 @@
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from railway.availability import availability_calendar
+from railway.models import Order, Ticket, Trip, TripSchedule
+from railway.schedules import materialize_schedule, materialize_schedules
+from railway.tests.tests_railway_api import sample_crew, sample_route, sample_train
+
+TRIP_SCHEDULE_URL = reverse("railway:tripschedule-list")
+
+
+def sample_schedule(**params):
+    today = timezone.localdate()
+    defaults = {
+        "route": sample_route(),
+        "train": sample_train(),
+        "departure_time": time(8, 30),
+        "duration": timedelta(hours=5),
+        "days_of_week": list(range(7)),
+        "valid_from": today,
+        "valid_until": today + timedelta(days=13),
+    }
+    defaults.update(params)
+    return TripSchedule.objects.create(**defaults)
+
+
+class MaterializeScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.end = self.today + timedelta(days=30)
+
+    def test_creates_trip_per_running_day_with_crew(self):
+        schedule = sample_schedule(days_of_week=[0, 2, 4])
+        crew = sample_crew()
+        schedule.crew.add(crew)
+
+        stats = materialize_schedule(schedule, self.today, self.end)
+
+        trips = Trip.objects.filter(schedule=schedule)
+        self.assertEqual(stats["created"], trips.count())
+        self.assertEqual(trips.count(), 6)
+        for trip in trips:
+            self.assertIn(timezone.localtime(trip.departure_time).weekday(), [0, 2, 4])
+            self.assertEqual(
+                trip.arrival_time - trip.departure_time, timedelta(hours=5)
+            )
+            self.assertEqual(list(trip.crew.all()), [crew])
+
+    def test_rerun_is_noop(self):
+        schedule = sample_schedule()
+        materialize_schedule(schedule, self.today, self.end)
+
+        stats = materialize_schedule(schedule, self.today, self.end)
+
+        self.assertEqual(
+            stats,
+            {"created": 0, "updated": 0, "deleted": 0, "crew_updated": 0, "kept": 0},
+        )
+        self.assertEqual(Trip.objects.count(), 14)
+
+    def test_change_regenerates_affected_trips_only(self):
+        schedule = sample_schedule()
+        materialize_schedule(schedule, self.today, self.end)
+        sold_trip = Trip.objects.order_by("departure_time").last()
+        Ticket.objects.create(
+            trip=sold_trip,
+            order=Order.objects.create(
+                user=get_user_model().objects.create_user("a@a.com", "testpass")
+            ),
+            cargo=1,
+            seat=1,
+        )
+
+        schedule.valid_until = self.today + timedelta(days=6)
+        schedule.duration = timedelta(hours=6)
+        schedule.save()
+        stats = materialize_schedule(schedule, self.today, self.end)
+
+        self.assertEqual(
+            stats,
+            {"created": 0, "updated": 7, "deleted": 6, "crew_updated": 0, "kept": 1},
+        )
+        self.assertTrue(Trip.objects.filter(id=sold_trip.id).exists())
+
+    def test_crew_change_reaches_unsold_trips(self):
+        schedule = sample_schedule(valid_until=self.today + timedelta(days=2))
+        driver = sample_crew()
+        schedule.crew.add(driver)
+        materialize_schedule(schedule, self.today, self.end)
+        sold_trip = Trip.objects.order_by("departure_time").first()
+        Ticket.objects.create(
+            trip=sold_trip,
+            order=Order.objects.create(
+                user=get_user_model().objects.create_user("a@a.com", "testpass")
+            ),
+            cargo=1,
+            seat=1,
+        )
+
+        conductor = sample_crew(first_name="Ann")
+        schedule.crew.set([conductor])
+        stats = materialize_schedule(schedule, self.today, self.end)
+
+        self.assertEqual(stats["crew_updated"], 2)
+        for trip in Trip.objects.exclude(id=sold_trip.id):
+            self.assertEqual(list(trip.crew.all()), [conductor])
+        self.assertEqual(list(sold_trip.crew.all()), [driver])
+
+    def test_sold_trip_at_old_time_is_not_duplicated(self):
+        schedule = sample_schedule(valid_until=self.today + timedelta(days=2))
+        materialize_schedule(schedule, self.today, self.end)
+        sold_trip = Trip.objects.order_by("departure_time").first()
+        Ticket.objects.create(
+            trip=sold_trip,
+            order=Order.objects.create(
+                user=get_user_model().objects.create_user("a@a.com", "testpass")
+            ),
+            cargo=1,
+            seat=1,
+        )
+
+        schedule.departure_time = time(12, 0)
+        schedule.save()
+        stats = materialize_schedule(schedule, self.today, self.end)
+
+        self.assertEqual(stats["kept"], 1)
+        self.assertEqual(stats["created"], 2)
+        self.assertEqual(
+            Trip.objects.filter(
+                schedule=schedule,
+                departure_time__date=timezone.localdate(sold_trip.departure_time),
+            ).count(),
+            1,
+        )
+
+    def test_route_change_refreshes_calendar_of_new_route(self):
+        schedule = sample_schedule()
+        materialize_schedule(schedule, self.today, self.end)
+        new_route = sample_route()
+        self.assertEqual(availability_calendar(new_route.id, self.today, self.end), [])
+
+        schedule.route = new_route
+        schedule.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            materialize_schedule(schedule, self.today, self.end)
+
+        calendar = availability_calendar(new_route.id, self.today, self.end)
+        self.assertEqual(len(calendar), 14)
+
+    def test_busy_train_reported_without_stopping_other_schedules(self):
+        existing = sample_schedule(departure_time=time(8, 0))
+        materialize_schedule(existing, self.today, self.end)
+        busy = sample_schedule(
+            train=existing.train, route=sample_route(), departure_time=time(10, 0)
+        )
+        other = sample_schedule(route=busy.route)
+
+        totals = materialize_schedules(30, [busy, other])
+
+        self.assertEqual(list(totals["failed"]), [busy.id])
+        self.assertEqual(totals["created"], 14)
+        self.assertFalse(Trip.objects.filter(schedule=busy).exists())
+
+
+class TripScheduleAdminTests(TestCase):
+    def test_busy_train_shown_as_error_message(self):
+        existing = sample_schedule(departure_time=time(8, 0))
+        materialize_schedule(existing)
+        self.client.force_login(
+            get_user_model().objects.create_superuser("root@admin.com", "testpass")
+        )
+        url = reverse("admin:railway_tripschedule_add")
+        payload = {
+            "route": sample_route().id,
+            "train": existing.train_id,
+            "departure_time": "10:00",
+            "duration": "04:00:00",
+            "days_of_week": "0,1,2,3,4,5,6",
+            "valid_from": existing.valid_from.isoformat(),
+            "valid_until": existing.valid_until.isoformat(),
+        }
+
+        res = self.client.post(url, payload, follow=True)
+
+        self.assertEqual(res.redirect_chain, [(url, 302)])
+        self.assertIn(
+            "This train is already assigned to other trips at these times.",
+            [str(message) for message in res.context["messages"]],
+        )
+        self.assertEqual(TripSchedule.objects.count(), 1)
+
+
+class TripScheduleApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@admin.com", "testpass", is_staff=True
+            )
+        )
+
+    def test_create_schedule_generates_trips(self):
+        today = timezone.localdate()
+        payload = {
+            "route": sample_route().id,
+            "train": sample_train().id,
+            "departure_time": "07:00",
+            "duration": "04:00:00",
+            "days_of_week": [0, 1, 2, 3, 4, 5, 6],
+            "valid_from": today.isoformat(),
+            "valid_until": (today + timedelta(days=2)).isoformat(),
+            "crew": [sample_crew().id],
+        }
+
+        res = self.client.post(TRIP_SCHEDULE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Trip.objects.filter(schedule_id=res.data["id"]).count(), 3)
+
+    def test_create_schedule_invalid_validity(self):
+        today = timezone.localdate()
+        payload = {
+            "route": sample_route().id,
+            "train": sample_train().id,
+            "departure_time": "07:00",
+            "duration": "04:00:00",
+            "days_of_week": [0],
+            "valid_from": today.isoformat(),
+            "valid_until": (today - timedelta(days=1)).isoformat(),
+        }
+
+        res = self.client.post(TRIP_SCHEDULE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_schedule_with_busy_train(self):
+        existing = sample_schedule(departure_time=time(8, 0))
+        materialize_schedule(existing)
+        payload = {
+            "route": sample_route().id,
+            "train": existing.train_id,
+            "departure_time": "10:00",
+            "duration": "04:00:00",
+            "days_of_week": [0, 1, 2, 3, 4, 5, 6],
+            "valid_from": existing.valid_from.isoformat(),
+            "valid_until": existing.valid_until.isoformat(),
+        }
+
+        res = self.client.post(TRIP_SCHEDULE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("train", res.data)
+        self.assertEqual(TripSchedule.objects.count(), 1)
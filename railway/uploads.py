@@ -0,0 +1,85 @@
+import hashlib
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, UnidentifiedImageError
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Stored extensions come from the detected format, never from the client's
+# file name, so media is always served with an image content type.
+IMAGE_FORMAT_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "WEBP": ".webp",
+    "GIF": ".gif",
+}
+UNKNOWN_FORMAT_EXTENSION = ".bin"
+
+
+def file_digest(file):
+    """SHA-256 of a file, read in chunks; the position is reset afterwards."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def content_digest(file):
+    """Digest computed while uploading, falling back to hashing the file."""
+    return getattr(file, "sha256", None) or file_digest(file)
+
+
+def image_extension(file):
+    """Extension for the image format Pillow detects from the file header."""
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        image_format = None
+    finally:
+        file.seek(0)
+    return IMAGE_FORMAT_EXTENSIONS.get(image_format, UNKNOWN_FORMAT_EXTENSION)
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream every upload to a temporary file in chunks.
+
+    The SHA-256 of the content is computed chunk by chunk while writing and
+    stored on the resulting file as `sha256`, so the upload is never held
+    in memory and never read twice.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.digest.hexdigest()
+        return file
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage for files named after their content hash.
+
+    Saving a name that already exists is a no-op, since identical names
+    imply identical content: duplicate uploads are stored once.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
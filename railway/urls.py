@@ -6,9 +6,12 @@ from railway.views import (
     RouteViewSet,
     CrewViewSet,
     TripViewSet,
+    TripScheduleViewSet,
     TrainTypeViewSet,
+    FareRuleViewSet,
     TrainViewSet,
     OrderViewSet,
+    TimetableImportView,
 )
 
 app_name = "railway"
@@ -17,7 +20,12 @@ router.register("stations", StationViewSet)
 router.register("routes", RouteViewSet)
 router.register("crews", CrewViewSet)
 router.register("trips", TripViewSet)
+router.register("trip-schedules", TripScheduleViewSet)
 router.register("train-types", TrainTypeViewSet)
+router.register("fare-rules", FareRuleViewSet)
 router.register("trains", TrainViewSet)
 router.register("orders", OrderViewSet)
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path("timetable/import/", TimetableImportView.as_view(), name="timetable-import"),
+]
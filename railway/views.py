@@ -1,19 +1,56 @@
-from django.db.models import Prefetch, Count, F
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch, F
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.utils.dateparse import parse_date
-from rest_framework import viewsets, status, mixins
+from rest_framework import viewsets, status, mixins, serializers
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
-from railway.models import Station, Route, Crew, Trip, TrainType, Train, Order, Ticket
+from railway.autocomplete import station_autocomplete
+from railway.availability import availability_calendar
+from railway.exports import (
+    MANIFEST_CONTENT_TYPES,
+    MANIFEST_FORMATS,
+    iter_manifest_rows,
+    manifest_queryset,
+    render_manifest,
+)
+from railway.fleet import available_trains
+from railway.importers import TimetableImporter, TimetableImportError, read_bundle
+from railway.models import (
+    Station,
+    Route,
+    Crew,
+    Trip,
+    TripCrew,
+    TripSchedule,
+    FareRule,
+    TrainType,
+    Train,
+    Order,
+    Ticket,
+)
+from railway.pagination import RosterPagination
 from railway.permissions import IsAdminOrIfAuthenticatedReadOnly
+from railway.routes import route_lookup
+from railway.schedules import SCHEDULE_HORIZON_DAYS, materialize_schedule
+from railway.stations import station_index
 from railway.serializers import (
     StationSerializer,
     RouteSerializer,
     CrewSerializer,
     TripSerializer,
     TrainTypeSerializer,
+    FareRuleSerializer,
     TrainSerializer,
     OrderSerializer,
     TripListSerializer,
@@ -26,7 +63,34 @@ from railway.serializers import (
     RouteRetrieveSerializer,
     OrderListSerializer,
     TrainImageSerializer,
+    TimetableImportSerializer,
+    TripScheduleSerializer,
+    NearbyStationsQuerySerializer,
+    CrewRosterQuerySerializer,
+    CrewRosterSerializer,
+    TrainAvailabilityQuerySerializer,
+    RouteFilterQuerySerializer,
+    AvailabilityCalendarQuerySerializer,
+    AvailabilityDaySerializer,
+    StationAutocompleteQuerySerializer,
+    StationCompletionSerializer,
+    StationBoundingBoxQuerySerializer,
+    NearbyStationSerializer,
 )
+from railway.tasks import generate_train_image_variants
+from tasks.queue import enqueue
+
+
+def filter_by_route(queryset, query_params, field="route_id"):
+    """Narrow `queryset` to the routes matching the endpoint filters."""
+    query = RouteFilterQuerySerializer(data=query_params)
+    query.is_valid(raise_exception=True)
+    route_ids = route_lookup.route_ids(
+        **{name: value for name, value in query.validated_data.items() if value != ""}
+    )
+    if route_ids is None:
+        return queryset
+    return queryset.filter(**{f"{field}__in": route_ids})
 
 
 class StationViewSet(
@@ -43,6 +107,51 @@ class StationViewSet(
             return StationRetrieveSerializer
         return StationSerializer
 
+    @extend_schema(
+        parameters=[NearbyStationsQuerySerializer],
+        responses={200: NearbyStationSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False, url_path="nearby")
+    def nearby(self, request):
+        query = NearbyStationsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        stations = station_index.nearest(
+            query.validated_data["latitude"],
+            query.validated_data["longitude"],
+            query.validated_data["limit"],
+            query.validated_data.get("radius"),
+        )
+        return Response(NearbyStationSerializer(stations, many=True).data)
+
+    @extend_schema(
+        parameters=[StationBoundingBoxQuerySerializer],
+        responses={200: StationSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False, url_path="within")
+    def within(self, request):
+        query = StationBoundingBoxQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        stations = station_index.within(
+            query.validated_data["min_latitude"],
+            query.validated_data["min_longitude"],
+            query.validated_data["max_latitude"],
+            query.validated_data["max_longitude"],
+        )
+        return Response(StationSerializer(stations, many=True).data)
+
+    @extend_schema(
+        parameters=[StationAutocompleteQuerySerializer],
+        responses={200: StationCompletionSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request):
+        query = StationAutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        stations = station_autocomplete.complete(
+            query.validated_data["q"], query.validated_data["limit"]
+        )
+        return Response(StationCompletionSerializer(stations, many=True).data)
+
 
 class RouteViewSet(
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
@@ -58,11 +167,66 @@ class RouteViewSet(
             return RouteRetrieveSerializer
         return RouteSerializer
 
+    def get_queryset(self):
+        return filter_by_route(self.queryset, self.request.query_params, "id")
+
+    @extend_schema(parameters=[RouteFilterQuerySerializer])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[AvailabilityCalendarQuerySerializer],
+        responses={200: AvailabilityDaySerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=True, url_path="calendar")
+    def calendar(self, request, pk=None):
+        """Trips, first departure and free seats per day on this route."""
+        route = self.get_object()
+        query = AvailabilityCalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        days = availability_calendar(
+            route.id, query.validated_data["start"], query.validated_data["end"]
+        )
+        return Response(AvailabilityDaySerializer(days, many=True).data)
+
 
 class CrewViewSet(viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
 
+    @extend_schema(
+        parameters=[CrewRosterQuerySerializer],
+        responses={200: CrewRosterSerializer(many=True)},
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+        url_path="roster",
+    )
+    def roster(self, request, pk=None):
+        crew = self.get_object()
+        query = CrewRosterQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        assignments = TripCrew.objects.filter(crew=crew).select_related(
+            "trip__route__source", "trip__route__destination", "trip__train"
+        )
+        if "start" in query.validated_data:
+            assignments = assignments.filter(
+                departure_time__gte=query.validated_data["start"]
+            )
+        if "end" in query.validated_data:
+            assignments = assignments.filter(
+                departure_time__lt=query.validated_data["end"]
+            )
+
+        paginator = RosterPagination()
+        page = paginator.paginate_queryset(assignments, request, view=self)
+        return paginator.get_paginated_response(
+            CrewRosterSerializer(page, many=True).data
+        )
+
 
 class TripViewSet(viewsets.ModelViewSet):
     queryset = Trip.objects.select_related(
@@ -76,6 +240,7 @@ class TripViewSet(viewsets.ModelViewSet):
         ),
     )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "trips"
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -94,21 +259,16 @@ class TripViewSet(viewsets.ModelViewSet):
 
     @staticmethod
     def _param_to_date(query_string):
-        return parse_date(query_string)
+        """The date in `query_string`, or None if it is missing or invalid."""
+        try:
+            return parse_date(query_string)
+        except ValueError:
+            return None
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = filter_by_route(self.queryset, self.request.query_params)
 
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
         date = self.request.query_params.get("date")
-
-        if source:
-            queryset = queryset.filter(route__source__name__icontains=source.strip())
-        if destination:
-            queryset = queryset.filter(
-                route__destination__name__icontains=destination.strip()
-            )
         if date:
             date_parsed = self._param_to_date(date)
             if date_parsed:
@@ -117,12 +277,14 @@ class TripViewSet(viewsets.ModelViewSet):
         if self.action == "list":
             queryset = queryset.annotate(
                 total_seats=F("train__cargo_num") * F("train__places_in_cargo"),
-                tickets_count=Count("tickets"),
                 tickets_available=(
                     F("train__cargo_num") * F("train__places_in_cargo")
-                    - Count("tickets")
+                    - F("tickets_sold")
                 ),
-            ).order_by("departure_time")
+            )
+            # The list shows counts only; cargo counts are added per page
+            # by TripListSerializer, so skip loading crews and tickets.
+            queryset = queryset.prefetch_related(None).order_by("departure_time")
         else:
             queryset = queryset.order_by("departure_time")
 
@@ -142,6 +304,20 @@ class TripViewSet(viewsets.ModelViewSet):
                 location=OpenApiParameter.QUERY,
                 description="Filter trips by destination station name (ex. ?destination=Paris)",
             ),
+            OpenApiParameter(
+                name="source_id",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Filter trips by source station id (ex. ?source_id=1)",
+            ),
+            OpenApiParameter(
+                name="destination_id",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "Filter trips by destination station id (ex. ?destination_id=2)"
+                ),
+            ),
             OpenApiParameter(
                 name="date",
                 type=OpenApiTypes.DATE,
@@ -153,6 +329,149 @@ class TripViewSet(viewsets.ModelViewSet):
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @staticmethod
+    def _manifest_response(request, queryset, filename):
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in MANIFEST_FORMATS:
+            return Response(
+                {"file_format": f"Must be one of: {', '.join(MANIFEST_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        response = StreamingHttpResponse(
+            render_manifest(iter_manifest_rows(queryset), file_format),
+            content_type=MANIFEST_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{file_format}"'
+        )
+        return response
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="file_format",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Export format: csv or ndjson (ex. ?file_format=ndjson)",
+            ),
+        ],
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+        operation_id="railway_trips_manifest_retrieve",
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+        url_path="manifest",
+    )
+    def manifest(self, request, pk=None):
+        # Not get_object(): the viewset queryset prefetches every ticket.
+        trip = get_object_or_404(Trip.objects.only("id"), pk=pk)
+        self.check_object_permissions(request, trip)
+        return self._manifest_response(
+            request, manifest_queryset(trip_id=trip.id), f"trip-{trip.id}-manifest"
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="date",
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description=(
+                    "Departure date of the exported trips (ex. ?date=2025-01-01)"
+                ),
+            ),
+            OpenApiParameter(
+                name="file_format",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Export format: csv or ndjson (ex. ?file_format=ndjson)",
+            ),
+        ],
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+        operation_id="railway_trips_day_manifest_retrieve",
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAdminUser],
+        url_path="manifest",
+    )
+    def day_manifest(self, request):
+        date = self._param_to_date(request.query_params.get("date", ""))
+        if not date:
+            return Response(
+                {"date": "A valid date is required (ex. ?date=2025-01-01)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self._manifest_response(
+            request, manifest_queryset(date=date), f"manifest-{date.isoformat()}"
+        )
+
+
+class TripScheduleViewSet(viewsets.ModelViewSet):
+    queryset = TripSchedule.objects.select_related(
+        "route__source", "route__destination", "train"
+    ).prefetch_related("crew")
+    serializer_class = TripScheduleSerializer
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    @staticmethod
+    def _materialize(schedule, start=None, end=None):
+        try:
+            return materialize_schedule(schedule, start, end)
+        except ValidationError as error:
+            raise serializers.ValidationError(error.message_dict)
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        self._materialize(serializer.save())
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        self._materialize(serializer.save())
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="days",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f"Horizon in days (default {SCHEDULE_HORIZON_DAYS})",
+            ),
+        ],
+        request=None,
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        methods=["POST"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+        url_path="generate",
+    )
+    def generate(self, request, pk=None):
+        schedule = self.get_object()
+        try:
+            days = int(request.query_params.get("days", SCHEDULE_HORIZON_DAYS))
+        except ValueError:
+            return Response(
+                {"days": "Must be an integer."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        start = timezone.localdate()
+        return Response(
+            self._materialize(schedule, start, start + timedelta(days=days)),
+            status=status.HTTP_200_OK,
+        )
+
+
+class FareRuleViewSet(viewsets.ModelViewSet):
+    queryset = FareRule.objects.select_related("train_type")
+    serializer_class = FareRuleSerializer
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
 
 class TrainTypeViewSet(viewsets.ModelViewSet):
     queryset = TrainType.objects.all()
@@ -184,17 +503,39 @@ class TrainViewSet(viewsets.ModelViewSet):
         train = self.get_object()
         serializer = self.get_serializer(train, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(image_variants={})
+            enqueue(generate_train_image_variants, train.id)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        parameters=[TrainAvailabilityQuerySerializer],
+        responses={200: TrainListSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False, url_path="available")
+    def available(self, request):
+        query = TrainAvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        trains = available_trains(
+            query.validated_data["start"],
+            query.validated_data["end"],
+            self.get_queryset().order_by("id"),
+        )
+        page = self.paginate_queryset(trains)
+        serializer = TrainListSerializer(page, many=True, context={"request": request})
+        return self.get_paginated_response(serializer.data)
+
 
 class OrderViewSet(viewsets.ModelViewSet):
     queryset = Order.objects
     serializer_class = OrderSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @property
+    def throttle_scope(self):
+        return "order_create" if self.action == "create" else "orders"
+
     def get_queryset(self):
         queryset = self.queryset.filter(user=self.request.user)
 
@@ -217,3 +558,26 @@ class OrderViewSet(viewsets.ModelViewSet):
             serializer = OrderListSerializer
 
         return serializer
+
+
+class TimetableImportView(APIView):
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    @extend_schema(
+        request=TimetableImportSerializer, responses={200: OpenApiTypes.OBJECT}
+    )
+    def post(self, request):
+        serializer = TimetableImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bundle = serializer.validated_data["bundle"]
+
+        try:
+            with read_bundle(bundle, name=bundle.name) as sections:
+                stats = TimetableImporter().run(sections)
+        except TimetableImportError as error:
+            return Response(
+                {"errors": error.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(stats, status=status.HTTP_200_OK)
@@ -0,0 +1,75 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.queue import task_setting
+from tasks.worker import Worker, run_worker_process
+
+
+class Command(BaseCommand):
+    help = "Run background task workers polling the task table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=task_setting("WORKER_PROCESSES"),
+            help="Number of worker processes",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=task_setting("WORKER_THREADS"),
+            help="Number of threads per worker process",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=task_setting("POLL_INTERVAL"),
+            dest="poll_interval",
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue has been drained",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options["processes"])
+        threads = max(1, options["threads"])
+        self.stdout.write(
+            f"Starting {processes} worker process(es) with {threads} thread(s) each"
+        )
+
+        if processes == 1:
+            worker = Worker(threads, options["poll_interval"])
+            signal.signal(signal.SIGTERM, worker.stop)
+            signal.signal(signal.SIGINT, worker.stop)
+            processed = worker.run(burst=options["burst"])
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} task(s)"))
+            return
+
+        connections.close_all()
+        children = [
+            multiprocessing.Process(
+                target=run_worker_process,
+                args=(index, threads, options["poll_interval"], options["burst"]),
+            )
+            for index in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def stop_children(*args):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, stop_children)
+        signal.signal(signal.SIGINT, stop_children)
+        for child in children:
+            child.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:22
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_started_at(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.filter(started_at__isnull=False).update(heartbeat_at=F("started_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_started_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,216 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min
+from django.utils import timezone
+
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "EAGER": False,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF": 10,
+    "RETRY_BACKOFF_MAX": 3600,
+    "STALE_AFTER": 1800,
+    "WORKER_PROCESSES": 1,
+    "WORKER_THREADS": 4,
+    "POLL_INTERVAL": 1.0,
+}
+
+_registry = {}
+
+
+def task_setting(name):
+    return getattr(settings, "TASKS", {}).get(name, DEFAULTS[name])
+
+
+def task(func):
+    """Register a function so it can be enqueued by name."""
+    name = f"{func.__module__}.{func.__qualname__}"
+    _registry[name] = func
+    func.task_name = name
+    return func
+
+
+def get_task_function(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Task {name!r} is not registered")
+
+
+def enqueue(func_or_name, *args, run_at=None, max_attempts=None, **kwargs):
+    """
+    Store a task row and return it.
+
+    The row is written in the caller's transaction, so workers only see it
+    once the surrounding request has committed. With TASKS["EAGER"] the
+    task runs immediately instead, which is handy for tests.
+    """
+    name = getattr(func_or_name, "task_name", func_or_name)
+    get_task_function(name)
+
+    queued = Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or task_setting("MAX_ATTEMPTS"),
+    )
+    if task_setting("EAGER"):
+        queued.status = Task.Status.RUNNING
+        queued.attempts = 1
+        queued.started_at = queued.heartbeat_at = timezone.now()
+        execute_task(queued)
+    return queued
+
+
+def claim_tasks(worker_id, limit=1):
+    """Lock up to `limit` due tasks with SELECT ... FOR UPDATE SKIP LOCKED."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.Status.QUEUED, run_at__lte=now)
+            .order_by("run_at", "id")[:limit]
+        )
+        if claimed:
+            Task.objects.filter(id__in=[item.id for item in claimed]).update(
+                status=Task.Status.RUNNING,
+                attempts=F("attempts") + 1,
+                started_at=now,
+                heartbeat_at=now,
+                locked_by=worker_id,
+            )
+    for item in claimed:
+        item.status = Task.Status.RUNNING
+        item.attempts += 1
+        item.started_at = now
+        item.heartbeat_at = now
+        item.locked_by = worker_id
+    return claimed
+
+
+def retry_delay(attempts):
+    return min(
+        task_setting("RETRY_BACKOFF") * 2 ** (attempts - 1),
+        task_setting("RETRY_BACKOFF_MAX"),
+    )
+
+
+def execute_task(item):
+    """Run a claimed task and record its outcome, rescheduling it on failure."""
+    try:
+        get_task_function(item.name)(*item.args, **item.kwargs)
+    except Exception:
+        item.last_error = traceback.format_exc()
+        item.finished_at = timezone.now()
+        if item.attempts < item.max_attempts:
+            item.status = Task.Status.QUEUED
+            item.run_at = item.finished_at + timedelta(
+                seconds=retry_delay(item.attempts)
+            )
+        else:
+            item.status = Task.Status.FAILED
+        logger.exception("Task %s #%s failed", item.name, item.id)
+    else:
+        item.status = Task.Status.SUCCEEDED
+        item.finished_at = timezone.now()
+        item.last_error = ""
+
+    item.save(
+        update_fields=(
+            "status",
+            "attempts",
+            "run_at",
+            "started_at",
+            "finished_at",
+            "last_error",
+        )
+    )
+    return item
+
+
+def heartbeat(task_ids, worker_id):
+    """Mark tasks as still running on `worker_id`."""
+    if not task_ids:
+        return 0
+    return Task.objects.filter(
+        id__in=task_ids, status=Task.Status.RUNNING, locked_by=worker_id
+    ).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale_tasks():
+    """
+    Put back tasks whose worker died while running them.
+
+    A task is stale when its worker has not sent a heartbeat for
+    STALE_AFTER seconds. Workers beat every minute for as long as a task
+    runs, so long tasks are not run twice. Tasks that already used all
+    their attempts, such as one that keeps crashing its worker, fail
+    instead of being queued again.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.Status.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=task_setting("STALE_AFTER")),
+    )
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Task.Status.FAILED,
+        finished_at=now,
+        locked_by="",
+        last_error="Worker stopped while running the task.",
+    )
+    return stale.update(status=Task.Status.QUEUED, locked_by="")
+
+
+def run_pending(worker_id="inline", limit=None):
+    """Run due tasks in the current thread until none are left."""
+    processed = 0
+    while limit is None or processed < limit:
+        claimed = claim_tasks(worker_id)
+        if not claimed:
+            break
+        execute_task(claimed[0])
+        processed += 1
+    return processed
+
+
+def task_metrics():
+    now = timezone.now()
+    by_status = dict(
+        Task.objects.order_by()
+        .values("status")
+        .annotate(total=Count("id"))
+        .values_list("status", "total")
+    )
+    queued = Task.objects.filter(status=Task.Status.QUEUED)
+    finished = Task.objects.filter(
+        status=Task.Status.SUCCEEDED, finished_at__gte=now - timedelta(hours=1)
+    ).aggregate(
+        avg_duration=Avg(F("finished_at") - F("started_at")),
+        max_duration=Max(F("finished_at") - F("started_at")),
+        count=Count("id"),
+    )
+    oldest = queued.filter(run_at__lte=now).aggregate(oldest=Min("run_at"))["oldest"]
+
+    return {
+        "by_status": {
+            status: by_status.get(status, 0) for status in Task.Status.values
+        },
+        "due": queued.filter(run_at__lte=now).count(),
+        "scheduled_retries": queued.filter(attempts__gt=0).count(),
+        "oldest_due_seconds": (now - oldest).total_seconds() if oldest else 0,
+        "succeeded_last_hour": finished["count"],
+        "avg_duration_seconds": (
+            finished["avg_duration"].total_seconds() if finished["avg_duration"] else 0
+        ),
+        "max_duration_seconds": (
+            finished["max_duration"].total_seconds() if finished["max_duration"] else 0
+        ),
+    }
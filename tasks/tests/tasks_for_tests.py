@@ -0,0 +1,13 @@
+from tasks.queue import task
+
+calls = []
+
+
+@task
+def record_call(value):
+    calls.append(value)
+
+
+@task
+def always_fail():
+    raise RuntimeError("boom")
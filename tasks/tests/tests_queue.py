@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from tasks.queue import (
+    claim_tasks,
+    enqueue,
+    heartbeat,
+    requeue_stale_tasks,
+    run_pending,
+    task_metrics,
+)
+from tasks.tests import tasks_for_tests
+from tasks.tests.tasks_for_tests import always_fail, record_call
+from tasks.worker import Worker
+
+TASK_METRICS_URL = reverse("tasks:metrics")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        tasks_for_tests.calls.clear()
+
+    def test_enqueue_and_run(self):
+        queued = enqueue(record_call, 42)
+
+        self.assertEqual(queued.status, Task.Status.QUEUED)
+        self.assertEqual(run_pending(), 1)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.SUCCEEDED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertEqual(tasks_for_tests.calls, [42])
+
+    def test_enqueue_unknown_task(self):
+        with self.assertRaises(LookupError):
+            enqueue("tasks.missing")
+
+    def test_future_tasks_are_not_claimed(self):
+        enqueue(record_call, 1, run_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(claim_tasks("test"), [])
+
+    @override_settings(TASKS={"RETRY_BACKOFF": 30})
+    def test_failed_task_retries_with_backoff_then_fails(self):
+        queued = enqueue(always_fail, max_attempts=2)
+
+        with self.assertLogs("tasks.queue", "ERROR"):
+            run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.QUEUED)
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=25))
+        self.assertIn("boom", queued.last_error)
+
+        Task.objects.filter(id=queued.id).update(run_at=timezone.now())
+        with self.assertLogs("tasks.queue", "ERROR"):
+            run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.Status.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    @override_settings(TASKS={"STALE_AFTER": 60})
+    def test_stale_tasks_requeued_until_attempts_run_out(self):
+        retried = enqueue(record_call, 1, max_attempts=2)
+        exhausted = enqueue(record_call, 2, max_attempts=1)
+        alive = enqueue(record_call, 3)
+        claim_tasks("dead-worker", limit=3)
+        Task.objects.update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+        heartbeat([alive.id], "dead-worker")
+
+        self.assertEqual(requeue_stale_tasks(), 1)
+
+        statuses = dict(Task.objects.values_list("id", "status"))
+        self.assertEqual(statuses[retried.id], Task.Status.QUEUED)
+        self.assertEqual(statuses[exhausted.id], Task.Status.FAILED)
+        self.assertEqual(statuses[alive.id], Task.Status.RUNNING)
+
+    @override_settings(TASKS={"EAGER": True})
+    def test_eager_mode_runs_immediately(self):
+        queued = enqueue(record_call, "now")
+        self.assertEqual(queued.status, Task.Status.SUCCEEDED)
+        self.assertEqual(tasks_for_tests.calls, ["now"])
+
+    def test_metrics(self):
+        enqueue(record_call, 1)
+        enqueue(record_call, 2)
+        run_pending(limit=1)
+
+        metrics = task_metrics()
+
+        self.assertEqual(metrics["by_status"][Task.Status.SUCCEEDED], 1)
+        self.assertEqual(metrics["due"], 1)
+
+    def test_metrics_endpoint_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("user@gmail.com", "testpass")
+        )
+        res = client.get(TASK_METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class WorkerTests(TransactionTestCase):
+    def setUp(self):
+        tasks_for_tests.calls.clear()
+
+    def test_burst_worker_drains_queue_on_threads(self):
+        for value in range(10):
+            enqueue(record_call, value)
+
+        processed = Worker(threads=3, poll_interval=0.01).run(burst=True)
+
+        self.assertEqual(processed, 10)
+        self.assertEqual(sorted(tasks_for_tests.calls), list(range(10)))
+        self.assertFalse(Task.objects.exclude(status=Task.Status.SUCCEEDED).exists())
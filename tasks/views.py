@@ -0,0 +1,14 @@
+from drf_spectacular.utils import extend_schema, OpenApiTypes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from tasks.queue import task_metrics
+
+
+class TaskMetricsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        return Response(task_metrics())
@@ -0,0 +1,99 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, connections
+
+from tasks.queue import claim_tasks, execute_task, heartbeat, requeue_stale_tasks
+
+logger = logging.getLogger(__name__)
+
+STALE_CHECK_INTERVAL = 60
+HEARTBEAT_INTERVAL = 60
+
+
+class Worker:
+    """
+    Poll the task table and run tasks on a pool of threads.
+
+    Only as many tasks are claimed as there are idle threads, so a busy
+    worker leaves the rest of the queue to its siblings.
+    """
+
+    def __init__(self, threads, poll_interval, name=None):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.slots = threading.Semaphore(threads)
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.running = set()
+        self._processed_lock = threading.Lock()
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _run_one(self, item):
+        close_old_connections()
+        try:
+            execute_task(item)
+        finally:
+            with self._processed_lock:
+                self.processed += 1
+                self.running.discard(item.id)
+            close_old_connections()
+            self.slots.release()
+
+    def _free_slots(self):
+        free = 0
+        while free < self.threads and self.slots.acquire(blocking=False):
+            free += 1
+        return free
+
+    def run(self, burst=False):
+        """Process tasks until stopped, or until the queue is drained if burst."""
+        last_stale_check = last_heartbeat = 0
+        with ThreadPoolExecutor(self.threads, thread_name_prefix="task-worker") as pool:
+            while not self.stopping.is_set():
+                if time.monotonic() - last_heartbeat > HEARTBEAT_INTERVAL:
+                    with self._processed_lock:
+                        running = list(self.running)
+                    heartbeat(running, self.name)
+                    last_heartbeat = time.monotonic()
+                if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                    requeue_stale_tasks()
+                    last_stale_check = time.monotonic()
+
+                free = self._free_slots()
+                claimed = claim_tasks(self.name, limit=free) if free else []
+                for _ in range(free - len(claimed)):
+                    self.slots.release()
+                with self._processed_lock:
+                    self.running.update(item.id for item in claimed)
+                for item in claimed:
+                    pool.submit(self._run_one, item)
+
+                if claimed:
+                    continue
+                if burst and free == self.threads:
+                    break
+                self.stopping.wait(self.poll_interval)
+        close_old_connections()
+        return self.processed
+
+
+def run_worker_process(index, threads, poll_interval, burst):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    worker = Worker(
+        threads,
+        poll_interval,
+        name=f"{socket.gethostname()}:{os.getpid()}:{index}",
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(burst=burst)
+    connections.close_all()
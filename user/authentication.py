@@ -0,0 +1,160 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from user.revocation import revocation_list
+
+USER_CACHE_DEFAULTS = {
+    "TTL": 30,
+    "MAX_SIZE": 10000,
+    "SHARED_CACHE": None,
+}
+
+
+def user_cache_setting(name):
+    return getattr(settings, "USER_CACHE", {}).get(name, USER_CACHE_DEFAULTS[name])
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class UserCache:
+    """
+    Two-level cache of authenticated users keyed by the token's user id.
+
+    The in-process LRU answers most lookups without any I/O. When
+    USER_CACHE["SHARED_CACHE"] names a Django cache alias, misses fall back
+    to it before hitting the database, so workers share warm entries.
+    Ids are normalised to strings: tokens carry them as strings while save
+    signals see the integer primary key.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(user_cache_setting("MAX_SIZE"), user_cache_setting("TTL"))
+
+    @staticmethod
+    def _shared():
+        alias = user_cache_setting("SHARED_CACHE")
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _key(user_id):
+        return f"user:auth:{user_id}"
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        user = self.local.get(user_id)
+        if user is None and (shared := self._shared()) is not None:
+            user = shared.get(self._key(user_id))
+            if user is not None:
+                self.local.set(user_id, user)
+        return user
+
+    def set(self, user_id, user):
+        user_id = str(user_id)
+        self.local.set(user_id, user)
+        if (shared := self._shared()) is not None:
+            shared.set(self._key(user_id), user, user_cache_setting("TTL"))
+
+    def invalidate(self, user_id):
+        user_id = str(user_id)
+        self.local.delete(user_id)
+        if (shared := self._shared()) is not None:
+            shared.delete(self._key(user_id))
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through `user_cache`.
+
+    A cache hit costs no query. Entries live for USER_CACHE["TTL"] seconds
+    and are dropped as soon as the user is saved or deleted (see
+    user.signals), so deactivation, staff and password changes apply on
+    the next request served by the process that made them and within the
+    TTL everywhere else. Revoked tokens are rejected through
+    `revocation_list` before the user is looked up.
+
+    Query budget per request: none when the user is cached and the token
+    misses the revocation Bloom filter, one more on a user cache miss and
+    one more to confirm a Bloom filter hit. Per process, the first request
+    builds the filter (a count and a scan of RevokedToken) and at most one
+    refresh query runs every TOKEN_REVOCATION["REFRESH_INTERVAL"] seconds.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        else:
+            self._check_user(user, validated_token)
+
+        # Each request gets its own instance, so changes made while handling
+        # one request never leak into another one through the cache.
+        return copy.copy(user)
+
+    @staticmethod
+    def _check_user(user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
@@ -0,0 +1,167 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+PASSWORD_HASHING_DEFAULTS = {
+    "ENABLED": True,
+    "PROCESSES": 2,
+    "QUEUE_SIZE": 8,
+    "TIMEOUT": 10,
+    "RETRY_AFTER": 1,
+}
+
+
+def hashing_setting(name):
+    return getattr(settings, "PASSWORD_HASHING", {}).get(
+        name, PASSWORD_HASHING_DEFAULTS[name]
+    )
+
+
+class HashingPoolSaturated(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many sign-ins in progress, try again shortly.")
+    default_code = "hashing_pool_saturated"
+
+    def __init__(self, wait):
+        super().__init__()
+        # DRF turns `wait` into a Retry-After header.
+        self.wait = wait
+
+
+def _init_worker():
+    django.setup()
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def _check_password(password, encoded):
+    return hashers.check_password(password, encoded)
+
+
+class PasswordHashingPool:
+    """
+    Runs password hashing in a small pool of worker processes.
+
+    Hashing is CPU-bound, so running it on request threads lets a burst of
+    logins starve every other endpoint. Here at most PROCESSES hashes run
+    at once and QUEUE_SIZE more may wait; any request beyond that is
+    refused with 503 and Retry-After instead of queueing without bound.
+    With ENABLED off, hashing runs inline as before.
+    """
+
+    def __init__(self, processes=None, queue_size=None):
+        self.processes = processes or hashing_setting("PROCESSES")
+        queue_size = hashing_setting("QUEUE_SIZE") if queue_size is None else queue_size
+        self._queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(self.processes + queue_size)
+        self._in_use = 0
+        self._executor = None
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._count_lock:
+            self._in_use += 1
+        return True
+
+    def _release(self):
+        with self._count_lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def _reset_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, function, *args):
+        if not hashing_setting("ENABLED"):
+            return function(*args)
+
+        retry_after = hashing_setting("RETRY_AFTER")
+        if not self._acquire():
+            raise HashingPoolSaturated(retry_after)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(function, *args)
+        except BrokenProcessPool:
+            self._release()
+            self._reset_executor(executor)
+            raise HashingPoolSaturated(retry_after)
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            return future.result(timeout=hashing_setting("TIMEOUT"))
+        except TimeoutError:
+            future.cancel()
+            raise HashingPoolSaturated(retry_after)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise HashingPoolSaturated(retry_after)
+
+    def stats(self):
+        capacity = self.processes + self._queue_size
+        in_use = self._in_use
+        return {"capacity": capacity, "in_use": in_use, "saturated": in_use >= capacity}
+
+    def make_password(self, password):
+        return self.run(_make_password, password)
+
+    def check_password(self, password, encoded):
+        return self.run(_check_password, password, encoded)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+password_hashing_pool = PasswordHashingPool()
+
+
+def authenticate_user(email, password):
+    """
+    ModelBackend-style credential check with hashing done in the pool.
+
+    Unknown emails still pay for one hash so response times do not reveal
+    which accounts exist. Hashes made by an outdated hasher are upgraded.
+    """
+    user_model = get_user_model()
+    try:
+        user = user_model._default_manager.get_by_natural_key(email)
+    except user_model.DoesNotExist:
+        password_hashing_pool.make_password(password)
+        return None
+
+    if not password_hashing_pool.check_password(password, user.password):
+        return None
+
+    if hashers.identify_hasher(user.password).must_update(user.password):
+        user.password = password_hashing_pool.make_password(password)
+        user.save(update_fields=["password"])
+    return user if user.is_active else None
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from user.revocation import (
+    purge_expired_revocations,
+    revocation_list,
+    revoke_user_tokens,
+)
+
+
+class Command(BaseCommand):
+    help = "Revoke every token issued to the given users, or rebuild the filter"
+
+    def add_arguments(self, parser):
+        parser.add_argument("emails", nargs="*", help="Emails of the users")
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Purge expired revocations and rebuild the Bloom filter",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete revocations of tokens that have expired",
+        )
+
+    def handle(self, *args, **options):
+        for email in options["emails"]:
+            try:
+                user = get_user_model().objects.get(email=email)
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {email} does not exist")
+            revoke_user_tokens(user)
+            self.stdout.write(f"Revoked tokens of {email}")
+
+        if options["purge"] or options["rebuild"]:
+            deleted = purge_expired_revocations()
+            self.stdout.write(f"Purged {deleted} expired revocation(s)")
+        if options["rebuild"]:
+            revocation_list.rebuild()
+            self.stdout.write("Revocation filter rebuilt")
@@ -2,7 +2,9 @@ from django.contrib.auth.models import (
     AbstractUser,
     BaseUserManager,
 )
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 
@@ -43,3 +45,25 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked token JTI, or a user-wide cutoff stored as "user:<id>".
+
+    Rows are only needed until the token would have expired anyway.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="revoked_tokens",
+    )
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,179 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from user.models import RevokedToken
+
+REVOCATION_DEFAULTS = {
+    "CAPACITY": 100000,
+    "ERROR_RATE": 0.001,
+    "REFRESH_INTERVAL": 5,
+    "REBUILD_INTERVAL": 3600,
+}
+
+# Rows become visible when their transaction commits, which can be after
+# their revoked_at; each refresh re-reads this much history to catch them.
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+def revocation_setting(name):
+    return getattr(settings, "TOKEN_REVOCATION", {}).get(
+        name, REVOCATION_DEFAULTS[name]
+    )
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+def user_revocation_key(user_id):
+    return f"user:{user_id}"
+
+
+class RevocationList:
+    """
+    In-memory view of RevokedToken used to check tokens without queries.
+
+    A Bloom filter answers "definitely not revoked" for the common case.
+    Only probable hits are confirmed against the table. The filter picks
+    up recent rows every REFRESH_INTERVAL seconds through a revoked_at
+    cursor, and is rebuilt from the unexpired rows every REBUILD_INTERVAL
+    seconds, resized to fit. Checking tokens never writes: expired rows
+    are deleted by purge_expired_revocations(), run from the revoke_tokens
+    command or the task queue.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._synced_until = None
+        self._refreshed_at = 0.0
+        self._rebuilt_at = 0.0
+
+    def rebuild(self):
+        with self._lock:
+            started = timezone.now()
+            keys = RevokedToken.objects.filter(expires_at__gte=started).values_list(
+                "jti", flat=True
+            )
+            bloom = BloomFilter(
+                max(revocation_setting("CAPACITY"), 2 * keys.count()),
+                revocation_setting("ERROR_RATE"),
+            )
+            for key in keys.iterator(chunk_size=5000):
+                bloom.add(key)
+            self._bloom = bloom
+            self._synced_until = started
+            self._refreshed_at = self._rebuilt_at = time.monotonic()
+
+    def refresh(self):
+        with self._lock:
+            started = timezone.now()
+            for key in RevokedToken.objects.filter(
+                revoked_at__gte=self._synced_until - REFRESH_OVERLAP
+            ).values_list("jti", flat=True):
+                self._bloom.add(key)
+            self._synced_until = started
+            self._refreshed_at = time.monotonic()
+
+    def refresh_if_due(self):
+        now = time.monotonic()
+        if self._bloom is None or now - self._rebuilt_at > revocation_setting(
+            "REBUILD_INTERVAL"
+        ):
+            self.rebuild()
+        elif now - self._refreshed_at > revocation_setting("REFRESH_INTERVAL"):
+            self.refresh()
+
+    def add(self, key):
+        if self._bloom is not None:
+            with self._lock:
+                self._bloom.add(key)
+
+    def is_revoked(self, token):
+        self.refresh_if_due()
+
+        jti = token.get(api_settings.JTI_CLAIM)
+        user_key = user_revocation_key(token.get(api_settings.USER_ID_CLAIM))
+        candidates = [key for key in (jti, user_key) if key and key in self._bloom]
+        if not candidates:
+            return False
+
+        issued_at = token.get("iat")
+        for key, revoked_at in RevokedToken.objects.filter(
+            jti__in=candidates
+        ).values_list("jti", "revoked_at"):
+            if key == jti:
+                return True
+            # iat has whole seconds: a token issued in the second of the
+            # revocation is kept rather than revoking its replacement.
+            if issued_at is None or issued_at < int(revoked_at.timestamp()):
+                return True
+        return False
+
+
+revocation_list = RevocationList()
+
+
+def purge_expired_revocations():
+    """Delete revocations of tokens that have expired anyway."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
+
+
+def _expires_at(token):
+    return datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+
+
+def revoke_token(token, user=None):
+    """Revoke a single access or refresh token by its JTI."""
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.get_or_create(
+        jti=jti, defaults={"user": user, "expires_at": _expires_at(token)}
+    )
+    revocation_list.add(jti)
+
+
+def revoke_user_tokens(user):
+    """Revoke every token issued to a user up to now."""
+    key = user_revocation_key(user.pk)
+    now = timezone.now()
+    RevokedToken.objects.update_or_create(
+        jti=key,
+        defaults={
+            "user": user,
+            "revoked_at": now,
+            "expires_at": now + api_settings.REFRESH_TOKEN_LIFETIME,
+        },
+    )
+    revocation_list.add(key)
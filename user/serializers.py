@@ -1,6 +1,22 @@
-from django.contrib.auth import get_user_model, authenticate
-from rest_framework import serializers
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.models import update_last_login
 from django.utils.translation import gettext as _
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+    TokenVerifySerializer as BaseTokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from user.hashing import authenticate_user, password_hashing_pool
+from user.revocation import revocation_list, revoke_token, revoke_user_tokens
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -18,15 +34,24 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
     def create(self, validated_data):
-        return get_user_model().objects.create_user(**validated_data)
+        user_model = get_user_model()
+        password = validated_data.pop("password")
+        validated_data["email"] = user_model.objects.normalize_email(
+            validated_data["email"]
+        )
+        user = user_model(**validated_data)
+        user.password = password_hashing_pool.make_password(password)
+        user.save()
+        return user
 
     def update(self, instance, validated_data):
         password = validated_data.pop("password", None)
         user = super().update(instance, validated_data)
 
         if password:
-            user.set_password(password)
+            user.password = password_hashing_pool.make_password(password)
             user.save()
+            revoke_user_tokens(user)
 
         return user
 
@@ -58,3 +83,57 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    def validate(self, attrs):
+        self.user = authenticate_user(attrs[self.username_field], attrs["password"])
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        refresh = self.get_token(self.user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    def validate(self, attrs):
+        if revocation_list.is_revoked(RefreshToken(attrs["refresh"])):
+            raise InvalidToken(_("Token has been revoked"))
+        return super().validate(attrs)
+
+
+class TokenVerifySerializer(BaseTokenVerifySerializer):
+    def validate(self, attrs):
+        if revocation_list.is_revoked(UntypedToken(attrs["token"])):
+            raise InvalidToken(_("Token has been revoked"))
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(label=_("Refresh token"), required=False)
+    everywhere = serializers.BooleanField(
+        default=False, help_text=_("Revoke every token issued to the user")
+    )
+
+    def validate_refresh(self, value):
+        try:
+            token = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(str(error))
+        if str(token.get("user_id")) != str(self.context["request"].user.pk):
+            raise serializers.ValidationError(_("Token belongs to another user."))
+        return token
+
+    def save(self, **kwargs):
+        request = self.context["request"]
+        if self.validated_data["everywhere"]:
+            revoke_user_tokens(request.user)
+            return
+        if request.auth is not None:
+            revoke_token(request.auth, user=request.user)
+        if self.validated_data.get("refresh") is not None:
+            revoke_token(self.validated_data["refresh"], user=request.user)
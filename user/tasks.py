@@ -0,0 +1,7 @@
+from tasks.queue import task
+from user.revocation import purge_expired_revocations
+
+
+@task
+def purge_revocations():
+    purge_expired_revocations()
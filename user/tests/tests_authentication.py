@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import LRUCache, user_cache
+from user.revocation import revocation_list
+
+ME_URL = reverse("user:manage_user")
+
+
+class LRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_size=2, ttl=-1)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.local.clear()
+        # Build the revocation filter now so requests only pay for the user.
+        revocation_list.rebuild()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="Test12345"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_second_request_skips_user_query(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "test@gmail.com")
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_change_visible_on_next_request(self):
+        self.client.get(ME_URL)
+
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertTrue(res.data["is_staff"])
+
+    def test_request_mutations_do_not_leak_into_cache(self):
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {"email": "changed@gmail.com"})
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "changed@gmail.com")
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.hashing import (
+    HashingPoolSaturated,
+    PasswordHashingPool,
+    password_hashing_pool,
+)
+
+CREATE_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token_obtain_pair")
+
+
+class PasswordHashingPoolTests(SimpleTestCase):
+    def test_hashes_in_worker_process(self):
+        pool = PasswordHashingPool(processes=1, queue_size=0)
+        self.addCleanup(pool.shutdown)
+
+        encoded = pool.make_password("Test12345")
+
+        self.assertTrue(check_password("Test12345", encoded))
+        self.assertTrue(pool.check_password("Test12345", encoded))
+        self.assertFalse(pool.check_password("wrong", encoded))
+
+    def test_refuses_when_saturated(self):
+        pool = PasswordHashingPool(processes=1, queue_size=0)
+        pool._slots.acquire()
+
+        with self.assertRaises(HashingPoolSaturated) as raised:
+            pool.make_password("Test12345")
+        self.assertEqual(raised.exception.wait, 1)
+        self.assertIsNone(pool._executor)
+
+
+class OffloadedAuthenticationApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_register_and_login(self):
+        payload = {"email": "New@Example.COM", "password": "Test12345"}
+        res = self.client.post(CREATE_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        user = get_user_model().objects.get(id=res.data["id"])
+        self.assertEqual(user.email, "New@example.com")
+        self.assertTrue(user.check_password("Test12345"))
+
+        res = self.client.post(
+            TOKEN_URL, {"email": user.email, "password": "Test12345"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+
+    def test_invalid_credentials(self):
+        get_user_model().objects.create_user("user@test.com", "Test12345")
+
+        for email, password in [
+            ("user@test.com", "wrong"),
+            ("missing@test.com", "Test12345"),
+        ]:
+            res = self.client.post(TOKEN_URL, {"email": email, "password": password})
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_returns_503_when_pool_saturated(self):
+        get_user_model().objects.create_user("user@test.com", "Test12345")
+
+        with mock.patch.object(
+            password_hashing_pool._slots, "acquire", return_value=False
+        ):
+            res = self.client.post(
+                TOKEN_URL, {"email": "user@test.com", "password": "Test12345"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
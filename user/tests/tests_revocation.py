@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.authentication import user_cache
+from user.models import RevokedToken
+from user.revocation import (
+    BloomFilter,
+    purge_expired_revocations,
+    revocation_list,
+    revoke_user_tokens,
+)
+
+ME_URL = reverse("user:manage_user")
+LOGOUT_URL = reverse("user:logout")
+REFRESH_URL = reverse("user:token_refresh")
+VERIFY_URL = reverse("user:token_verify")
+
+
+def issued_earlier(token):
+    """Revocations compare whole seconds, so move iat before "now"."""
+    token["iat"] -= 1
+    return token
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for index in range(1000):
+            bloom.add(f"jti-{index}")
+
+        self.assertTrue(all(f"jti-{index}" in bloom for index in range(1000)))
+        false_positives = sum(f"other-{index}" in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        user_cache.local.clear()
+        revocation_list.rebuild()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="Test12345"
+        )
+        self.refresh = issued_earlier(RefreshToken.for_user(self.user))
+        self.access = issued_earlier(self.refresh.access_token)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+    def test_unrevoked_token_costs_no_revocation_query(self):
+        self.client.get(ME_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        res = self.client.post(LOGOUT_URL, {"refresh": str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(
+            self.client.get(ME_URL).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        res = APIClient().post(REFRESH_URL, {"refresh": str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = APIClient().post(VERIFY_URL, {"token": str(self.access)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_other_tokens_stay_valid_after_logout(self):
+        other = RefreshToken.for_user(self.user)
+        self.client.post(LOGOUT_URL, {"refresh": str(self.refresh)})
+
+        res = APIClient().post(REFRESH_URL, {"refresh": str(other)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_logout_everywhere_revokes_all_tokens(self):
+        other_access = issued_earlier(RefreshToken.for_user(self.user).access_token)
+        self.client.post(LOGOUT_URL, {"everywhere": True})
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {other_access}")
+        self.assertEqual(client.get(ME_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_existing_tokens(self):
+        res = self.client.patch(ME_URL, {"password": "NewPass123"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = APIClient().post(REFRESH_URL, {"refresh": str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cannot_revoke_token_of_another_user(self):
+        stranger = get_user_model().objects.create_user(
+            email="other@gmail.com", password="Test12345"
+        )
+        res = self.client.post(
+            LOGOUT_URL, {"refresh": str(RefreshToken.for_user(stranger))}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_issued_in_the_revocation_second_stays_valid(self):
+        revoke_user_tokens(self.user)
+        RevokedToken.objects.filter(jti=f"user:{self.user.pk}").update(
+            revoked_at=timezone.now().replace(microsecond=500000)
+        )
+        revocation_list.rebuild()
+        token = RefreshToken.for_user(self.user)
+        token["iat"] = int(RevokedToken.objects.get().revoked_at.timestamp())
+
+        self.assertFalse(revocation_list.is_revoked(token))
+
+    def test_checks_do_not_purge_expired_revocations(self):
+        RevokedToken.objects.create(
+            jti="expired", expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        revocation_list.rebuild()
+        self.assertTrue(RevokedToken.objects.filter(jti="expired").exists())
+
+        self.assertEqual(purge_expired_revocations(), 1)
+        self.assertFalse(RevokedToken.objects.exists())
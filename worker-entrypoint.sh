@@ -0,0 +1,15 @@
+#!/bin/sh
+cd /app
+
+echo
+python manage.py wait_for_db
+
+# The app container applies migrations; wait for it instead of racing it.
+echo
+until python manage.py migrate --check > /dev/null 2>&1; do
+    echo "Waiting for migrations..."
+    sleep 2
+done
+
+echo
+exec "$@"